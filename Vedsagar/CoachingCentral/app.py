@@ -174,10 +174,23 @@ with st.sidebar:
     st.markdown("### Database Status")
     
     try:
-        db_status = db.check_connection()
-        if db_status:
+        health = db.get_health_status()
+        if health['mode'] == 'demo':
+            st.success("✅ Database Connected (demo data)")
+        elif health['available'] is None:
+            st.info("⏳ Checking database connection...")
+        elif db.check_connection():
             st.success("✅ Database Connected")
         else:
             st.error("❌ Database Disconnected")
+        
+        if health['p50_ms'] is not None:
+            st.caption(f"Latency p50 {health['p50_ms']:.0f} ms · p95 {health['p95_ms']:.0f} ms · "
+                       f"{health['availability']:.1f}% available")
+        
+        backend = db.backend_status()
+        if backend['serving_stale']:
+            stale_since = datetime.fromtimestamp(backend['stale_since']).strftime('%I:%M %p')
+            st.warning(f"⚠️ Showing data cached at {stale_since} until the database responds")
     except Exception as e:
         st.error("❌ Database Error")
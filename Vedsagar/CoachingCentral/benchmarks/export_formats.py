@@ -0,0 +1,49 @@
+"""
+Export format benchmark
+Compares generation time and file size of Excel, CSV and Parquet exports
+
+Run from the app directory:
+    python benchmarks/export_formats.py --rows 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_students
+from utils.exporter import ExportEngine, EXPORT_CHUNK_SIZE, get_export_formats, schema_columns
+
+
+def run(rows: int, chunk_size: int = EXPORT_CHUNK_SIZE) -> list:
+    """Export the same synthetic students table in every format"""
+    students = make_students(rows)
+    engine = ExportEngine(row_limit=rows, chunk_size=chunk_size)
+    columns = schema_columns('students')
+    results = []
+
+    for export_format in get_export_formats():
+        chunks = (students[start:start + chunk_size] for start in range(0, rows, chunk_size))
+        started = time.perf_counter()
+        result = engine.write(chunks, export_format, 'Students', columns=columns, table_name='students')
+        elapsed = time.perf_counter() - started
+        results.append((export_format, result.rows_written, elapsed, len(result.data)))
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    print(f"Exporting {args.rows} student rows in chunks of {args.chunk_size}")
+    print(f"{'Format':<10}{'Rows':>10}{'Seconds':>12}{'Size (MB)':>12}")
+    for export_format, rows_written, elapsed, size in run(args.rows, args.chunk_size):
+        print(f"{export_format:<10}{rows_written:>10}{elapsed:>12.2f}{size / 1024 / 1024:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
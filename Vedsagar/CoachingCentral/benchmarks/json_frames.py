@@ -0,0 +1,108 @@
+"""
+JSON to frame benchmark
+Times decoding paged NocoDB list responses and building the typed students frame, and
+measures peak memory, for the stdlib decoder with a row-wise build against orjson
+with the column-wise build load_table_frame uses
+
+Run from the app directory:
+    python benchmarks/json_frames.py --rows 100000
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from benchmarks.synthetic import make_students
+from config.settings import DATABASE_SCHEMA
+from utils.exporter import EXPORT_CHUNK_SIZE
+from utils.snapshot import DATE_FIELD_TYPES, NUMBER_FIELD_TYPES, FrameBuilder, decode_json, orjson
+
+
+def rowwise_frame(records: list, table_name: str) -> pd.DataFrame:
+    """Build the typed frame from a list of dicts, then convert columns in place"""
+    df = pd.DataFrame(records)
+    for field in DATABASE_SCHEMA[table_name]["fields"]:
+        column = field["name"]
+        if column not in df.columns:
+            continue
+        if field["type"] in DATE_FIELD_TYPES:
+            df[column] = pd.to_datetime(df[column], errors="coerce", utc=True, format="mixed").dt.tz_localize(None)
+        elif field["type"] in NUMBER_FIELD_TYPES:
+            df[column] = pd.to_numeric(df[column], errors="coerce")
+    df["pending_amount"] = df["total_fee"].fillna(0) - df["paid_amount"].fillna(0)
+    return df
+
+
+def rowwise_load(pages: list) -> pd.DataFrame:
+    """Decode every page with the stdlib, keep the rows, then build the frame"""
+    records = []
+    for page in pages:
+        records.extend(json.loads(page)['list'])
+    return rowwise_frame(records, 'students')
+
+
+def columnar_load(pages: list) -> pd.DataFrame:
+    """Decode each page with the fast decoder and split it into columns straight away"""
+    builder = FrameBuilder('students')
+    for page in pages:
+        builder.add(decode_json(page)['list'])
+    return builder.build()
+
+
+def measure(pages: list, load) -> tuple:
+    """Time a load and trace its peak memory in a second run"""
+    gc.collect()
+    started = time.perf_counter()
+    frame = load(pages)
+    elapsed = time.perf_counter() - started
+    del frame
+
+    gc.collect()
+    tracemalloc.start()
+    frame = load(pages)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del frame
+    return elapsed, peak
+
+
+def run(rows: int, page_size: int, repeat: int) -> tuple:
+    """Compare the row-wise and column-wise paths on the same list responses"""
+    students = make_students(rows)
+    pages = [json.dumps({'list': students[start:start + page_size],
+                         'pageInfo': {'totalRows': rows, 'isLastPage': start + page_size >= rows}}).encode()
+             for start in range(0, rows, page_size)]
+    del students
+
+    paths = [("json + row-wise", rowwise_load),
+             (f"{'orjson' if orjson else 'json'} + column-wise", columnar_load)]
+    results = []
+    for name, load in paths:
+        runs = [measure(pages, load) for _ in range(repeat)]
+        results.append((name, min(run[0] for run in runs), max(run[1] for run in runs)))
+    return len(pages), sum(len(page) for page in pages), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--page-size", type=int, default=EXPORT_CHUNK_SIZE)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    page_count, size, results = run(args.rows, args.page_size, args.repeat)
+    print(f"Students table of {args.rows} rows in {page_count} list responses "
+          f"({size / 1024 / 1024:.1f} MB), best of {args.repeat}")
+    print(f"{'Path':<26}{'Decode + build (ms)':>21}{'Peak (MB)':>11}")
+    for name, elapsed, peak in results:
+        print(f"{name:<26}{elapsed * 1000:>21.1f}{peak / 1024 / 1024:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Session latency benchmark
+Times a dashboard-style rerun of another session while a large Excel export runs
+in a server thread, and again while the same export runs in a worker process
+
+Run from the app directory:
+    python benchmarks/session_latency.py --rows 100000
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from benchmarks.synthetic import make_students
+from utils.exporter import _excel_workbook, schema_columns
+from utils.offload import ProcessOffloader
+from utils.snapshot import typed_frame
+
+# Students in the table the probe session's dashboard summarises
+PROBE_ROWS = 2000
+
+# Seconds between the probe session's reruns
+PROBE_INTERVAL = 0.1
+
+
+def dashboard_rerun(rows: list) -> None:
+    """Build the kind of frame and aggregates a dashboard rerun computes"""
+    students = typed_frame(rows, 'students')
+    students.groupby('category')['paid_amount'].sum()
+    students['status'].value_counts()
+    students.groupby('batch')['pending_amount'].agg(['sum', 'mean', 'count'])
+
+
+def probe(rows: list, until: threading.Event) -> list:
+    """Time a dashboard rerun every PROBE_INTERVAL seconds until told to stop"""
+    latencies = []
+    while not until.wait(PROBE_INTERVAL):
+        started = time.perf_counter()
+        dashboard_rerun(rows)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def measure(rows: list, export=None) -> tuple:
+    """Probe rerun latency while an export runs in a thread; returns latencies and export seconds"""
+    done = threading.Event()
+    latencies = []
+    prober = threading.Thread(target=lambda: latencies.extend(probe(rows, done)))
+    prober.start()
+
+    started = time.perf_counter()
+    if export is None:
+        time.sleep(2)
+    else:
+        exporter = threading.Thread(target=export)
+        exporter.start()
+        exporter.join()
+    elapsed = time.perf_counter() - started
+
+    done.set()
+    prober.join()
+    return latencies, elapsed
+
+
+def run(rows: int) -> list:
+    """Compare rerun latency with no export, a threaded export and an offloaded export"""
+    students = typed_frame(make_students(rows), 'students')
+    frames = {'Students': students}
+    columns = schema_columns('students', ['pending_amount'])
+    probe_rows = make_students(PROBE_ROWS, seed=1)
+    offloader = ProcessOffloader(max_workers=1, min_rows=0)
+
+    # Start the worker process before timing
+    offloader.run(_excel_workbook, {'Students': students.head(10)}, 'Students', columns)
+
+    scenarios = [
+        ("No export", None),
+        ("Export in thread", lambda: _excel_workbook(frames, 'Students', columns)),
+        ("Export in process", lambda: offloader.run(_excel_workbook, frames, 'Students', columns))
+    ]
+    results = []
+    for name, export in scenarios:
+        latencies, elapsed = measure(probe_rows, export)
+        latencies = np.array(latencies) * 1000
+        results.append((name, len(latencies), np.percentile(latencies, 50), np.percentile(latencies, 95),
+                        latencies.max(), elapsed))
+
+    offloader.shutdown()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    print(f"Dashboard reruns over {PROBE_ROWS} students during an Excel export of {args.rows} rows "
+          f"({os.cpu_count()} CPUs)")
+    print(f"{'Scenario':<20}{'Reruns':>8}{'p50 (ms)':>10}{'p95 (ms)':>10}{'Max (ms)':>10}{'Export (s)':>12}")
+    for name, count, p50, p95, worst, elapsed in run(args.rows):
+        print(f"{name:<20}{count:>8}{p50:>10.1f}{p95:>10.1f}{worst:>10.1f}{elapsed:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Synthetic NocoDB-style rows for benchmarks"""
+import random
+from datetime import date, datetime, timedelta
+from typing import Dict, List
+
+CATEGORIES = ["NEET Preparation", "JEE Main & Advanced", "UPSC Preparation", "Foundation Course"]
+BATCHES = ["NEET Morning Batch", "JEE Advanced Batch", "UPSC Foundation", "Foundation Evening"]
+STATUSES = ["Active", "Inactive", "Completed", "Dropped"]
+PAYMENT_METHODS = ["Cash", "UPI", "Bank Transfer", "Cheque", "Card", "Online"]
+
+
+def make_students(count: int, seed: int = 42) -> List[Dict]:
+    """Build student rows shaped like NocoDB JSON (dates as strings)"""
+    rng = random.Random(seed)
+    today = date.today()
+    rows = []
+    for i in range(1, count + 1):
+        category_index = rng.randrange(len(CATEGORIES))
+        total_fee = rng.choice([40000, 50000, 60000, 75000])
+        created = datetime.now() - timedelta(days=rng.randrange(720), minutes=rng.randrange(1440))
+        rows.append({
+            "id": i,
+            "full_name": f"Student {i}",
+            "parent_phone": f"9{rng.randrange(10**8, 10**9)}",
+            "student_phone": f"8{rng.randrange(10**8, 10**9)}",
+            "email": f"student{i}@example.com",
+            "address": f"{rng.randrange(1, 999)} Main Road, City {rng.randrange(50)}",
+            "date_of_birth": (today - timedelta(days=rng.randrange(15 * 365, 25 * 365))).isoformat(),
+            "category": CATEGORIES[category_index],
+            "batch": BATCHES[category_index],
+            "batch_id": category_index + 1,
+            "total_fee": total_fee,
+            "paid_amount": rng.randrange(0, total_fee + 1, 5000),
+            "discount": rng.choice([0, 0, 0, 2000, 5000]),
+            "fee_due_date": (today + timedelta(days=rng.randrange(-90, 90))).isoformat(),
+            "admission_date": created.date().isoformat(),
+            "status": rng.choice(STATUSES),
+            "notes": "",
+            "created_at": created.strftime("%Y-%m-%d %H:%M:%S"),
+            "updated_at": created.strftime("%Y-%m-%d %H:%M:%S")
+        })
+    return rows
+
+
+def make_payments(count: int, student_count: int, seed: int = 7) -> List[Dict]:
+    """Build payment rows shaped like NocoDB JSON (dates as strings)"""
+    rng = random.Random(seed)
+    today = date.today()
+    rows = []
+    for i in range(1, count + 1):
+        student_id = rng.randrange(1, student_count + 1)
+        rows.append({
+            "id": i,
+            "student_id": student_id,
+            "student_name": f"Student {student_id}",
+            "amount": rng.choice([2000, 5000, 10000, 15000, 25000]),
+            "payment_date": (today - timedelta(days=rng.randrange(720))).isoformat(),
+            "payment_method": rng.choice(PAYMENT_METHODS),
+            "transaction_id": f"TXN{i:08d}",
+            "notes": "",
+            "status": "Completed",
+            "created_at": f"{(today - timedelta(days=rng.randrange(720))).isoformat()} 10:00:00"
+        })
+    return rows
@@ -0,0 +1,88 @@
+"""
+Webhook event simulator
+Sends NocoDB-style record events to the webhook receiver and times how long each
+takes to show up in the cached students frame, against a full reload of the table
+
+Run from the app directory against an in-process receiver:
+    python benchmarks/webhook_events.py --rows 20000 --events 200
+
+Or send one event to a running app started with WEBHOOK_ENABLED=true:
+    python benchmarks/webhook_events.py --url http://127.0.0.1:8765/nocodb/webhook \
+        --action update --row '{"id": 1, "paid_amount": 50000}'
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from benchmarks.synthetic import make_students
+from utils.database import DatabaseManager
+from utils.webhooks import WebhookReceiver, nocodb_event, send_event, EVENT_INSERT, EVENT_UPDATE, EVENT_DELETE
+
+
+def simulate(rows: int, events: int) -> dict:
+    """Apply update, insert and delete events through an in-process receiver"""
+    db = DatabaseManager()
+    db.demo_students = make_students(rows)
+
+    started = time.perf_counter()
+    db.load_table_frame('students')
+    reload_seconds = time.perf_counter() - started
+    db.get_table_frame('students')
+
+    receiver = WebhookReceiver(port=0, secret="")
+    receiver.start(db)
+    latencies = {EVENT_UPDATE: [], EVENT_INSERT: [], EVENT_DELETE: []}
+    actions = [EVENT_UPDATE, EVENT_INSERT, EVENT_DELETE]
+
+    for i in range(events):
+        action = actions[i % len(actions)]
+        if action == EVENT_INSERT:
+            row = dict(make_students(1, seed=i)[0], id=rows + i + 1)
+        else:
+            row = {'id': i + 1, 'paid_amount': 1000 * i}
+
+        started = time.perf_counter()
+        send_event(receiver.url, nocodb_event('students', action, [row]))
+        students = db.get_table_frame('students')
+        elapsed = time.perf_counter() - started
+
+        present = (students['id'] == row['id']).any()
+        if present != (action != EVENT_DELETE):
+            raise AssertionError(f"{action} event for row {row['id']} was not applied")
+        latencies[action].append(elapsed)
+
+    receiver.stop()
+    return {'reload': reload_seconds, 'latencies': latencies, 'applied': receiver.events_applied}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--events", type=int, default=150)
+    parser.add_argument("--url", help="Send one event to this receiver instead of simulating")
+    parser.add_argument("--table", default="students")
+    parser.add_argument("--action", choices=[EVENT_INSERT, EVENT_UPDATE, EVENT_DELETE], default=EVENT_UPDATE)
+    parser.add_argument("--row", default='{"id": 1}', help="Row as JSON")
+    args = parser.parse_args()
+
+    if args.url:
+        status = send_event(args.url, nocodb_event(args.table, args.action, [json.loads(args.row)]))
+        print(f"{args.action} event for {args.table} -> HTTP {status}")
+        return
+
+    result = simulate(args.rows, args.events)
+    print(f"Students table of {args.rows} rows, {result['applied']} webhook events applied")
+    print(f"Full reload: {result['reload'] * 1000:.1f} ms")
+    print(f"{'Event':<10}{'Count':>8}{'p50 (ms)':>10}{'p95 (ms)':>10}")
+    for action, latencies in result['latencies'].items():
+        latencies = np.array(latencies) * 1000
+        print(f"{action:<10}{len(latencies):>8}{np.percentile(latencies, 50):>10.1f}{np.percentile(latencies, 95):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -62,7 +62,8 @@ PERFORMANCE_CONFIG = {
         "D": 40,
         "F": 0
     },
-    "attendance_minimum": 75.0  # Minimum attendance percentage required
+    "attendance_minimum": 75.0,  # Minimum attendance percentage required
+    "academic_year_start_month": 4  # Academic year runs from April
 }
 
 # Category Configuration
@@ -220,8 +221,17 @@ EduCRM Team"""
 
 # Report Configuration
 REPORT_CONFIG = {
-    "export_formats": ["Excel", "PDF", "CSV"],
+    "export_formats": ["Excel", "CSV", "Parquet", "PDF"],
     "max_records_per_export": 10000,
+    "bulk_report_workers": 4,
+    "report_job_workers": 2,
+    "report_job_cache_size": 32,
+    "offload_workers": 2,
+    "export_job_workers": 2,
+    "export_job_cache_size": 16,
+    "export_retention_minutes": 30,
+    "offload_min_rows": 5000,
+    "offload_excel_max_rows": 20000,  # Excel exports larger than this stream in the server process
     "default_date_format": "%d-%m-%Y",
     "default_datetime_format": "%d-%m-%Y %I:%M %p"
 }
@@ -232,7 +242,8 @@ SYSTEM_CONFIG = {
     "session_cleanup_interval": 24,  # hours
     "backup_retention_days": 30,
     "log_retention_days": 90,
-    "max_concurrent_users": 10
+    "max_concurrent_users": 10,
+    "min_free_disk_mb": 500
 }
 
 # Validation Rules
@@ -295,6 +306,7 @@ SUCCESS_MESSAGES = {
 # Dashboard Configuration
 DASHBOARD_CONFIG = {
     "refresh_interval": 300,  # seconds
+    "collection_rate_target": 90,  # percent
     "chart_colors": ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b"],
     "metrics_cards": [
         "total_students",
@@ -486,7 +498,15 @@ DATABASE_SCHEMA = {
 API_CONFIG = {
     "rate_limit_per_minute": 60,
     "bulk_operation_limit": 100,
-    "export_size_limit": 50000  # records
+    "export_size_limit": 50000,  # records
+    "request_timeout": 15,  # seconds
+    "breaker_failure_threshold": 3,
+    "breaker_slow_call_seconds": 5,
+    "breaker_retry_seconds": 15,
+    "stale_cache_entries": 512,
+    "health_probe_interval": 30,  # seconds
+    "health_sample_window": 120,  # probes
+    "health_latency_target_ms": 1000
 }
 
 # Feature Flags
@@ -507,7 +527,33 @@ FEATURE_FLAGS = {
 CACHE_CONFIG = {
     "enable_caching": True,
     "cache_ttl": 300,  # seconds
-    "max_cache_size": 100  # MB
+    "max_cache_size": 100,  # MB
+    "change_check_interval": 30,  # seconds between table fingerprint checks
+    # Table frames and aggregates are kept here across restarts, so use a directory that survives reboots
+    "shared_cache_dir": os.getenv("SHARED_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "educrm")),
+    "shared_cache_poll_seconds": 1
+}
+
+# Cache Warm-up Configuration
+WARMUP_CONFIG = {
+    "enabled": os.getenv("CACHE_WARMUP_ENABLED", "true").lower() == "true",
+    "on_start": True,
+    # Daily HH:MM times, e.g. "08:45,13:45", to warm the caches before staff log in
+    "times": [value.strip() for value in os.getenv("CACHE_WARMUP_TIMES", "08:45").split(",") if value.strip()],
+    "jitter_seconds": 300,  # random delay added to each run so processes do not warm at once
+    "max_workers": 2,  # tables loaded at the same time
+    "tables": ["students", "batches", "payments", "tests"],
+    "aggregates": ["fee_status", "revenue"]
+}
+
+# NocoDB Webhook Configuration
+WEBHOOK_CONFIG = {
+    "enabled": os.getenv("WEBHOOK_ENABLED", "false").lower() == "true",
+    "host": os.getenv("WEBHOOK_HOST", "127.0.0.1"),
+    "port": int(os.getenv("WEBHOOK_PORT", "8765")),
+    "path": "/nocodb/webhook",
+    "secret": os.getenv("WEBHOOK_SECRET", ""),  # sent by NocoDB in the x-webhook-secret header
+    "max_body_size": 5  # MB
 }
 
 # Logging Configuration
@@ -572,6 +618,8 @@ def get_config():
         "api": API_CONFIG,
         "features": FEATURE_FLAGS,
         "cache": CACHE_CONFIG,
+        "webhook": WEBHOOK_CONFIG,
+        "warmup": WARMUP_CONFIG,
         "logging": LOGGING_CONFIG,
         "security": SECURITY_CONFIG,
         "notifications": NOTIFICATION_CONFIG,
@@ -3,6 +3,9 @@ import pandas as pd
 from datetime import datetime
 from utils.database import DatabaseManager
 from utils.helpers import validate_phone_number, format_date
+from utils.exporter import get_export_formats
+from utils.export_jobs import export_jobs
+from utils.job_view import export_download, submit_job
 
 st.set_page_config(page_title="Student Management", page_icon="👨‍🎓", layout="wide")
 
@@ -161,14 +164,14 @@ with tab2:
             )
             
             # Export functionality
-            if st.button("📊 Export to Excel"):
-                excel_data = db.export_students_to_excel()
-                st.download_button(
-                    label="Download Excel File",
-                    data=excel_data,
-                    file_name=f"students_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
+            export_format = st.selectbox("Export format", get_export_formats(), key="students_export_format")
+            
+            if st.button("📊 Export Students"):
+                submit_job('students_export_job', export_jobs.submit_export(
+                    "Students", export_format, db.export_students, "students_export"
+                ))
+            
+            export_download('students_export_job', "Download Students")
         else:
             st.info("No students found matching the selected filters.")
     
@@ -3,6 +3,9 @@ import pandas as pd
 from datetime import datetime, date
 from utils.database import DatabaseManager
 from utils.helpers import format_date
+from utils.exporter import get_export_formats
+from utils.export_jobs import export_jobs
+from utils.job_view import export_download, submit_job
 
 st.set_page_config(page_title="Batch Management", page_icon="📚", layout="wide")
 
@@ -357,17 +360,14 @@ with tab4:
     col1, col2 = st.columns(2)
     
     with col1:
+        export_format = st.selectbox("Export format", get_export_formats(), key="batches_export_format")
+        
         if st.button("📊 Export All Batches"):
-            try:
-                excel_data = db.export_batches_to_excel()
-                st.download_button(
-                    label="Download Batches Export",
-                    data=excel_data,
-                    file_name=f"batches_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
-            except Exception as e:
-                st.error(f"Error exporting batches: {str(e)}")
+            submit_job('batches_export_job', export_jobs.submit_export(
+                "Batches", export_format, db.export_batches, "batches_export"
+            ))
+        
+        export_download('batches_export_job', "Download Batches Export")
     
     with col2:
         if st.button("🗑️ Archive Old Batches"):
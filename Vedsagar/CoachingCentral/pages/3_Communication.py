@@ -3,6 +3,11 @@ import pandas as pd
 from utils.database import DatabaseManager
 from utils.whatsapp import WhatsAppManager
 from utils.helpers import format_phone_number
+from utils.templates import template_compiler
+from utils.link_view import render_paged_links, clear_link_view
+from utils.exporter import get_export_formats
+from utils.export_jobs import export_jobs
+from utils.job_view import export_download, submit_job
 from datetime import datetime
 
 st.set_page_config(page_title="Communication Center", page_icon="📱", layout="wide")
@@ -51,7 +56,8 @@ with tab1:
                     selected_recipients.append({
                         'name': student['full_name'],
                         'phone': student['parent_phone'],
-                        'type': 'individual'
+                        'type': 'individual',
+                        'pending_amount': student.get('pending_amount', 0)
                     })
         else:
             st.warning("No students found. Please add students first.")
@@ -84,7 +90,8 @@ with tab1:
                             'name': student['full_name'],
                             'phone': student['parent_phone'],
                             'type': 'batch',
-                            'batch_name': batch_data['name']
+                            'batch_name': batch_data['name'],
+                            'pending_amount': student.get('pending_amount', 0)
                         })
                 else:
                     st.warning(f"No students found in batch '{batch_data['name']}'.")
@@ -136,7 +143,8 @@ with tab1:
                         selected_recipients.append({
                             'name': student['full_name'],
                             'phone': student['parent_phone'],
-                            'type': 'custom'
+                            'type': 'custom',
+                            'pending_amount': student.get('pending_amount', 0)
                         })
     
     # Message composition
@@ -195,35 +203,26 @@ with tab1:
             if not message_text.strip():
                 st.error("Please enter a message to send.")
             else:
-                st.subheader("WhatsApp Message Links")
-                st.info("Click on the links below to send messages via WhatsApp:")
-                
-                links_generated = 0
-                for recipient in selected_recipients:
-                    try:
-                        # Personalize message for each recipient
-                        personalized_message = wa.personalize_message(
-                            message_text,
-                            recipient['name'],
-                            recipient.get('batch_name', ''),
-                            include_name,
-                            include_batch,
-                            include_fees
-                        )
-                        
-                        # Generate WhatsApp link
-                        whatsapp_link = wa.generate_whatsapp_link(recipient['phone'], personalized_message)
-                        
-                        # Display link
-                        st.markdown(f"**{recipient['name']}** ({format_phone_number(recipient['phone'])})")
-                        st.link_button(f"📱 Send to {recipient['name']}", whatsapp_link)
-                        
-                        links_generated += 1
-                        
-                    except Exception as e:
-                        st.error(f"Error generating link for {recipient['name']}: {str(e)}")
-                
-                if links_generated > 0:
+                try:
+                    recipients_df = pd.DataFrame(selected_recipients)
+                    
+                    # Personalize all messages in one pass
+                    messages = wa.personalize_messages_bulk(
+                        message_text,
+                        recipients_df,
+                        name_column='name',
+                        batch_column='batch_name',
+                        include_name=include_name,
+                        include_batch=include_batch,
+                        include_fees=include_fees
+                    )
+                    
+                    labels = recipients_df['name'] + " (" + recipients_df['phone'].map(format_phone_number) + ")"
+                    links = wa.build_link_sheet(recipients_df, messages, name_column='name', phone_column='phone', label=labels)
+                    
+                    clear_link_view("send_links")
+                    st.session_state['send_links'] = links
+                    
                     # Log communication activity
                     try:
                         db.log_communication_activity({
@@ -235,7 +234,21 @@ with tab1:
                     except Exception as e:
                         st.warning(f"Message links generated but logging failed: {str(e)}")
                     
-                    st.success(f"✅ Generated {links_generated} WhatsApp message links!")
+                    st.success(f"✅ Generated {len(links)} WhatsApp message links!")
+                
+                except Exception as e:
+                    st.error(f"Error generating links: {str(e)}")
+        
+        # Paged WhatsApp links
+        if 'send_links' in st.session_state:
+            st.subheader("WhatsApp Message Links")
+            st.info("Click on the links below to send messages via WhatsApp:")
+            render_paged_links(st.session_state['send_links'], "send_links")
+            
+            if st.button("Clear Links", key="clear_send_links"):
+                clear_link_view("send_links")
+                del st.session_state['send_links']
+                st.rerun()
     else:
         st.info("Please select recipients to compose and send messages.")
 
@@ -260,6 +273,10 @@ with tab2:
                 if not template_name.strip() or not template_content.strip():
                     st.error("Template name and content are required.")
                 else:
+                    unknown_placeholders = template_compiler.compile(template_content).unknown_placeholders()
+                    if unknown_placeholders:
+                        st.warning(f"Unknown placeholders will be sent as-is: {', '.join('{' + name + '}' for name in unknown_placeholders)}")
+                    
                     try:
                         template_data = {
                             'name': template_name.strip(),
@@ -403,21 +420,19 @@ with tab3:
                                 batch_students = db.get_students_by_batch(batch['id'])
                                 
                                 if not batch_students.empty:
-                                    st.write("**WhatsApp Links for Batch Students:**")
+                                    batch_students = batch_students.assign(batch_name=batch['name'])
+                                    messages = wa.personalize_messages_bulk(
+                                        batch_message,
+                                        batch_students,
+                                        batch_column='batch_name',
+                                        include_name=True,
+                                        include_batch=True
+                                    )
+                                    labels = batch_students['full_name'] + " (" + batch_students['parent_phone'].map(format_phone_number) + ")"
                                     
-                                    for _, student in batch_students.iterrows():
-                                        personalized_msg = wa.personalize_message(
-                                            batch_message,
-                                            student['full_name'],
-                                            batch['name'],
-                                            True, True, False
-                                        )
-                                        
-                                        whatsapp_link = wa.generate_whatsapp_link(student['parent_phone'], personalized_msg)
-                                        st.link_button(
-                                            f"📱 {student['full_name']} ({format_phone_number(student['parent_phone'])})",
-                                            whatsapp_link
-                                        )
+                                    link_key = f"batch_links_{batch['id']}"
+                                    clear_link_view(link_key)
+                                    st.session_state[link_key] = wa.build_link_sheet(batch_students, messages, label=labels)
                                     
                                     st.success(f"✅ Generated WhatsApp links for {len(batch_students)} students!")
                                 else:
@@ -428,6 +443,15 @@ with tab3:
                         if cancel_batch_msg:
                             st.session_state['batch_msg_expanded'] = False
                             st.rerun()
+                    
+                    # Paged links for the batch
+                    if f"batch_links_{batch['id']}" in st.session_state:
+                        st.write("**WhatsApp Links for Batch Students:**")
+                        render_paged_links(
+                            st.session_state[f"batch_links_{batch['id']}"],
+                            f"batch_links_{batch['id']}",
+                            file_prefix=f"batch_links_{batch['id']}"
+                        )
                 
                 st.divider()
     else:
@@ -475,14 +499,14 @@ with tab4:
                 )
                 
                 # Export communication logs
+                export_format = st.selectbox("Export format", get_export_formats(), key="communication_export_format")
+                
                 if st.button("📊 Export Communication History"):
-                    excel_data = db.export_communication_logs_to_excel()
-                    st.download_button(
-                        label="Download Communication History",
-                        data=excel_data,
-                        file_name=f"communication_history_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                    )
+                    submit_job('communication_export_job', export_jobs.submit_export(
+                        "Communication Logs", export_format, db.export_communication_logs, "communication_history"
+                    ))
+                
+                export_download('communication_export_job', "Download Communication History")
             else:
                 st.info("No communication logs found for the selected period.")
         else:
@@ -1,10 +1,15 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from functools import partial
 from datetime import datetime, date, timedelta
 from utils.database import DatabaseManager
 from utils.whatsapp import WhatsAppManager
 from utils.helpers import format_currency, format_phone_number
+from utils.link_view import render_paged_links, clear_link_view
+from utils.exporter import get_export_formats
+from utils.export_jobs import export_jobs
+from utils.job_view import export_download, submit_job
 
 st.set_page_config(page_title="Fee Management", page_icon="💰", layout="wide")
 
@@ -170,7 +175,7 @@ with tab2:
                     with col2:
                         payment_amount = st.number_input(
                             "Payment Amount (₹) *",
-                            min_value=1,
+                            min_value=1.0,
                             max_value=float(selected_student['pending_amount']),
                             value=float(selected_student['pending_amount'])
                         )
@@ -340,6 +345,7 @@ with tab3:
                         overdue_students = filtered_pending[filtered_pending['days_overdue'] > 0]
                         if not overdue_students.empty:
                             st.session_state['bulk_reminder_overdue'] = overdue_students
+                            st.session_state.pop('bulk_reminder_overdue_links', None)
                             st.success(f"Prepared reminders for {len(overdue_students)} overdue students.")
                 
                 with col2:
@@ -350,57 +356,79 @@ with tab3:
                         ]
                         if not due_soon_students.empty:
                             st.session_state['bulk_reminder_due_soon'] = due_soon_students
+                            st.session_state.pop('bulk_reminder_due_soon_links', None)
                             st.success(f"Prepared reminders for {len(due_soon_students)} students due soon.")
                 
                 with col3:
+                    export_format = st.selectbox("Export format", get_export_formats(), key="pending_fees_export_format")
+                    
                     if st.button("📊 Export Pending Fees"):
-                        excel_data = db.export_pending_fees_to_excel(filtered_pending)
-                        st.download_button(
-                            label="Download Pending Fees Report",
-                            data=excel_data,
-                            file_name=f"pending_fees_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                        )
+                        submit_job('pending_fees_export_job', export_jobs.submit_export(
+                            "Pending Fees", export_format, partial(db.export_pending_fees, filtered_pending.copy()),
+                            "pending_fees",
+                            {'fee_range': fee_range, 'overdue': overdue_filter, 'category': category_filter,
+                             'date': date.today()}
+                        ))
+                    
+                    export_download('pending_fees_export_job', "Download Pending Fees Report")
                 
                 # Display bulk reminder links
                 if 'bulk_reminder_overdue' in st.session_state:
                     st.subheader("📱 Overdue Fee Reminder Links")
                     
-                    for _, student in st.session_state['bulk_reminder_overdue'].iterrows():
-                        reminder_message = wa.generate_overdue_fee_reminder(
-                            student['full_name'],
-                            student['pending_amount'],
-                            student['days_overdue']
-                        )
-                        
-                        whatsapp_link = wa.generate_whatsapp_link(student['parent_phone'], reminder_message)
-                        st.link_button(
-                            f"📱 {student['full_name']} - {format_currency(student['pending_amount'])} (Overdue: {student['days_overdue']} days)",
-                            whatsapp_link
+                    if 'bulk_reminder_overdue_links' not in st.session_state:
+                        overdue_students = st.session_state['bulk_reminder_overdue']
+                        messages = pd.Series([
+                            wa.generate_overdue_fee_reminder(name, amount, days)
+                            for name, amount, days in zip(
+                                overdue_students['full_name'],
+                                overdue_students['pending_amount'],
+                                overdue_students['days_overdue']
+                            )
+                        ], index=overdue_students.index)
+                        labels = (
+                            overdue_students['full_name'] + " - " +
+                            overdue_students['pending_amount'].map(format_currency) +
+                            " (Overdue: " + overdue_students['days_overdue'].astype(str) + " days)"
                         )
+                        clear_link_view("overdue_links")
+                        st.session_state['bulk_reminder_overdue_links'] = wa.build_link_sheet(overdue_students, messages, label=labels)
+                    
+                    render_paged_links(st.session_state['bulk_reminder_overdue_links'], "overdue_links", file_prefix="overdue_reminders")
                     
                     if st.button("Clear Overdue Reminders"):
                         del st.session_state['bulk_reminder_overdue']
+                        st.session_state.pop('bulk_reminder_overdue_links', None)
+                        clear_link_view("overdue_links")
                         st.rerun()
                 
                 if 'bulk_reminder_due_soon' in st.session_state:
                     st.subheader("📱 Due Soon Reminder Links")
                     
-                    for _, student in st.session_state['bulk_reminder_due_soon'].iterrows():
-                        reminder_message = wa.generate_due_soon_fee_reminder(
-                            student['full_name'],
-                            student['pending_amount'],
-                            student['fee_due_date']
-                        )
-                        
-                        whatsapp_link = wa.generate_whatsapp_link(student['parent_phone'], reminder_message)
-                        st.link_button(
-                            f"📱 {student['full_name']} - {format_currency(student['pending_amount'])} (Due: {student['fee_due_date']})",
-                            whatsapp_link
+                    if 'bulk_reminder_due_soon_links' not in st.session_state:
+                        due_soon_students = st.session_state['bulk_reminder_due_soon']
+                        messages = pd.Series([
+                            wa.generate_due_soon_fee_reminder(name, amount, due_date)
+                            for name, amount, due_date in zip(
+                                due_soon_students['full_name'],
+                                due_soon_students['pending_amount'],
+                                due_soon_students['fee_due_date']
+                            )
+                        ], index=due_soon_students.index)
+                        labels = (
+                            due_soon_students['full_name'] + " - " +
+                            due_soon_students['pending_amount'].map(format_currency) +
+                            " (Due: " + due_soon_students['fee_due_date'].astype(str) + ")"
                         )
+                        clear_link_view("due_soon_links")
+                        st.session_state['bulk_reminder_due_soon_links'] = wa.build_link_sheet(due_soon_students, messages, label=labels)
+                    
+                    render_paged_links(st.session_state['bulk_reminder_due_soon_links'], "due_soon_links", file_prefix="due_soon_reminders")
                     
                     if st.button("Clear Due Soon Reminders"):
                         del st.session_state['bulk_reminder_due_soon']
+                        st.session_state.pop('bulk_reminder_due_soon_links', None)
+                        clear_link_view("due_soon_links")
                         st.rerun()
             else:
                 st.info("No pending fees found matching the selected filters.")
@@ -522,24 +550,27 @@ with tab4:
                 st.info(f"Will send reminders to {len(target_students)} students")
                 
                 if st.button("📱 Generate Reminder Links", type="primary"):
-                    st.subheader("WhatsApp Reminder Links")
+                    due_dates = target_students['fee_due_date'] if 'fee_due_date' in target_students.columns else pd.Series(None, index=target_students.index)
+                    days_overdue = target_students['days_overdue'] if 'days_overdue' in target_students.columns else pd.Series(0, index=target_students.index)
                     
-                    for _, student in target_students.iterrows():
-                        reminder_message = wa.personalize_fee_reminder(
-                            template['content'],
-                            student['full_name'],
-                            student['pending_amount'],
-                            student['batch'],
-                            student.get('fee_due_date'),
-                            student.get('days_overdue', 0)
-                        )
-                        
-                        whatsapp_link = wa.generate_whatsapp_link(student['parent_phone'], reminder_message)
-                        
-                        st.link_button(
-                            f"📱 {student['full_name']} - {format_currency(student['pending_amount'])}",
-                            whatsapp_link
+                    messages = pd.Series([
+                        wa.personalize_fee_reminder(template['content'], name, amount, batch_name, due_date, days)
+                        for name, amount, batch_name, due_date, days in zip(
+                            target_students['full_name'],
+                            target_students['pending_amount'],
+                            target_students['batch'],
+                            due_dates,
+                            days_overdue
                         )
+                    ], index=target_students.index)
+                    labels = target_students['full_name'] + " - " + target_students['pending_amount'].map(format_currency)
+                    
+                    clear_link_view("template_reminder_links")
+                    st.session_state['template_reminder_links'] = wa.build_link_sheet(target_students, messages, label=labels)
+                
+                if 'template_reminder_links' in st.session_state:
+                    st.subheader("WhatsApp Reminder Links")
+                    render_paged_links(st.session_state['template_reminder_links'], "template_reminder_links", file_prefix="fee_reminders")
             else:
                 st.info("No students match the selected criteria.")
 
@@ -590,7 +621,7 @@ with tab5:
                     names='category',
                     title="Fee Collection by Category"
                 )
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(fig, use_container_width=True, key="category_report_chart")
                 
                 st.dataframe(report_data, use_container_width=True)
         
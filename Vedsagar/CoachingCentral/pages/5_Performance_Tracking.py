@@ -2,9 +2,11 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from utils.database import DatabaseManager
 from utils.helpers import format_date
+from utils.report_jobs import report_jobs
+from utils.job_view import finished_job, submit_job
 
 st.set_page_config(page_title="Performance Tracking", page_icon="📈", layout="wide")
 
@@ -22,6 +24,38 @@ if 'authenticated' not in st.session_state or not st.session_state.authenticated
 
 st.title("📈 Performance Tracking")
 
+# Progress report builders run on the report job workers; each reads its selections from job.params
+def build_individual_reports(job):
+    """Build the progress report of each selected student"""
+    students = job.params['students']
+    reports = []
+    for number, (student_id, student_name) in enumerate(students):
+        job.update(number / len(students), f"Building report for {student_name}")
+        reports.append((student_name, db.generate_individual_progress_report(
+            student_id, job.params['start_date'], job.params['end_date']
+        )))
+    return reports
+
+def build_batch_comparison(job):
+    """Collect the comparison figures of each selected batch"""
+    batches = job.params['batches']
+    comparison_data = []
+    for number, (batch_id, batch_name) in enumerate(batches):
+        job.update(number / len(batches), f"Comparing {batch_name}")
+        batch_stats = db.get_batch_comparison_stats(batch_id, job.params['start_date'], job.params['end_date'])
+        if batch_stats:
+            batch_stats['batch_name'] = batch_name
+            comparison_data.append(batch_stats)
+    return comparison_data
+
+def build_category_report(job):
+    """Build the category performance report"""
+    return db.generate_category_performance_report(job.params['start_date'], job.params['end_date'])
+
+def build_trend_analysis(job):
+    """Build the trend analysis report"""
+    return db.generate_trend_analysis_report(job.params['start_date'], job.params['end_date'])
+
 # Tabs for different performance features
 tab1, tab2, tab3, tab4, tab5 = st.tabs(["📝 Record Performance", "👤 Student Analytics", "📊 Batch Performance", "📋 Test Management", "📈 Progress Reports"])
 
@@ -140,6 +174,14 @@ with tab1:
                             existing_score = existing_scores[existing_scores['student_id'] == student_data['id']]
                             current_score = existing_score['marks_obtained'].iloc[0] if not existing_score.empty else 0
                             
+                            if not existing_score.empty:
+                                test_rank = db.get_student_test_rank(st.session_state['selected_test_id'], student_data['id'])
+                                if test_rank:
+                                    st.caption(
+                                        f"Current rank: #{test_rank['rank']} of {test_rank['total_students']} "
+                                        f"({test_rank['percentile']:.0f}th percentile)"
+                                    )
+                            
                             with st.form("individual_score_form"):
                                 marks_obtained = st.number_input(
                                     f"Marks for {selected_student}",
@@ -380,11 +422,12 @@ with tab3:
                     score_distribution = db.get_batch_score_distribution(batch_data['id'])
                     
                     if not score_distribution.empty:
-                        fig = px.histogram(
+                        fig = px.bar(
                             score_distribution,
-                            x='percentage',
-                            nbins=10,
-                            title="Score Distribution in Batch"
+                            x='score_range',
+                            y='count',
+                            title="Score Distribution in Batch",
+                            labels={'score_range': 'Score', 'count': 'Scores'}
                         )
                         st.plotly_chart(fig, use_container_width=True)
                 
@@ -407,10 +450,6 @@ with tab3:
                 batch_rankings = db.get_batch_student_rankings(batch_data['id'])
                 
                 if not batch_rankings.empty:
-                    # Add ranking
-                    batch_rankings['rank'] = batch_rankings['average_score'].rank(method='dense', ascending=False).astype(int)
-                    batch_rankings = batch_rankings.sort_values('rank')
-                    
                     st.dataframe(
                         batch_rankings[['rank', 'student_name', 'average_score', 'tests_taken', 'attendance_rate']],
                         use_container_width=True,
@@ -426,7 +465,7 @@ with tab3:
                 
                 # Identify top and struggling students
                 if not batch_rankings.empty:
-                    top_performers = batch_rankings.head(3)
+                    top_performers = db.get_batch_top_performers(batch_data['id'], 3)
                     struggling_students = batch_rankings[batch_rankings['average_score'] < 50]
                     
                     col1, col2 = st.columns(2)
@@ -630,14 +669,22 @@ with tab5:
             )
             
             if selected_students and st.button("Generate Individual Reports"):
-                for student_display in selected_students:
-                    student_index = students.apply(lambda x: f"{x['full_name']} - {x['batch']}", axis=1).tolist().index(student_display)
-                    student_data = students.iloc[student_index]
-                    
-                    st.subheader(f"📋 Progress Report: {student_data['full_name']}")
-                    
-                    # Generate individual report
-                    report_data = db.generate_individual_progress_report(student_data['id'], start_date, end_date)
+                student_labels = students.apply(lambda x: f"{x['full_name']} - {x['batch']}", axis=1).tolist()
+                selected_rows = [students.iloc[student_labels.index(student_display)] for student_display in selected_students]
+                submit_job('individual_report_job', report_jobs.submit(
+                    report_type,
+                    {
+                        'students': [(student_data['id'], student_data['full_name']) for student_data in selected_rows],
+                        'start_date': start_date,
+                        'end_date': end_date
+                    },
+                    build_individual_reports
+                ))
+            
+            individual_job = finished_job('individual_report_job')
+            if individual_job:
+                for student_name, report_data in individual_job.result:
+                    st.subheader(f"📋 Progress Report: {student_name}")
                     
                     if report_data:
                         # Summary metrics
@@ -659,7 +706,7 @@ with tab5:
                                 x='test_date',
                                 y='percentage',
                                 markers=True,
-                                title=f"Performance Trend - {student_data['full_name']}"
+                                title=f"Performance Trend - {student_name}"
                             )
                             st.plotly_chart(fig, use_container_width=True)
                         
@@ -680,16 +727,21 @@ with tab5:
             )
             
             if selected_batches and st.button("Generate Batch Comparison"):
-                comparison_data = []
-                
-                for batch_display in selected_batches:
-                    batch_index = batches.apply(lambda x: f"{x['name']} ({x['category']})", axis=1).tolist().index(batch_display)
-                    batch_data = batches.iloc[batch_index]
-                    
-                    batch_stats = db.get_batch_comparison_stats(batch_data['id'], start_date, end_date)
-                    if batch_stats:
-                        batch_stats['batch_name'] = batch_data['name']
-                        comparison_data.append(batch_stats)
+                batch_labels = batches.apply(lambda x: f"{x['name']} ({x['category']})", axis=1).tolist()
+                selected_rows = [batches.iloc[batch_labels.index(batch_display)] for batch_display in selected_batches]
+                submit_job('batch_comparison_job', report_jobs.submit(
+                    report_type,
+                    {
+                        'batches': [(batch_data['id'], batch_data['name']) for batch_data in selected_rows],
+                        'start_date': start_date,
+                        'end_date': end_date
+                    },
+                    build_batch_comparison
+                ))
+            
+            batch_job = finished_job('batch_comparison_job')
+            if batch_job:
+                comparison_data = batch_job.result
                 
                 if comparison_data:
                     comparison_df = pd.DataFrame(comparison_data)
@@ -730,7 +782,13 @@ with tab5:
     
     elif report_type == "Category Performance Report":
         if st.button("Generate Category Report"):
-            category_report = db.generate_category_performance_report(start_date, end_date)
+            submit_job('category_report_job', report_jobs.submit(
+                report_type, {'start_date': start_date, 'end_date': end_date}, build_category_report
+            ))
+        
+        category_job = finished_job('category_report_job')
+        if category_job:
+            category_report = category_job.result
             
             if not category_report.empty:
                 # Category performance chart
@@ -754,7 +812,13 @@ with tab5:
     
     elif report_type == "Trend Analysis Report":
         if st.button("Generate Trend Analysis"):
-            trend_data = db.generate_trend_analysis_report(start_date, end_date)
+            submit_job('trend_report_job', report_jobs.submit(
+                report_type, {'start_date': start_date, 'end_date': end_date}, build_trend_analysis
+            ))
+        
+        trend_job = finished_job('trend_report_job')
+        if trend_job:
+            trend_data = trend_job.result
             
             if trend_data:
                 # Overall trends
@@ -5,6 +5,9 @@ import plotly.graph_objects as go
 from datetime import datetime, date, timedelta
 from utils.database import DatabaseManager
 from utils.helpers import format_currency, format_date
+from utils.bulk_reports import BULK_REPORTS, get_bulk_report_formats
+from utils.report_jobs import report_jobs
+from utils.job_view import finished_job, submit_job
 
 st.set_page_config(page_title="Reports & Analytics", page_icon="📊", layout="wide")
 
@@ -22,6 +25,46 @@ if 'authenticated' not in st.session_state or not st.session_state.authenticated
 
 st.title("📊 Reports & Analytics")
 
+# Report builders run on the report job workers; each reads its filters from job.params
+def build_dashboard_report(job):
+    """Load the KPIs, trends and category overview of the dashboard report"""
+    start, end = job.params['start_date'], job.params['end_date']
+    return job.run_steps({
+        'kpi': lambda: db.get_kpi_data(start, end),
+        'revenue_trend': lambda: db.get_revenue_trend_data(start, end),
+        'enrollment_trend': lambda: db.get_enrollment_trend_data(start, end),
+        'category_performance': lambda: db.get_category_performance_summary(start, end)
+    })
+
+REPORT_LOADERS = {
+    "Student Demographics Report": lambda p: db.get_student_demographics(p['category'], p['batch']),
+    "Enrollment Analysis": lambda p: db.get_enrollment_analysis(p['category'], p['batch'], p['date_range']),
+    "Attendance Report": lambda p: db.get_attendance_report(p['category'], p['batch'], p['date_range']),
+    "Revenue Analysis": lambda p: db.get_detailed_revenue_analysis(p['start_date'], p['end_date']),
+    "Fee Collection Report": lambda p: db.get_fee_collection_analysis(p['start_date'], p['end_date']),
+    "Outstanding Dues Report": lambda p: db.get_outstanding_dues_analysis(),
+    "Overall Performance Analysis": lambda p: db.get_overall_performance_analysis(p['category'], p['period']),
+    "Subject-wise Performance": lambda p: db.get_subject_wise_performance(p['category'], p['period']),
+    "Test Analysis Report": lambda p: db.get_test_analysis_report(p['category'], p['period']),
+    "Top Performers Report": lambda p: (
+        db.get_top_performers_report(p['category'], p['period']),
+        db.get_category_wise_toppers(p['period']) if p['category'] == "All Categories" else pd.DataFrame()
+    ),
+    "User Activity Report": lambda p: db.get_user_activity_report(),
+    "Database Health Report": lambda p: db.get_database_health_report(),
+    "Communication Log Report": lambda p: db.get_communication_log_report(),
+    "System Usage Analytics": lambda p: db.get_system_usage_analytics()
+}
+
+def build_report(job):
+    """Load the data of one report selected by name"""
+    loader = REPORT_LOADERS.get(job.report_type)
+    return loader(job.params) if loader else None
+
+def build_bulk_reports(job):
+    """Generate the selected bulk reports into one download"""
+    return db.generate_bulk_reports(job.params['reports'], job.params['format'], job.update)
+
 # Tabs for different report categories
 tab1, tab2, tab3, tab4, tab5 = st.tabs(["📈 Dashboard Reports", "👥 Student Reports", "💰 Financial Reports", "📚 Academic Reports", "🔧 System Reports"])
 
@@ -36,11 +79,19 @@ with tab1:
         end_date = st.date_input("Report End Date", value=date.today())
     
     if st.button("Generate Dashboard Report", type="primary"):
+        submit_job('dashboard_report_job', report_jobs.submit(
+            "Dashboard Report", {'start_date': start_date, 'end_date': end_date}, build_dashboard_report
+        ))
+    
+    dashboard_job = finished_job('dashboard_report_job')
+    if dashboard_job:
+        dashboard = dashboard_job.result
+        report_start, report_end = dashboard_job.params['start_date'], dashboard_job.params['end_date']
         try:
             # Key Performance Indicators
             st.subheader("🎯 Key Performance Indicators")
             
-            kpi_data = db.get_kpi_data(start_date, end_date)
+            kpi_data = dashboard['kpi']
             
             if kpi_data:
                 col1, col2, col3, col4 = st.columns(4)
@@ -63,7 +114,7 @@ with tab1:
                     st.metric(
                         "Collection Rate",
                         f"{kpi_data.get('collection_rate', 0):.1f}%",
-                        delta=f"{kpi_data.get('collection_change', 0)}% vs target"
+                        delta=f"{kpi_data.get('collection_vs_target', 0)}% vs target"
                     )
                 
                 with col4:
@@ -78,7 +129,7 @@ with tab1:
             
             with col1:
                 st.subheader("💰 Revenue Trend")
-                revenue_data = db.get_revenue_trend_data(start_date, end_date)
+                revenue_data = dashboard['revenue_trend']
                 
                 if not revenue_data.empty:
                     fig = px.line(
@@ -95,7 +146,7 @@ with tab1:
             
             with col2:
                 st.subheader("👥 Enrollment Trend")
-                enrollment_data = db.get_enrollment_trend_data(start_date, end_date)
+                enrollment_data = dashboard['enrollment_trend']
                 
                 if not enrollment_data.empty:
                     fig = px.bar(
@@ -110,7 +161,7 @@ with tab1:
             
             # Category Performance Overview
             st.subheader("📚 Category Performance Overview")
-            category_performance = db.get_category_performance_summary(start_date, end_date)
+            category_performance = dashboard['category_performance']
             
             if not category_performance.empty:
                 # Performance comparison chart
@@ -136,11 +187,11 @@ with tab1:
             
             # Export dashboard report
             if st.button("📊 Export Dashboard Report"):
-                excel_data = db.export_dashboard_report(start_date, end_date)
+                excel_data = db.export_dashboard_report(report_start, report_end)
                 st.download_button(
                     label="Download Dashboard Report",
                     data=excel_data,
-                    file_name=f"dashboard_report_{start_date}_{end_date}.xlsx",
+                    file_name=f"dashboard_report_{report_start}_{report_end}.xlsx",
                     mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
                 )
         
@@ -190,11 +241,23 @@ with tab2:
         )
     
     if st.button("Generate Student Report"):
+        submit_job('student_report_job', report_jobs.submit(
+            student_report_type,
+            {'category': category_filter, 'batch': batch_filter, 'date_range': date_range},
+            build_report
+        ))
+    
+    student_job = finished_job('student_report_job')
+    if student_job:
+        student_report_type = student_job.report_type
+        category_filter = student_job.params['category']
+        batch_filter = student_job.params['batch']
+        date_range = student_job.params['date_range']
         try:
             if student_report_type == "Student Demographics Report":
                 st.subheader("👥 Student Demographics")
                 
-                demographics = db.get_student_demographics(category_filter, batch_filter)
+                demographics = student_job.result
                 
                 if not demographics.empty:
                     # Age distribution
@@ -237,7 +300,7 @@ with tab2:
             elif student_report_type == "Enrollment Analysis":
                 st.subheader("📈 Enrollment Analysis")
                 
-                enrollment_data = db.get_enrollment_analysis(category_filter, batch_filter, date_range)
+                enrollment_data = student_job.result
                 
                 if not enrollment_data.empty:
                     # Monthly enrollment trend
@@ -265,7 +328,7 @@ with tab2:
             elif student_report_type == "Attendance Report":
                 st.subheader("📅 Attendance Analysis")
                 
-                attendance_data = db.get_attendance_report(category_filter, batch_filter, date_range)
+                attendance_data = student_job.result
                 
                 if not attendance_data.empty:
                     # Overall attendance statistics
@@ -338,11 +401,19 @@ with tab3:
         fin_end_date = st.date_input("To Date", value=date.today(), key="fin_end")
     
     if st.button("Generate Financial Report"):
+        submit_job('financial_report_job', report_jobs.submit(
+            financial_report_type, {'start_date': fin_start_date, 'end_date': fin_end_date}, build_report
+        ))
+    
+    financial_job = finished_job('financial_report_job')
+    if financial_job:
+        financial_report_type = financial_job.report_type
+        fin_start_date, fin_end_date = financial_job.params['start_date'], financial_job.params['end_date']
         try:
             if financial_report_type == "Revenue Analysis":
                 st.subheader("💰 Revenue Analysis")
                 
-                revenue_data = db.get_detailed_revenue_analysis(fin_start_date, fin_end_date)
+                revenue_data = financial_job.result
                 
                 if revenue_data:
                     # Key financial metrics
@@ -384,7 +455,7 @@ with tab3:
             elif financial_report_type == "Fee Collection Report":
                 st.subheader("💳 Fee Collection Analysis")
                 
-                collection_data = db.get_fee_collection_analysis(fin_start_date, fin_end_date)
+                collection_data = financial_job.result
                 
                 if collection_data:
                     # Collection summary
@@ -420,7 +491,7 @@ with tab3:
             elif financial_report_type == "Outstanding Dues Report":
                 st.subheader("⚠️ Outstanding Dues Analysis")
                 
-                dues_data = db.get_outstanding_dues_analysis()
+                dues_data = financial_job.result
                 
                 if dues_data:
                     # Dues summary
@@ -501,11 +572,19 @@ with tab4:
         )
     
     if st.button("Generate Academic Report"):
+        submit_job('academic_report_job', report_jobs.submit(
+            academic_report_type, {'category': academic_category, 'period': academic_period}, build_report
+        ))
+    
+    academic_job = finished_job('academic_report_job')
+    if academic_job:
+        academic_report_type = academic_job.report_type
+        academic_category, academic_period = academic_job.params['category'], academic_job.params['period']
         try:
             if academic_report_type == "Overall Performance Analysis":
                 st.subheader("📊 Overall Performance Analysis")
                 
-                performance_data = db.get_overall_performance_analysis(academic_category, academic_period)
+                performance_data = academic_job.result
                 
                 if performance_data:
                     # Performance metrics
@@ -544,7 +623,7 @@ with tab4:
             elif academic_report_type == "Subject-wise Performance":
                 st.subheader("📖 Subject-wise Performance Analysis")
                 
-                subject_data = db.get_subject_wise_performance(academic_category, academic_period)
+                subject_data = academic_job.result
                 
                 if not subject_data.empty:
                     # Subject performance comparison
@@ -570,7 +649,7 @@ with tab4:
             elif academic_report_type == "Test Analysis Report":
                 st.subheader("📝 Test Analysis Report")
                 
-                test_analysis = db.get_test_analysis_report(academic_category, academic_period)
+                test_analysis = academic_job.result
                 
                 if test_analysis:
                     # Test statistics
@@ -598,7 +677,7 @@ with tab4:
             elif academic_report_type == "Top Performers Report":
                 st.subheader("🏆 Top Performers Report")
                 
-                top_performers = db.get_top_performers_report(academic_category, academic_period)
+                top_performers, category_toppers = academic_job.result
                 
                 if not top_performers.empty:
                     # Top 10 performers
@@ -630,7 +709,6 @@ with tab4:
                     # Category-wise toppers
                     if academic_category == "All Categories":
                         st.subheader("🎯 Category-wise Toppers")
-                        category_toppers = db.get_category_wise_toppers(academic_period)
                         
                         if not category_toppers.empty:
                             st.dataframe(
@@ -671,11 +749,18 @@ with tab5:
     )
     
     if st.button("Generate System Report"):
+        submit_job('system_report_job', report_jobs.submit(
+            system_report_type, {}, build_report, cache=False
+        ))
+    
+    system_job = finished_job('system_report_job')
+    if system_job:
+        system_report_type = system_job.report_type
         try:
             if system_report_type == "User Activity Report":
                 st.subheader("👤 User Activity Report")
                 
-                activity_data = db.get_user_activity_report()
+                activity_data = system_job.result
                 
                 if activity_data:
                     # Activity metrics
@@ -702,7 +787,7 @@ with tab5:
             elif system_report_type == "Database Health Report":
                 st.subheader("🗄️ Database Health Report")
                 
-                db_health = db.get_database_health_report()
+                db_health = system_job.result
                 
                 if db_health:
                     # Database metrics
@@ -731,7 +816,7 @@ with tab5:
             elif system_report_type == "Communication Log Report":
                 st.subheader("📱 Communication Log Report")
                 
-                comm_logs = db.get_communication_log_report()
+                comm_logs = system_job.result
                 
                 if comm_logs:
                     # Communication metrics
@@ -767,7 +852,7 @@ with tab5:
             elif system_report_type == "System Usage Analytics":
                 st.subheader("📈 System Usage Analytics")
                 
-                usage_data = db.get_system_usage_analytics()
+                usage_data = system_job.result
                 
                 if usage_data:
                     # Usage metrics
@@ -832,6 +917,50 @@ with tab5:
                     performance_status = "✅ Good" if health_status.get('performance', True) else "⚠️ Slow"
                     st.metric("Performance", performance_status)
                 
+                if health_status.get('checked_at'):
+                    col1, col2, col3, col4 = st.columns(4)
+                    
+                    with col1:
+                        st.metric("Latency p50", f"{health_status['p50_ms']:.0f} ms" if health_status['p50_ms'] is not None else "N/A")
+                    
+                    with col2:
+                        st.metric("Latency p95", f"{health_status['p95_ms']:.0f} ms" if health_status['p95_ms'] is not None else "N/A")
+                    
+                    with col3:
+                        st.metric("Availability", f"{health_status['availability']:.1f}%")
+                    
+                    with col4:
+                        st.metric("Last Probe", datetime.fromtimestamp(health_status['checked_at']).strftime('%I:%M:%S %p'))
+                
+                cache = health_status.get('cache')
+                if cache:
+                    used_mb = cache['total_bytes'] / (1024 * 1024)
+                    budget_mb = cache['max_bytes'] / (1024 * 1024)
+                    with st.expander(f"Cache memory: {used_mb:.1f} of {budget_mb:.0f} MB"):
+                        warmup = cache.get('warmup') or {}
+                        if warmup.get('last_run_at'):
+                            warmed = datetime.fromtimestamp(warmup['last_run_at']).strftime('%I:%M %p')
+                            upcoming = (datetime.fromtimestamp(warmup['next_run_at']).strftime('%d %b %I:%M %p')
+                                        if warmup.get('next_run_at') else "not scheduled")
+                            st.caption(f"Caches warmed at {warmed} in {warmup['last_seconds']:.1f}s; next warm-up {upcoming}")
+                        st.dataframe(
+                            pd.DataFrame([
+                                {
+                                    'Cache': name.replace('_', ' ').title(),
+                                    'Entries': usage['entries'],
+                                    'Size (MB)': usage['bytes'] / (1024 * 1024),
+                                    'Hits': usage['hits'],
+                                    'Evictions': usage['evictions']
+                                }
+                                for name, usage in cache['namespaces'].items()
+                            ]),
+                            use_container_width=True,
+                            hide_index=True,
+                            column_config={
+                                "Size (MB)": st.column_config.NumberColumn("Size (MB)", format="%.2f")
+                            }
+                        )
+                
                 # Recommendations
                 if 'recommendations' in health_status and health_status['recommendations']:
                     st.subheader("💡 System Recommendations")
@@ -851,41 +980,45 @@ with col1:
     st.write("**Generate Multiple Reports**")
     selected_reports = st.multiselect(
         "Select reports to generate",
-        [
-            "Dashboard Summary",
-            "Student Demographics",
-            "Financial Summary", 
-            "Academic Performance",
-            "Fee Collection Status",
-            "Communication Logs"
-        ]
+        list(BULK_REPORTS.keys())
     )
 
 with col2:
     st.write("**Report Format**")
-    report_format = st.radio("Output Format", ["Excel (.xlsx)", "PDF Report", "CSV Files"])
+    report_format = st.radio("Output Format", get_bulk_report_formats())
     
     if st.button("Generate Selected Reports", type="primary"):
         if selected_reports:
-            try:
-                # Generate bulk reports
-                with st.spinner("Generating reports..."):
-                    bulk_data = db.generate_bulk_reports(selected_reports, report_format)
-                
-                if bulk_data:
-                    st.success(f"✅ Generated {len(selected_reports)} reports successfully!")
-                    
-                    # Provide download link
-                    st.download_button(
-                        label="📊 Download Bulk Reports",
-                        data=bulk_data,
-                        file_name=f"bulk_reports_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip",
-                        mime="application/zip"
-                    )
-                else:
-                    st.error("Failed to generate bulk reports.")
-            
-            except Exception as e:
-                st.error(f"Error generating bulk reports: {str(e)}")
+            submit_job('bulk_report_job', report_jobs.submit(
+                "Bulk Reports", {'reports': selected_reports, 'format': report_format}, build_bulk_reports
+            ))
         else:
             st.warning("Please select at least one report to generate.")
+    
+    bulk_job = finished_job('bulk_report_job')
+    if bulk_job:
+        bulk_result = bulk_job.result
+        
+        if bulk_result:
+            generated = len(bulk_job.params['reports']) - len(bulk_result['errors'])
+            st.success(f"✅ Generated {generated} reports in {bulk_result['total_seconds']:.2f}s!")
+            
+            for report_name, error in bulk_result['errors'].items():
+                st.warning(f"{report_name}: {error}")
+            
+            # Provide download link
+            st.download_button(
+                label="📊 Download Bulk Reports",
+                data=bulk_result['data'],
+                file_name=bulk_result['file_name'],
+                mime=bulk_result['mime']
+            )
+            
+            # Per-report timing
+            st.caption(
+                f"Data snapshot loaded in {bulk_result['snapshot_seconds']:.2f}s, "
+                f"files assembled in {bulk_result['assemble_seconds']:.2f}s"
+            )
+            st.dataframe(bulk_result['timings'], use_container_width=True, hide_index=True)
+        else:
+            st.error("Failed to generate bulk reports.")
@@ -0,0 +1,489 @@
+import time
+import threading
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from config.settings import CACHE_CONFIG, PERFORMANCE_CONFIG
+from utils.cache_manager import cache_manager
+from utils.exporter import export_engine, report_sheets
+from utils.performance_analytics import SCORE_BINS
+
+ALL_CATEGORIES = "All Categories"
+DEFAULT_SUBJECT = "General"
+
+# Time period filter -> days back from today ("Academic Year" and "All Time" are handled separately)
+PERIOD_DAYS = {
+    "Last Month": 30,
+    "Last Quarter": 91,
+    "Last 6 Months": 182
+}
+
+TOP_PERFORMERS_LIMIT = 25
+TOPPERS_PER_CATEGORY = 3
+
+# Tables the academic index is built from
+INDEX_TABLES = ['students', 'tests', 'test_scores']
+
+
+def _period_start(period: str, today: pd.Timestamp) -> Optional[pd.Timestamp]:
+    """Get the first day a time period filter keeps"""
+    if period in PERIOD_DAYS:
+        return today - pd.Timedelta(days=PERIOD_DAYS[period])
+    if period == "Academic Year":
+        start_month = PERFORMANCE_CONFIG["academic_year_start_month"]
+        year = today.year if today.month >= start_month else today.year - 1
+        return pd.Timestamp(year=year, month=start_month, day=1)
+    return None
+
+
+def _top_k(values: np.ndarray, k: int) -> np.ndarray:
+    """Get the positions of the k largest values, largest first, without sorting them all"""
+    k = min(k, len(values))
+    if k == 0:
+        return np.zeros(0, dtype=np.int64)
+    top = np.argpartition(-values, k - 1)[:k]
+    return top[np.argsort(-values[top], kind='stable')]
+
+
+class PerformanceMatrix:
+    """
+    Student x subject totals of percentage scores for one filter
+    Layers hold sums, sums of squares, counts and passes so averages, spread and pass rates are array maths
+    """
+
+    def __init__(self, students: int, subjects: int):
+        shape = (students, subjects)
+        self.sums = np.zeros(shape)
+        self.squares = np.zeros(shape)
+        self.counts = np.zeros(shape)
+        self.passes = np.zeros(shape)
+
+    @classmethod
+    def from_scores(cls, students: int, subjects: int, student_idx: np.ndarray, subject_idx: np.ndarray,
+                    percentages: np.ndarray, passing: float) -> "PerformanceMatrix":
+        """Total a set of scores into a new matrix"""
+        matrix = cls(students, subjects)
+        cells = student_idx * subjects + subject_idx
+        size = students * subjects
+        matrix.sums = np.bincount(cells, weights=percentages, minlength=size).reshape(students, subjects)
+        matrix.squares = np.bincount(cells, weights=percentages ** 2, minlength=size).reshape(students, subjects)
+        matrix.counts = np.bincount(cells, minlength=size).astype(float).reshape(students, subjects)
+        matrix.passes = np.bincount(cells, weights=percentages >= passing, minlength=size).reshape(students, subjects)
+        return matrix
+
+    def apply(self, student: int, subject: int, percentage: float, passing: float, sign: int) -> None:
+        """Add (sign 1) or take out (sign -1) one score"""
+        self.sums[student, subject] += sign * percentage
+        self.squares[student, subject] += sign * percentage ** 2
+        self.counts[student, subject] += sign
+        self.passes[student, subject] += sign * (percentage >= passing)
+
+    def student_figures(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Get each student's score count, average and standard deviation"""
+        counts = self.counts.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            averages = self.sums.sum(axis=1) / counts
+            spread = np.sqrt(np.maximum(self.squares.sum(axis=1) / counts - averages ** 2, 0))
+        return counts, averages, spread
+
+
+class AcademicIndex:
+    """
+    Score arrays keyed by student, test and subject indexes, with cached performance matrices per filter
+    Score saves update the arrays and every cached matrix in place
+    """
+
+    def __init__(self, students: pd.DataFrame, tests: pd.DataFrame, scores: pd.DataFrame,
+                 today: Optional[date] = None):
+        self.built_at = time.time()
+        self.today = pd.Timestamp(today or date.today())
+        self.passing = PERFORMANCE_CONFIG["default_passing_marks"]
+        self._lock = threading.RLock()
+        self._masks: Dict[Tuple[str, str], np.ndarray] = {}
+        self._matrices: Dict[Tuple[str, str], PerformanceMatrix] = {}
+
+        self._index_tests(tests)
+        self._index_students(students, scores)
+        self._index_scores(scores)
+
+    def _index_tests(self, tests: pd.DataFrame) -> None:
+        """Give each test an index and keep its date, category, subject and max marks as arrays"""
+        if tests.empty or 'id' not in tests.columns:
+            tests = pd.DataFrame(columns=['id', 'name', 'date', 'max_marks', 'category', 'subject'])
+        tests = tests.dropna(subset=['id']).drop_duplicates('id').reset_index(drop=True)
+
+        subjects = tests['subject'].fillna(DEFAULT_SUBJECT) if 'subject' in tests.columns \
+            else pd.Series(DEFAULT_SUBJECT, index=tests.index)
+        self.subject_names, subject_codes = np.unique(subjects.astype(str).to_numpy(), return_inverse=True)
+        self.subject_names = list(self.subject_names) or [DEFAULT_SUBJECT]
+
+        self.test_ids = tests['id'].astype(int).to_numpy()
+        self.test_positions = {test_id: position for position, test_id in enumerate(self.test_ids)}
+        self.test_names = tests['name'].fillna('').to_numpy() if 'name' in tests.columns else np.full(len(tests), '')
+        self.test_days = pd.to_datetime(tests.get('date'), errors='coerce').to_numpy(dtype='datetime64[ns]') \
+            if 'date' in tests.columns else np.full(len(tests), np.datetime64('NaT'), dtype='datetime64[ns]')
+        self.test_max = pd.to_numeric(tests['max_marks'], errors='coerce').to_numpy(dtype=float) \
+            if 'max_marks' in tests.columns else np.full(len(tests), np.nan)
+        self.test_categories = tests['category'].fillna('Unknown').to_numpy() if 'category' in tests.columns \
+            else np.full(len(tests), 'Unknown')
+        self.test_subjects = subject_codes.astype(np.int64)
+
+        months = pd.Series(self.test_days).dt.to_period('M')
+        self.month_names, month_codes = np.unique(months.astype(str).where(months.notna(), '').to_numpy(),
+                                                  return_inverse=True)
+        self.test_months = month_codes.astype(np.int64)
+
+    def _index_students(self, students: pd.DataFrame, scores: pd.DataFrame) -> None:
+        """Give each student an index, including students only seen in scores"""
+        ids = students['id'].dropna().astype(int).tolist() if 'id' in students.columns else []
+        if not scores.empty and 'student_id' in scores.columns:
+            ids += scores['student_id'].dropna().astype(int).tolist()
+        self.student_ids = np.array(list(dict.fromkeys(ids)), dtype=np.int64)
+        self.student_positions = {student_id: position for position, student_id in enumerate(self.student_ids)}
+
+        names = students.drop_duplicates('id').set_index('id') if 'id' in students.columns else pd.DataFrame()
+        lookup = pd.Index(self.student_ids)
+        self.student_names = (names['full_name'].reindex(lookup) if 'full_name' in names.columns
+                              else pd.Series(None, index=lookup, dtype=object))
+        self.student_names = self.student_names.fillna(pd.Series('Student ' + lookup.astype(str), index=lookup)).to_numpy()
+        self.student_categories = (names['category'].reindex(lookup).fillna('Unknown').to_numpy()
+                                   if 'category' in names.columns else np.full(len(lookup), 'Unknown'))
+
+    def _index_scores(self, scores: pd.DataFrame) -> None:
+        """Keep one row per score as student, test and subject indexes with its percentage"""
+        self.score_students = np.zeros(0, dtype=np.int64)
+        self.score_tests = np.zeros(0, dtype=np.int64)
+        self.score_percentages = np.zeros(0)
+        self.score_present = np.zeros(0, dtype=bool)
+        # Sorted student x test keys of the loaded scores, and their positions
+        self._score_keys = np.zeros(0, dtype=np.int64)
+        self._score_key_positions = np.zeros(0, dtype=np.int64)
+        # Scores saved since loading: (student, test) -> position, and rows not yet in the arrays
+        self._added_positions: Dict[Tuple[int, int], int] = {}
+        self._added_rows: List[List[Any]] = []
+        if scores.empty or not {'test_id', 'student_id'} <= set(scores.columns):
+            return
+
+        scores = scores.dropna(subset=['test_id', 'student_id'])
+        tests = scores['test_id'].astype(int).map(self.test_positions)
+        scores, tests = scores[tests.notna()], tests[tests.notna()].astype(np.int64).to_numpy()
+        # Keep the latest row when a score was saved twice
+        students = scores['student_id'].astype(int).map(self.student_positions).to_numpy(dtype=np.int64)
+        keys = pd.MultiIndex.from_arrays([students, tests])
+        latest = ~keys.duplicated(keep='last')
+
+        marks = pd.to_numeric(scores['marks_obtained'], errors='coerce').to_numpy(dtype=float) \
+            if 'marks_obtained' in scores.columns else np.full(len(scores), np.nan)
+        present = (scores['attendance'].fillna('Present') != 'Absent').to_numpy() \
+            if 'attendance' in scores.columns else np.ones(len(scores), dtype=bool)
+        max_marks = self.test_max[tests]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            percentages = np.where(max_marks > 0, marks / max_marks * 100, np.nan)
+
+        self.score_students = students[latest]
+        self.score_tests = tests[latest]
+        self.score_percentages = percentages[latest]
+        self.score_present = present[latest]
+        keys = self.score_students * len(self.test_ids) + self.score_tests
+        self._score_key_positions = np.argsort(keys, kind='stable')
+        self._score_keys = keys[self._score_key_positions]
+
+    def _score_position(self, student: int, test: int) -> Optional[int]:
+        """Find where a student's score for a test is kept"""
+        position = self._added_positions.get((student, test))
+        if position is not None:
+            return position
+        key = student * len(self.test_ids) + test
+        found = int(np.searchsorted(self._score_keys, key))
+        if found < len(self._score_keys) and self._score_keys[found] == key:
+            return int(self._score_key_positions[found])
+        return None
+
+    def _flush(self) -> None:
+        """Move scores saved since the last read into the score arrays in one append"""
+        if not self._added_rows:
+            return
+        students, tests, percentages, present = zip(*self._added_rows)
+        self.score_students = np.concatenate([self.score_students, np.array(students, dtype=np.int64)])
+        self.score_tests = np.concatenate([self.score_tests, np.array(tests, dtype=np.int64)])
+        self.score_percentages = np.concatenate([self.score_percentages, np.array(percentages, dtype=float)])
+        self.score_present = np.concatenate([self.score_present, np.array(present, dtype=bool)])
+        self._added_rows = []
+
+    def test_mask(self, category: str, period: str) -> np.ndarray:
+        """Get the tests in a category and time period, cached per filter"""
+        key = (category, period)
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = np.ones(len(self.test_ids), dtype=bool)
+            if category and category != ALL_CATEGORIES:
+                mask &= self.test_categories == category
+            start = _period_start(period, self.today)
+            if start is not None:
+                mask &= self.test_days >= np.datetime64(start)
+            self._masks[key] = mask
+        return mask
+
+    def _scored(self, category: str, period: str) -> np.ndarray:
+        """Get the positions of counted scores (present, with a percentage) in tests matching a filter"""
+        with self._lock:
+            self._flush()
+            selected = self.test_mask(category, period)[self.score_tests] & self.score_present
+            return np.flatnonzero(selected & ~np.isnan(self.score_percentages))
+
+    def matrix(self, category: str = ALL_CATEGORIES, period: str = "All Time") -> PerformanceMatrix:
+        """Get the student x subject matrix for a filter, building it on first use"""
+        key = (category, period)
+        with self._lock:
+            matrix = self._matrices.get(key)
+            if matrix is None:
+                scored = self._scored(category, period)
+                matrix = PerformanceMatrix.from_scores(
+                    len(self.student_ids), len(self.subject_names), self.score_students[scored],
+                    self.test_subjects[self.score_tests[scored]], self.score_percentages[scored], self.passing
+                )
+                self._matrices[key] = matrix
+            return matrix
+
+    def record_score(self, test_id: Any, student_id: Any, marks_obtained: Any, attendance: str = "Present") -> bool:
+        """Apply one score write to the score arrays and cached matrices; False if the ids are unknown"""
+        test = self.test_positions.get(int(test_id))
+        student = self.student_positions.get(int(student_id))
+        if test is None or student is None:
+            return False
+
+        max_marks = self.test_max[test]
+        percentage = float(marks_obtained) / max_marks * 100 \
+            if max_marks > 0 and pd.notna(marks_obtained) else np.nan
+        present = attendance != "Absent"
+        subject = int(self.test_subjects[test])
+
+        with self._lock:
+            position = self._score_position(student, test)
+            affected = [matrix for key, matrix in self._matrices.items() if self.test_mask(*key)[test]]
+
+            if position is not None:
+                loaded = len(self.score_students)
+                row = self._added_rows[position - loaded] if position >= loaded else None
+                previous, was_present = (row[2], row[3]) if row else \
+                    (self.score_percentages[position], self.score_present[position])
+                if was_present and not np.isnan(previous):
+                    for matrix in affected:
+                        matrix.apply(student, subject, previous, self.passing, -1)
+                if row:
+                    row[2], row[3] = percentage, present
+                else:
+                    self.score_percentages[position] = percentage
+                    self.score_present[position] = present
+            else:
+                self._added_positions[(student, test)] = len(self.score_students) + len(self._added_rows)
+                self._added_rows.append([student, test, percentage, present])
+
+            if present and not np.isnan(percentage):
+                for matrix in affected:
+                    matrix.apply(student, subject, percentage, self.passing, 1)
+        return True
+
+    def overall(self, category: str, period: str) -> Optional[Dict[str, Any]]:
+        """Headline figures, distribution of student averages and monthly trend"""
+        scored = self._scored(category, period)
+        if not len(scored):
+            return None
+
+        matrix = self.matrix(category, period)
+        counts, averages, _ = matrix.student_figures()
+        averages = averages[counts > 0]
+        distribution, edges = np.histogram(np.clip(averages, 0, 100), bins=SCORE_BINS)
+
+        percentages = self.score_percentages[scored]
+        months = self.test_months[self.score_tests[scored]]
+        month_counts = np.bincount(months, minlength=len(self.month_names))
+        month_totals = np.bincount(months, weights=percentages, minlength=len(self.month_names))
+        trend_months = np.flatnonzero((month_counts > 0) & (self.month_names != ''))
+
+        return {
+            'average_score': float(percentages.mean()),
+            'top_score': float(percentages.max()),
+            'pass_rate': float(matrix.passes.sum() / matrix.counts.sum() * 100),
+            'total_tests': int(self.test_mask(category, period).sum()),
+            'students_assessed': int(len(averages)),
+            'score_distribution': pd.DataFrame({
+                'score_range': [f"{int(start)}-{int(end)}%" for start, end in zip(edges[:-1], edges[1:])],
+                'student_count': distribution
+            }),
+            'monthly_trends': pd.DataFrame({
+                'month': self.month_names[trend_months],
+                'average_score': month_totals[trend_months] / month_counts[trend_months],
+                'scores': month_counts[trend_months]
+            })
+        }
+
+    def subject_wise(self, category: str, period: str) -> pd.DataFrame:
+        """Average, best student average and pass rate per subject"""
+        matrix = self.matrix(category, period)
+        counts = matrix.counts.sum(axis=0)
+        if not counts.any():
+            return pd.DataFrame(columns=['subject', 'average_score', 'top_score', 'pass_rate', 'students', 'scores'])
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            student_averages = np.where(matrix.counts > 0, matrix.sums / matrix.counts, -np.inf)
+            subjects = pd.DataFrame({
+                'subject': self.subject_names,
+                'average_score': matrix.sums.sum(axis=0) / counts,
+                'top_score': student_averages.max(axis=0),
+                'pass_rate': matrix.passes.sum(axis=0) / counts * 100,
+                'students': (matrix.counts > 0).sum(axis=0),
+                'scores': counts.astype(int)
+            })
+        return subjects[subjects['scores'] > 0].sort_values('average_score', ascending=False).reset_index(drop=True)
+
+    def test_analysis(self, category: str, period: str) -> Optional[Dict[str, Any]]:
+        """Participation and average score per test"""
+        tests = np.flatnonzero(self.test_mask(category, period))
+        if not len(tests):
+            return None
+
+        with self._lock:
+            self._flush()
+            in_filter = self.test_mask(category, period)[self.score_tests]
+            recorded_tests = self.score_tests[in_filter]
+            present = self.score_present[in_filter]
+            percentages = self.score_percentages[in_filter]
+        counted = present & ~np.isnan(percentages)
+
+        size = len(self.test_ids)
+        recorded = np.bincount(recorded_tests, minlength=size)[tests]
+        attended = np.bincount(recorded_tests, weights=present, minlength=size)[tests]
+        scored = np.bincount(recorded_tests[counted], minlength=size)[tests]
+        totals = np.bincount(recorded_tests[counted], weights=percentages[counted], minlength=size)[tests]
+
+        days = pd.Series(self.test_days[tests]).dropna()
+        months = max((days.max().year - days.min().year) * 12 + days.max().month - days.min().month + 1, 1) \
+            if len(days) else 1
+        with np.errstate(invalid='ignore', divide='ignore'):
+            difficulty = pd.DataFrame({
+                'test_id': self.test_ids[tests],
+                'test_name': self.test_names[tests],
+                'date': pd.Series(self.test_days[tests]).dt.date.to_numpy(),
+                'subject': np.array(self.subject_names, dtype=object)[self.test_subjects[tests]],
+                'max_marks': self.test_max[tests],
+                'average_score': np.round(totals / scored, 1),
+                'student_count': scored,
+                'participation': np.round(attended / recorded * 100, 1)
+            })
+
+        return {
+            'total_tests': int(len(tests)),
+            'avg_participation': float(attended.sum() / recorded.sum() * 100) if recorded.sum() else 0.0,
+            'tests_per_month': len(tests) / months,
+            'difficulty_analysis': difficulty[difficulty['student_count'] > 0].reset_index(drop=True)
+        }
+
+    def top_performers(self, category: str, period: str, limit: int = TOP_PERFORMERS_LIMIT) -> pd.DataFrame:
+        """Best students by average percentage, chosen with a partial sort"""
+        counts, averages, spread = self.matrix(category, period).student_figures()
+        assessed = np.flatnonzero(counts > 0)
+        top = assessed[_top_k(averages[assessed], limit)]
+        return pd.DataFrame({
+            'rank': np.arange(1, len(top) + 1),
+            'student_id': self.student_ids[top],
+            'student_name': self.student_names[top],
+            'category': self.student_categories[top],
+            'average_score': np.round(averages[top], 1),
+            'tests_taken': counts[top].astype(int),
+            'consistency': np.round(spread[top], 1)
+        })
+
+    def category_toppers(self, period: str, limit: int = TOPPERS_PER_CATEGORY) -> pd.DataFrame:
+        """Best students within each test category"""
+        toppers: List[pd.DataFrame] = []
+        for category in sorted(set(self.test_categories)):
+            best = self.top_performers(category, period, limit)
+            if not best.empty:
+                toppers.append(pd.DataFrame({
+                    'category': category,
+                    'rank': best['rank'],
+                    'student_name': best['student_name'],
+                    'score': best['average_score'],
+                    'tests_taken': best['tests_taken']
+                }))
+        if not toppers:
+            return pd.DataFrame(columns=['category', 'rank', 'student_name', 'score', 'tests_taken'])
+        return pd.concat(toppers, ignore_index=True)
+
+
+class AcademicReports:
+    """
+    Cache of the academic index behind the Academic Reports tab
+    Score saves are applied in place; new tests or students trigger a rebuild
+    """
+
+    def __init__(self, ttl: int = CACHE_CONFIG["cache_ttl"]):
+        self.ttl = ttl
+        self._index: Optional[AcademicIndex] = None
+        self._versions: Optional[tuple] = None
+        self._lock = threading.Lock()
+
+    def get_index(self, db_manager: Any) -> AcademicIndex:
+        """Get the academic index, building it if missing, changed or from a previous day"""
+        index = self._index
+        if index is not None and index.today == pd.Timestamp(date.today()):
+            if time.time() - index.built_at < self.ttl:
+                cache_manager.touch('academic_reports', 'index')
+                return index
+            if db_manager.table_versions(INDEX_TABLES) == self._versions:
+                # None of the tables changed since the build, so the index is still current
+                index.built_at = time.time()
+                cache_manager.touch('academic_reports', 'index')
+                return index
+
+        with self._lock:
+            versions = db_manager.table_versions(INDEX_TABLES)
+            index = AcademicIndex(db_manager.get_table_frame('students'),
+                                  db_manager.get_table_frame('tests'),
+                                  db_manager.get_table_frame('test_scores'))
+            self._index, self._versions = index, versions
+        cache_manager.track('academic_reports', 'index', index, self.invalidate)
+        return index
+
+    def record_score(self, test_id: Any, student_id: Any, marks_obtained: Any, attendance: str = "Present") -> None:
+        """Apply one saved score to the index, or drop the index if the score is for an unknown test or student"""
+        index = self._index
+        if index is None or test_id is None or student_id is None:
+            return
+        if not index.record_score(test_id, student_id, marks_obtained, attendance):
+            self.invalidate()
+
+    def invalidate(self) -> None:
+        """Drop the academic index so it is rebuilt on next use"""
+        # A build that reads a changed table lands here while holding the build lock
+        self._index = None
+        cache_manager.forget('academic_reports')
+
+    def build_report(self, db_manager: Any, report_type: str, category: str = ALL_CATEGORIES,
+                     period: str = "All Time") -> Any:
+        """Build one academic report by its name on the Reports page"""
+        index = self.get_index(db_manager)
+        if report_type == "Overall Performance Analysis":
+            return index.overall(category, period)
+        if report_type == "Subject-wise Performance":
+            return index.subject_wise(category, period)
+        if report_type == "Test Analysis Report":
+            return index.test_analysis(category, period)
+        if report_type == "Top Performers Report":
+            return {
+                'top_performers': index.top_performers(category, period),
+                'category_toppers': index.category_toppers(period)
+            }
+        return pd.DataFrame()
+
+    def export_report(self, db_manager: Any, report_type: str, category: str = ALL_CATEGORIES,
+                      period: str = "All Time") -> bytes:
+        """Write an academic report to a workbook"""
+        report = self.build_report(db_manager, report_type, category, period)
+        return export_engine.write_excel_sheets(report_sheets(report, report_type)).data
+
+
+# Global academic reports instance
+academic_reports = AcademicReports()
@@ -0,0 +1,366 @@
+import io
+import time
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import pandas as pd
+from config.settings import REPORT_CONFIG
+from utils.exporter import export_engine, get_export_formats, EXPORT_FILE_TYPES
+from utils.snapshot import DataSnapshot
+from utils.offload import process_offloader
+
+# Output formats offered by bulk report generation, mapped to export formats
+BULK_REPORT_FORMATS = {
+    "Excel (.xlsx)": "Excel",
+    "CSV Files": "CSV",
+    "Parquet Files": "Parquet"
+}
+
+
+def _dates(values: pd.Series) -> pd.Series:
+    """Get the calendar date of each timestamp"""
+    return values.dt.date
+
+
+def _dashboard_summary(snapshot: DataSnapshot) -> pd.DataFrame:
+    """Headline figures across students, batches, payments and messages"""
+    students = snapshot.frame('students')
+    batches = snapshot.frame('batches')
+    payments = snapshot.frame('payments')
+    logs = snapshot.frame('communication_logs')
+
+    pending = students['pending_amount'] if 'pending_amount' in students.columns else pd.Series(dtype=float)
+    total_fee = students['total_fee'].sum() if 'total_fee' in students.columns else 0
+    paid = students['paid_amount'].sum() if 'paid_amount' in students.columns else 0
+    active_batches = (batches['status'] == 'Active').sum() if 'status' in batches.columns else len(batches)
+
+    metrics = [
+        ('Total Students', len(students)),
+        ('Active Batches', int(active_batches)),
+        ('Total Fees', total_fee),
+        ('Fees Collected', paid),
+        ('Fees Pending', pending[pending > 0].sum()),
+        ('Students With Pending Fees', int((pending > 0).sum())),
+        ('Collection Rate (%)', round(paid / total_fee * 100, 1) if total_fee else 0),
+        ('Payments Received', payments['amount'].sum() if 'amount' in payments.columns else 0),
+        ('Messages Sent', logs['recipient_count'].sum() if 'recipient_count' in logs.columns else 0)
+    ]
+    return pd.DataFrame({
+        'Metric': [name for name, _ in metrics],
+        'Value': pd.Series([value for _, value in metrics], dtype=object)
+    })
+
+
+def _students(snapshot: DataSnapshot) -> pd.DataFrame:
+    """All students with their pending amount"""
+    students = snapshot.frame('students')
+    for column in ['date_of_birth', 'fee_due_date', 'admission_date']:
+        if column in students.columns:
+            students = students.assign(**{column: _dates(students[column])})
+    return students
+
+
+def _student_demographics(snapshot: DataSnapshot) -> pd.DataFrame:
+    """Student counts by category, batch and status"""
+    students = snapshot.frame('students')
+    keys = [column for column in ['category', 'batch', 'status'] if column in students.columns]
+    if students.empty or not keys:
+        return pd.DataFrame()
+    return students.groupby(keys, dropna=False).size().reset_index(name='students')
+
+
+def _batches(snapshot: DataSnapshot) -> pd.DataFrame:
+    """All batches with enrollment and occupancy"""
+    batches = snapshot.frame('batches')
+    students = snapshot.frame('students')
+    if batches.empty:
+        return batches
+
+    if 'batch' in students.columns:
+        enrolled = students['batch'].value_counts()
+        batches = batches.assign(enrolled=batches['name'].map(enrolled).fillna(0).astype(int))
+        if 'capacity' in batches.columns:
+            occupancy = (batches['enrolled'] / batches['capacity'].where(batches['capacity'] > 0) * 100).round(1)
+            batches = batches.assign(occupancy_percent=occupancy)
+
+    for column in ['start_date', 'end_date']:
+        if column in batches.columns:
+            batches = batches.assign(**{column: _dates(batches[column])})
+    return batches
+
+
+def _pending_fees(snapshot: DataSnapshot) -> pd.DataFrame:
+    """Students with fees outstanding, most overdue first"""
+    students = snapshot.frame('students')
+    if students.empty or 'pending_amount' not in students.columns:
+        return pd.DataFrame()
+
+    pending = students[students['pending_amount'] > 0]
+    columns = [column for column in ['full_name', 'parent_phone', 'category', 'batch', 'total_fee',
+                                     'paid_amount', 'pending_amount', 'fee_due_date'] if column in pending.columns]
+    pending = pending[columns]
+
+    if 'fee_due_date' in pending.columns:
+        today = pd.Timestamp.now().normalize()
+        pending = pending.assign(
+            days_overdue=(today - pending['fee_due_date']).dt.days.clip(lower=0),
+            fee_due_date=_dates(pending['fee_due_date'])
+        ).sort_values('days_overdue', ascending=False)
+    return pending
+
+
+def _fee_collection_status(snapshot: DataSnapshot) -> pd.DataFrame:
+    """Fees billed, collected and pending per category"""
+    students = snapshot.frame('students')
+    if students.empty or 'category' not in students.columns or 'total_fee' not in students.columns:
+        return pd.DataFrame()
+
+    status = students.groupby('category').agg(
+        students=('total_fee', 'size'),
+        total_fee=('total_fee', 'sum'),
+        paid_amount=('paid_amount', 'sum'),
+        pending_amount=('pending_amount', 'sum')
+    ).reset_index()
+    status['collection_rate'] = (status['paid_amount'] / status['total_fee'].where(status['total_fee'] > 0) * 100).round(1)
+    return status
+
+
+def _financial_summary(snapshot: DataSnapshot) -> pd.DataFrame:
+    """Monthly payments by payment method"""
+    payments = snapshot.frame('payments')
+    if payments.empty or 'payment_date' not in payments.columns or 'amount' not in payments.columns:
+        return pd.DataFrame()
+
+    payments = payments.assign(month=payments['payment_date'].dt.to_period('M').astype(str))
+    method = payments['payment_method'].fillna('Unknown') if 'payment_method' in payments.columns else 'All'
+    summary = payments.assign(payment_method=method).pivot_table(
+        index='month', columns='payment_method', values='amount', aggfunc='sum', fill_value=0
+    )
+    summary['Total'] = summary.sum(axis=1)
+    summary.columns.name = None
+    return summary.reset_index()
+
+
+def _revenue_trend(snapshot: DataSnapshot) -> pd.DataFrame:
+    """Daily payment totals"""
+    payments = snapshot.frame('payments')
+    if payments.empty or 'payment_date' not in payments.columns or 'amount' not in payments.columns:
+        return pd.DataFrame()
+
+    trend = payments.groupby(_dates(payments['payment_date']).rename('date')).agg(
+        revenue=('amount', 'sum'),
+        payments=('amount', 'size')
+    ).reset_index()
+    trend['cumulative_revenue'] = trend['revenue'].cumsum()
+    return trend
+
+
+def _enrollment_trend(snapshot: DataSnapshot) -> pd.DataFrame:
+    """Daily new admissions"""
+    students = snapshot.frame('students')
+    if students.empty or 'admission_date' not in students.columns:
+        return pd.DataFrame()
+
+    trend = students.groupby(_dates(students['admission_date']).rename('date')).size().reset_index(name='new_enrollments')
+    trend['total_enrollments'] = trend['new_enrollments'].cumsum()
+    return trend
+
+
+def _academic_performance(snapshot: DataSnapshot) -> pd.DataFrame:
+    """Score statistics per test"""
+    tests = snapshot.frame('tests')
+    scores = snapshot.frame('test_scores')
+    if tests.empty or scores.empty or 'test_id' not in scores.columns:
+        return pd.DataFrame()
+
+    test_columns = [column for column in ['id', 'name', 'subject', 'batch', 'date', 'max_marks'] if column in tests.columns]
+    joined = scores.merge(tests[test_columns], left_on='test_id', right_on='id', suffixes=('', '_test'))
+    if joined.empty:
+        return pd.DataFrame()
+
+    joined['percentage'] = joined['marks_obtained'] / joined['max_marks'].where(joined['max_marks'] > 0) * 100
+    keys = [column for column in ['test_id', 'name', 'subject', 'batch', 'date'] if column in joined.columns]
+    performance = joined.groupby(keys, dropna=False).agg(
+        students=('marks_obtained', 'size'),
+        average_marks=('marks_obtained', 'mean'),
+        highest_marks=('marks_obtained', 'max'),
+        lowest_marks=('marks_obtained', 'min'),
+        average_percentage=('percentage', 'mean')
+    ).reset_index()
+
+    statistics = ['average_marks', 'highest_marks', 'lowest_marks', 'average_percentage']
+    performance[statistics] = performance[statistics].round(2)
+    if 'date' in performance.columns:
+        performance['date'] = _dates(performance['date'])
+    return performance
+
+
+def _communication_logs(snapshot: DataSnapshot) -> pd.DataFrame:
+    """All communication logs, newest first"""
+    logs = snapshot.frame('communication_logs')
+    if not logs.empty and 'timestamp' in logs.columns:
+        logs = logs.sort_values('timestamp', ascending=False)
+    return logs
+
+
+# Report name -> (builder, tables the builder reads)
+BULK_REPORTS: Dict[str, Tuple[Callable[[DataSnapshot], pd.DataFrame], List[str]]] = {
+    "Dashboard Summary": (_dashboard_summary, ['students', 'batches', 'payments', 'communication_logs']),
+    "Students": (_students, ['students']),
+    "Student Demographics": (_student_demographics, ['students']),
+    "Batches": (_batches, ['batches', 'students']),
+    "Pending Fees": (_pending_fees, ['students']),
+    "Fee Collection Status": (_fee_collection_status, ['students']),
+    "Financial Summary": (_financial_summary, ['payments']),
+    "Revenue Trend": (_revenue_trend, ['payments']),
+    "Enrollment Trend": (_enrollment_trend, ['students']),
+    "Academic Performance": (_academic_performance, ['tests', 'test_scores']),
+    "Communication Logs": (_communication_logs, ['communication_logs'])
+}
+
+
+def get_bulk_report_formats() -> List[str]:
+    """Get the bulk report output formats that can be written"""
+    available = get_export_formats()
+    return [label for label, export_format in BULK_REPORT_FORMATS.items() if export_format in available]
+
+
+def _report_file_name(report_name: str) -> str:
+    """Get a file name stem for a report"""
+    return report_name.lower().replace(' ', '_')
+
+
+def _build_report(report_name: str, snapshot: DataSnapshot, export_format: str) -> Dict:
+    """Build one report and, for file-per-report formats, serialize it"""
+    builder, _ = BULK_REPORTS[report_name]
+    started = time.perf_counter()
+    report = {'report': report_name, 'frame': pd.DataFrame(), 'data': None, 'error': None}
+
+    try:
+        report['frame'] = builder(snapshot)
+        built = time.perf_counter()
+
+        if export_format != "Excel":
+            result = export_engine.write(
+                [report['frame']], export_format, report_name,
+                columns=list(report['frame'].columns)
+            )
+            report['data'] = result.data
+        report['build_seconds'] = built - started
+        report['write_seconds'] = time.perf_counter() - built
+    except Exception as e:
+        print(f"Error building {report_name} report: {str(e)}")
+        report['error'] = str(e)
+        report['build_seconds'] = time.perf_counter() - started
+        report['write_seconds'] = 0.0
+
+    return report
+
+
+def build_report_files(frames: Dict[str, pd.DataFrame], reports: List[str], export_format: str,
+                       max_workers: int, progress: Optional[Callable[[float, str], None]] = None) -> Tuple[List[Dict], bytes]:
+    """Build reports from snapshot frames and assemble them into one file; may run in a worker process"""
+    snapshot = DataSnapshot(frames)
+    completed = []
+    completed_lock = threading.Lock()
+
+    def build(name: str) -> Dict:
+        report = _build_report(name, snapshot, export_format)
+        if progress:
+            with completed_lock:
+                completed.append(name)
+                progress(0.1 + 0.8 * len(completed) / len(reports), f"Built {len(completed)} of {len(reports)} reports")
+        return report
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(reports))) as executor:
+        built = list(executor.map(build, reports))
+
+    if export_format == "Excel":
+        sheets = {report['report']: report['frame'] for report in built if report['error'] is None}
+        data = export_engine.write_excel_sheets(sheets).data
+    else:
+        extension = EXPORT_FILE_TYPES[export_format][0]
+        output = io.BytesIO()
+        with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for report in built:
+                if report['error'] is None:
+                    archive.writestr(f"{_report_file_name(report['report'])}{extension}", report['data'])
+        data = output.getvalue()
+
+    # Only row counts go back, not the report frames
+    for report in built:
+        report['rows'] = len(report.pop('frame'))
+        report.pop('data')
+    return built, data
+
+
+class BulkReportGenerator:
+    """
+    Builds several reports concurrently from one data snapshot
+    Results are assembled into one workbook or a zip of per-report files, in a worker
+    process when the snapshot is large enough to hold the GIL for long
+    """
+
+    def __init__(self, max_workers: int = REPORT_CONFIG["bulk_report_workers"]):
+        self.max_workers = max_workers
+
+    def generate(self, db_manager: Any, selected_reports: List[str], report_format: str,
+                 progress: Optional[Callable[[float, str], None]] = None) -> Optional[Dict]:
+        """Generate the selected reports in the requested output format, reporting progress if asked"""
+        export_format = BULK_REPORT_FORMATS.get(report_format)
+        reports = [name for name in selected_reports if name in BULK_REPORTS]
+        if export_format is None or not reports:
+            return None
+
+        started = time.perf_counter()
+
+        # Load every table the selected reports need, once
+        tables = [table for name in reports for table in BULK_REPORTS[name][1]]
+        if progress:
+            progress(0.0, "Loading data")
+        snapshot = DataSnapshot.capture(db_manager, tables, self.max_workers)
+
+        assemble_started = time.perf_counter()
+        if process_offloader.should_offload(sum(len(frame) for frame in snapshot.frames.values())):
+            if progress:
+                progress(0.1, "Building reports in a worker process")
+            built, data = process_offloader.run(build_report_files, snapshot.frames, reports, export_format,
+                                                self.max_workers)
+        else:
+            built, data = build_report_files(snapshot.frames, reports, export_format, self.max_workers, progress)
+
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        if export_format == "Excel":
+            file_name = f"bulk_reports_{timestamp}.xlsx"
+            mime = EXPORT_FILE_TYPES["Excel"][1]
+        else:
+            file_name = f"bulk_reports_{timestamp}.zip"
+            mime = "application/zip"
+
+        timings = pd.DataFrame([
+            {
+                'report': report['report'],
+                'rows': report['rows'],
+                'build_seconds': round(report['build_seconds'], 3),
+                'write_seconds': round(report['write_seconds'], 3),
+                'status': 'Failed' if report['error'] else 'Generated'
+            }
+            for report in built
+        ])
+
+        return {
+            'data': data,
+            'file_name': file_name,
+            'mime': mime,
+            'timings': timings,
+            'errors': {report['report']: report['error'] for report in built if report['error']},
+            'snapshot_seconds': round(snapshot.load_seconds, 3),
+            'assemble_seconds': round(time.perf_counter() - assemble_started, 3),
+            'total_seconds': round(time.perf_counter() - started, 3)
+        }
+
+
+# Global bulk report generator instance
+bulk_report_generator = BulkReportGenerator()
@@ -0,0 +1,134 @@
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from config.settings import CACHE_CONFIG
+
+
+def estimate_size(value: Any, _seen: Optional[set] = None) -> int:
+    """Estimate the bytes an object holds, measuring frames with memory_usage(deep=True)"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return sys.getsizeof(value)
+
+    # Containers and plain objects are walked once each, so shared parts count once
+    _seen = set() if _seen is None else _seen
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(key, _seen) + estimate_size(item, _seen) for key, item in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, _seen) for item in value)
+    elif hasattr(value, '__dict__'):
+        size += estimate_size(vars(value), _seen)
+    return size
+
+
+class CacheEntry:
+    """One cached value's measured size and how to drop it"""
+
+    def __init__(self, namespace: str, key: Hashable, size: int, drop: Callable[[], None]):
+        self.namespace = namespace
+        self.key = key
+        self.size = size
+        self.drop = drop
+
+
+class CacheManager:
+    """
+    One memory budget shared by the in-process caches
+    Caches report each entry with its size and a callback that drops it; once the total passes
+    the budget, the least recently used entries of any cache are dropped until it fits
+    """
+
+    def __init__(self, max_bytes: int = CACHE_CONFIG["max_cache_size"] * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries: "OrderedDict[Tuple[str, Hashable], CacheEntry]" = OrderedDict()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def _namespace_stats(self, namespace: str) -> Dict[str, int]:
+        return self._stats.setdefault(namespace, {'entries': 0, 'bytes': 0, 'hits': 0, 'stores': 0, 'evictions': 0})
+
+    def _remove(self, entry: CacheEntry) -> None:
+        """Take an entry out of the accounting; the caller holds the lock"""
+        stats = self._namespace_stats(entry.namespace)
+        stats['entries'] -= 1
+        stats['bytes'] -= entry.size
+        self.total_bytes -= entry.size
+
+    def track(self, namespace: str, key: Hashable, value: Any, drop: Callable[[], None],
+              size: Optional[int] = None) -> int:
+        """Record a cached value, dropping least recently used entries beyond the budget; returns its size"""
+        size = estimate_size(value) if size is None else size
+        with self._lock:
+            previous = self._entries.pop((namespace, key), None)
+            if previous is not None:
+                self._remove(previous)
+
+            self._entries[(namespace, key)] = CacheEntry(namespace, key, size, drop)
+            stats = self._namespace_stats(namespace)
+            stats['entries'] += 1
+            stats['bytes'] += size
+            stats['stores'] += 1
+            self.total_bytes += size
+
+            victims: List[CacheEntry] = []
+            while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+                # The entry just stored is never its own victim
+                victim = self._entries.pop(next(iter(self._entries)))
+                self._remove(victim)
+                self._namespace_stats(victim.namespace)['evictions'] += 1
+                victims.append(victim)
+
+        # Callbacks run outside the lock, as they take their caches' own locks
+        for victim in victims:
+            try:
+                victim.drop()
+            except Exception as e:
+                print(f"Error evicting {victim.namespace} cache entry: {str(e)}")
+        return size
+
+    def touch(self, namespace: str, key: Hashable) -> None:
+        """Mark a cached value as just used"""
+        with self._lock:
+            if (namespace, key) in self._entries:
+                self._entries.move_to_end((namespace, key))
+                self._namespace_stats(namespace)['hits'] += 1
+
+    def forget(self, namespace: str, key: Optional[Hashable] = None) -> None:
+        """Stop accounting for a value its cache dropped itself, or for all of a namespace's values"""
+        with self._lock:
+            if key is not None:
+                keys = [(namespace, key)] if (namespace, key) in self._entries else []
+            else:
+                keys = [entry_key for entry_key in self._entries if entry_key[0] == namespace]
+            for entry_key in keys:
+                self._remove(self._entries.pop(entry_key))
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the budget, the total in use and each namespace's entries, bytes, hits and evictions"""
+        with self._lock:
+            return {
+                'max_bytes': self.max_bytes,
+                'total_bytes': self.total_bytes,
+                'entries': len(self._entries),
+                'namespaces': {namespace: dict(stats) for namespace, stats in sorted(self._stats.items())}
+            }
+
+
+# Global cache manager instance
+cache_manager = CacheManager()
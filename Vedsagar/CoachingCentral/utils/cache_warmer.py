@@ -0,0 +1,155 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time as day_time, timedelta
+from typing import Any, Callable, Dict, List, Optional
+from config.settings import WARMUP_CONFIG
+from utils.fee_analytics import fee_analytics
+from utils.rollups import payment_rollup
+
+# Aggregates the warmer can build once their tables are loaded
+AGGREGATE_WARMERS: Dict[str, Callable[[Any], Any]] = {
+    'fee_status': fee_analytics.get_frame,
+    'revenue': payment_rollup.ensure_current
+}
+
+
+def _parse_times(values: List[str]) -> List[day_time]:
+    """Read daily HH:MM run times, skipping malformed ones"""
+    times = []
+    for value in values:
+        try:
+            times.append(datetime.strptime(value, "%H:%M").time())
+        except ValueError:
+            print(f"Error reading cache warm-up time {value!r}: expected HH:MM")
+    return times
+
+
+class CacheWarmer:
+    """
+    Background preloading of table frames and the dashboard aggregates
+    Runs when the first database manager starts and again each day at the configured times,
+    with random jitter so several server processes do not hit the backend at once
+    """
+
+    def __init__(self, times: List[str] = WARMUP_CONFIG["times"], jitter_seconds: float = WARMUP_CONFIG["jitter_seconds"],
+                 max_workers: int = WARMUP_CONFIG["max_workers"], tables: List[str] = WARMUP_CONFIG["tables"],
+                 aggregates: List[str] = WARMUP_CONFIG["aggregates"], on_start: bool = WARMUP_CONFIG["on_start"]):
+        self.times = _parse_times(times)
+        self.jitter_seconds = jitter_seconds
+        self.max_workers = max_workers
+        self.tables = list(tables)
+        self.aggregates = list(aggregates)
+        self.on_start = on_start
+        self.runs = 0
+        self.last_run_at: Optional[float] = None
+        self.last_seconds: Optional[float] = None
+        self.last_errors: List[str] = []
+        self.next_run_at: Optional[float] = None
+        self._db_manager: Any = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, db_manager: Any) -> None:
+        """Start warming in the background; later calls only swap the database manager"""
+        with self._lock:
+            self._db_manager = db_manager
+            if self.running:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="cache-warmer", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the schedule after the current run"""
+        self._stop.set()
+
+    def _run(self) -> None:
+        """Warm once at start, then sleep until each scheduled time"""
+        if self.on_start:
+            # Processes restarted together spread their first warm-up too
+            if self._stop.wait(random.uniform(0, self.jitter_seconds)):
+                return
+            self.warm(self._db_manager)
+        while True:
+            delay = self._next_delay(datetime.now())
+            if delay is None:
+                self.next_run_at = None
+                return
+            self.next_run_at = time.time() + delay
+            if self._stop.wait(delay):
+                return
+            self.warm(self._db_manager)
+
+    def _next_delay(self, now: datetime) -> Optional[float]:
+        """Seconds until the next scheduled run, jitter included; None without a schedule"""
+        upcoming = []
+        for at in self.times:
+            run_at = datetime.combine(now.date(), at)
+            upcoming.append(run_at if run_at > now else run_at + timedelta(days=1))
+        if not upcoming:
+            return None
+        return (min(upcoming) - now).total_seconds() + random.uniform(0, self.jitter_seconds)
+
+    def warm(self, db_manager: Any) -> Dict[str, float]:
+        """Load the tables, at most max_workers at a time, then build the aggregates; returns seconds per step"""
+        started = time.perf_counter()
+        timings: Dict[str, float] = {}
+        errors: List[str] = []
+
+        def load(table_name: str) -> float:
+            table_started = time.perf_counter()
+            db_manager.get_table_frame(table_name)
+            return time.perf_counter() - table_started
+
+        if self.tables:
+            with ThreadPoolExecutor(max_workers=max(1, self.max_workers), thread_name_prefix="cache-warm") as executor:
+                futures = {table_name: executor.submit(load, table_name) for table_name in self.tables}
+            for table_name, future in futures.items():
+                try:
+                    timings[table_name] = future.result()
+                except Exception as e:
+                    errors.append(f"{table_name}: {str(e)}")
+
+        # Aggregates run one at a time, as they read the tables loaded above
+        for name in self.aggregates:
+            warmer = AGGREGATE_WARMERS.get(name)
+            if warmer is None:
+                errors.append(f"{name}: unknown aggregate")
+                continue
+            step_started = time.perf_counter()
+            try:
+                warmer(db_manager)
+                timings[name] = time.perf_counter() - step_started
+            except Exception as e:
+                errors.append(f"{name}: {str(e)}")
+
+        for error in errors:
+            print(f"Error warming cache {error}")
+        with self._lock:
+            self.runs += 1
+            self.last_run_at = time.time()
+            self.last_seconds = time.perf_counter() - started
+            self.last_errors = errors
+        return timings
+
+    def status(self) -> Dict[str, Any]:
+        """Get when the caches were last warmed, how long it took and when the next run is due"""
+        return {
+            'running': self.running,
+            'runs': self.runs,
+            'last_run_at': self.last_run_at,
+            'last_seconds': self.last_seconds,
+            'next_run_at': self.next_run_at,
+            'errors': list(self.last_errors)
+        }
+
+
+# Global cache warmer instance
+cache_warmer = CacheWarmer()
@@ -0,0 +1,142 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+from config.settings import API_CONFIG
+from utils.cache_manager import cache_manager
+
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+
+
+def response_cache_key(endpoint: str, params: Optional[dict] = None) -> str:
+    """Build the key a GET response is remembered under"""
+    return json.dumps([endpoint, params or {}], sort_keys=True, default=str)
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker around the NocoDB backend with last-good GET responses
+    Trips after repeated failures or slow calls; while open, requests fail fast or are answered
+    from the remembered responses, and a background probe closes it once the backend recovers
+    """
+
+    def __init__(self, failure_threshold: int = API_CONFIG["breaker_failure_threshold"],
+                 slow_call_seconds: float = API_CONFIG["breaker_slow_call_seconds"],
+                 retry_seconds: float = API_CONFIG["breaker_retry_seconds"],
+                 max_responses: int = API_CONFIG["stale_cache_entries"]):
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.retry_seconds = retry_seconds
+        self.max_responses = max_responses
+        self.state = BREAKER_CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.last_success_at: Optional[float] = None
+        self.stale_since: Optional[float] = None
+        self.stale_responses_served = 0
+        self._probe: Optional[Callable[[], bool]] = None
+        self._prober: Optional[threading.Thread] = None
+        self._responses: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def set_probe(self, probe: Callable[[], bool]) -> None:
+        """Set the cheap backend call used to test for recovery"""
+        self._probe = probe
+
+    def allow_request(self) -> bool:
+        """Check whether a request may go to the backend"""
+        return self.state == BREAKER_CLOSED
+
+    def record_success(self, elapsed: float) -> None:
+        """Record a successful call; a slow one still counts towards tripping"""
+        if elapsed >= self.slow_call_seconds:
+            self.record_failure()
+            return
+        with self._lock:
+            self.consecutive_failures = 0
+            self.last_success_at = time.time()
+            self.stale_since = None
+
+    def record_failure(self) -> None:
+        """Record a failed or slow call, opening the circuit after too many in a row"""
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == BREAKER_CLOSED and self.consecutive_failures >= self.failure_threshold:
+                self.state = BREAKER_OPEN
+                self.opened_at = time.time()
+                print(f"Backend circuit opened after {self.consecutive_failures} failed or slow calls")
+                self._start_probe()
+
+    def _start_probe(self) -> None:
+        """Start the background recovery probe unless one is running"""
+        if self._probe is None or (self._prober is not None and self._prober.is_alive()):
+            return
+        self._prober = threading.Thread(target=self._probe_until_recovered, name="backend-probe", daemon=True)
+        self._prober.start()
+
+    def _probe_until_recovered(self) -> None:
+        """Probe the backend every retry interval until it answers"""
+        while self.state == BREAKER_OPEN:
+            time.sleep(self.retry_seconds)
+            try:
+                recovered = self._probe()
+            except Exception:
+                recovered = False
+            if recovered:
+                self.close()
+
+    def close(self) -> None:
+        """Close the circuit so requests reach the backend again"""
+        with self._lock:
+            if self.state == BREAKER_OPEN:
+                print("Backend circuit closed, backend is responding again")
+            self.state = BREAKER_CLOSED
+            self.consecutive_failures = 0
+            self.opened_at = None
+
+    def remember(self, key: str, response: Any) -> None:
+        """Keep the latest good response to a GET request, counted at its decoded size"""
+        dropped = []
+        with self._lock:
+            self._responses[key] = (response, time.time())
+            self._responses.move_to_end(key)
+            while len(self._responses) > self.max_responses:
+                dropped.append(self._responses.popitem(last=False)[0])
+        for old_key in dropped:
+            cache_manager.forget('responses', old_key)
+        cache_manager.track('responses', key, response, lambda: self._forget_response(key))
+
+    def _forget_response(self, key: str) -> None:
+        """Drop a remembered response evicted to keep the caches within budget"""
+        with self._lock:
+            self._responses.pop(key, None)
+
+    def stale_response(self, key: Optional[str]) -> Optional[Any]:
+        """Get the last good response for a GET request, marking the data as stale"""
+        entry = self._responses.get(key) if key else None
+        if entry is None:
+            return None
+        with self._lock:
+            self.stale_responses_served += 1
+            if self.stale_since is None:
+                self.stale_since = entry[1]
+        return entry[0]
+
+    def status(self) -> Dict[str, Any]:
+        """Get the circuit state and whether stale data is being served"""
+        return {
+            'state': self.state,
+            'consecutive_failures': self.consecutive_failures,
+            'opened_at': self.opened_at,
+            'last_success_at': self.last_success_at,
+            'serving_stale': self.stale_since is not None,
+            'stale_since': self.stale_since,
+            'stale_responses_served': self.stale_responses_served,
+            'remembered_responses': len(self._responses)
+        }
+
+
+# Global backend circuit breaker instance
+backend_breaker = CircuitBreaker()
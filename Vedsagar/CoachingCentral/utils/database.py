@@ -1,11 +1,36 @@
 import os
 import requests
 import pandas as pd
-from datetime import datetime, date, timedelta
-from typing import Dict, List, Any, Optional
+from datetime import datetime, date, timedelta, timezone
+from typing import Dict, List, Any, Optional, Iterator, Callable
 import io
+import json
+import shutil
+import tempfile
+import time
 from openpyxl import Workbook
-from openpyxl.utils.dataframe import dataframe_to_rows
+from config.settings import DASHBOARD_CONFIG
+from utils.templates import template_compiler
+from utils.exporter import export_engine, schema_columns, dataframe_chunks, EXPORT_CHUNK_SIZE
+from utils.snapshot import decode_json, DataSnapshot, FrameBuilder
+from utils.table_cache import table_cache
+from utils.cache_manager import cache_manager
+from utils.cache_warmer import cache_warmer
+from utils.shared_cache import SharedTableStore
+from utils.webhooks import webhook_receiver, EVENT_DELETE
+from utils.bulk_reports import bulk_report_generator
+from utils.performance_analytics import performance_analytics
+from utils.leaderboard import leaderboard_index
+from utils.rollups import payment_rollup, percent_change, METHOD_PREFIX, CATEGORY_PREFIX
+from utils.timeseries import timeseries_registry
+from utils.fee_analytics import fee_analytics
+from utils.student_reports import student_reports
+from utils.financial_reports import financial_reports
+from utils.academic_reports import academic_reports
+from utils.report_jobs import data_version
+from utils.circuit_breaker import backend_breaker, response_cache_key, BREAKER_CLOSED
+from utils.health_monitor import health_monitor
+from config.settings import API_CONFIG, SYSTEM_CONFIG, DATABASE_SCHEMA, WEBHOOK_CONFIG, CACHE_CONFIG, WARMUP_CONFIG
 
 class DatabaseManager:
     """
@@ -43,6 +68,22 @@ class DatabaseManager:
         # Initialize demo data if in demo mode
         if self.demo_mode:
             self._init_demo_data()
+        else:
+            backend_breaker.set_probe(self._probe_backend)
+            health_monitor.start(self._probe_backend)
+            if table_cache.shared is None:
+                # Server processes reading the same base share one copy of each table, kept across restarts
+                table_cache.attach_shared(SharedTableStore(os.path.join(CACHE_CONFIG["shared_cache_dir"], self.base_id)))
+                if table_cache.shared is not None:
+                    payment_rollup.attach_store(table_cache.shared)
+            # Aggregates built on a table restored from disk are dropped if the backend has moved on
+            table_cache.set_change_listener(self._invalidate_derived)
+            if WARMUP_CONFIG["enabled"]:
+                # Load the busiest tables and aggregates before the first page asks for them
+                cache_warmer.start(self)
+        
+        if WEBHOOK_CONFIG["enabled"]:
+            webhook_receiver.start(self)
     
     def _init_demo_data(self):
         """Initialize demo data for testing purposes"""
@@ -185,40 +226,270 @@ class DatabaseManager:
         for student in self.demo_students:
             student['pending_amount'] = student['total_fee'] - student['paid_amount']
     
-    def check_connection(self) -> bool:
-        """Check if the database connection is working"""
-        if self.demo_mode:
-            return True
+    def _probe_backend(self) -> bool:
+        """Call the backend's cheapest endpoint to see whether it answers"""
         try:
             response = requests.get(f"{self.base_url}/api/v1/db/meta/projects", headers=self.headers, timeout=10)
             return response.status_code == 200
         except Exception:
             return False
     
+    def check_connection(self) -> bool:
+        """Check if the database connection is working, from the background health monitor"""
+        if self.demo_mode:
+            return True
+        if not backend_breaker.allow_request():
+            # The background probe closes the circuit once the backend answers again
+            return False
+        available = health_monitor.status()['available']
+        # Until the first probe lands, trust the closed circuit
+        return True if available is None else available
+    
+    def get_health_status(self) -> Dict[str, Any]:
+        """Get backend availability and probe latency without making a request"""
+        if self.demo_mode:
+            return {'mode': 'demo', 'monitored': False, 'available': True, 'checked_at': None,
+                    'latency_ms': None, 'p50_ms': None, 'p95_ms': None, 'p99_ms': None,
+                    'availability': 100.0, 'samples': 0, 'breaker': BREAKER_CLOSED}
+        return {'mode': 'nocodb', **health_monitor.status(), 'breaker': backend_breaker.state}
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get memory use of the in-process caches against their budget, per cache, and the last warm-up"""
+        return {**cache_manager.stats(), 'warmup': cache_warmer.status()}
+    
+    def backend_status(self) -> Dict[str, Any]:
+        """Get the backend circuit state and whether pages are showing stale data"""
+        return backend_breaker.status()
+    
     def _make_request(self, method: str, endpoint: str, data: dict = None) -> Optional[Dict]:
-        """Make API request to NocoDB"""
+        """Make API request to NocoDB, answering GETs from the last good response while it is down"""
+        method = method.upper()
+        cache_key = response_cache_key(endpoint, data) if method == 'GET' else None
+        if not backend_breaker.allow_request():
+            return backend_breaker.stale_response(cache_key)
+        
+        if method in ('POST', 'PUT'):
+            data = self._stamp_write(endpoint, data)
+        
+        timeout = API_CONFIG["request_timeout"]
+        started = time.perf_counter()
         try:
             url = f"{self.base_url}/api/v1/db/data/{self.workspace_id}/{self.base_id}/{endpoint}"
             
-            if method.upper() == 'GET':
-                response = requests.get(url, headers=self.headers, params=data, timeout=30)
-            elif method.upper() == 'POST':
-                response = requests.post(url, headers=self.headers, json=data, timeout=30)
-            elif method.upper() == 'PUT':
-                response = requests.put(url, headers=self.headers, json=data, timeout=30)
-            elif method.upper() == 'DELETE':
-                response = requests.delete(url, headers=self.headers, timeout=30)
+            if method == 'GET':
+                response = requests.get(url, headers=self.headers, params=data, timeout=timeout)
+            elif method == 'POST':
+                response = requests.post(url, headers=self.headers, json=data, timeout=timeout)
+            elif method == 'PUT':
+                response = requests.put(url, headers=self.headers, json=data, timeout=timeout)
+            elif method == 'DELETE':
+                response = requests.delete(url, headers=self.headers, timeout=timeout)
             else:
                 return None
             
             if response.status_code in [200, 201]:
-                return response.json()
+                backend_breaker.record_success(time.perf_counter() - started)
+                result = decode_json(response.content)
+                if method != 'GET':
+                    data_version.bump()
+                    self._apply_write(method, endpoint, data, result)
+                elif cache_key:
+                    backend_breaker.remember(cache_key, result)
+                return result
             else:
                 print(f"API Error: {response.status_code} - {response.text}")
+                if response.status_code >= 500:
+                    # Server-side errors count against the backend; client errors do not
+                    backend_breaker.record_failure()
+                    return backend_breaker.stale_response(cache_key)
                 return None
         
         except Exception as e:
             print(f"Database request error: {str(e)}")
+            backend_breaker.record_failure()
+            return backend_breaker.stale_response(cache_key)
+    
+    def _stamp_write(self, endpoint: str, data: Optional[dict]) -> Optional[dict]:
+        """Set updated_at on a row being written, so the table's fingerprint moves with every edit"""
+        table_name = endpoint.split('/', 1)[0]
+        if data is None or self._change_column(table_name) != 'updated_at':
+            return data
+        return {**data, 'updated_at': datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S+00:00')}
+    
+    def _apply_write(self, method: str, endpoint: str, data: Optional[dict], result: Any) -> None:
+        """Apply a successful write to its table's cached frame, or drop the frame when it cannot be"""
+        table_name, _, row_id = endpoint.partition('/')
+        table_key = next((key for key, name in self.tables.items() if name == table_name), None)
+        if table_key is None:
+            return
+        
+        if method == 'DELETE':
+            applied = row_id.isdigit() and table_cache.apply_rows(table_key, [{'id': int(row_id)}], deleted=True)
+        else:
+            row = dict(data or {})
+            if isinstance(result, dict):
+                row.update(result)
+            if row.get('id') is None and row_id.isdigit():
+                row['id'] = int(row_id)
+            applied = row.get('id') is not None and table_cache.apply_rows(table_key, [row])
+        if not applied:
+            table_cache.discard(table_key)
+    
+    def _demo_records(self, table_name: str) -> List[Dict]:
+        """Get the in-memory demo rows for a table"""
+        demo_tables = {
+            'categories': self.demo_categories,
+            'batches': self.demo_batches,
+            'students': self.demo_students,
+            'tests': self.demo_tests,
+            'test_scores': self.demo_test_scores,
+            'payments': self.demo_payments,
+            'message_templates': self.demo_templates,
+            'communication_logs': self.demo_communication_logs,
+            'activities': self.demo_activities
+        }
+        return demo_tables.get(table_name, [])
+    
+    def iter_table_chunks(self, table_name: str, chunk_size: int = EXPORT_CHUNK_SIZE,
+                          params: Optional[dict] = None, strict: bool = False) -> Iterator[List[Dict]]:
+        """Iterate over all rows of a table, one page of rows at a time; strict raises if a page cannot be read"""
+        if self.demo_mode:
+            records = self._demo_records(table_name)
+            for start in range(0, len(records), chunk_size):
+                yield [dict(record) for record in records[start:start + chunk_size]]
+            return
+        
+        offset = 0
+        while True:
+            request_params = dict(params or {})
+            request_params.update({'limit': chunk_size, 'offset': offset})
+            
+            data = self._make_request('GET', self.tables[table_name], request_params)
+            if not data or 'list' not in data:
+                if strict:
+                    raise RuntimeError(f"Could not read {table_name} rows from offset {offset}")
+                return
+            
+            rows = data['list']
+            if rows:
+                yield rows
+            
+            page_info = data.get('pageInfo', {})
+            if not rows or len(rows) < chunk_size or page_info.get('isLastPage'):
+                return
+            
+            offset += len(rows)
+    
+    def get_table_frame(self, table_name: str, params: Optional[dict] = None) -> pd.DataFrame:
+        """Get every row of a table as a typed DataFrame, from the table cache unless filtered"""
+        if params is None:
+            return table_cache.get_frame(self, table_name)
+        return self.load_table_frame(table_name, params)
+    
+    def table_versions(self, tables: List[str]) -> tuple:
+        """Get the content versions of tables; aggregates built at the same versions need no rebuild"""
+        return table_cache.versions(self, tables)
+    
+    def cached_fingerprint(self, table_name: str) -> Optional[tuple]:
+        """Get the fingerprint of a table's cached frame, loading the frame first if needed"""
+        table_cache.get_frame(self, table_name)
+        return table_cache.fingerprint(table_name)
+    
+    @staticmethod
+    def _change_column(table_name: str) -> str:
+        """Get the column whose latest value moves whenever a row is added or edited"""
+        fields = DATABASE_SCHEMA.get(table_name, {}).get('fields', [])
+        return 'updated_at' if any(field['name'] == 'updated_at' for field in fields) else 'id'
+    
+    def table_fingerprint(self, table_name: str) -> Optional[tuple]:
+        """Get a table's row count and latest change marker with one single-row request"""
+        if self.demo_mode:
+            records = self._demo_records(table_name)
+            return len(records), hash(json.dumps(records, sort_keys=True, default=str))
+        column = self._change_column(table_name)
+        try:
+            data = self._make_request('GET', self.tables[table_name],
+                                      {'limit': 1, 'sort': f"-{column}", 'fields': f"id,{column}"})
+            if not data or 'list' not in data:
+                return None
+            marker = data['list'][0].get(column) if data['list'] else None
+            return data.get('pageInfo', {}).get('totalRows'), marker
+        except Exception:
+            return None
+    
+    def get_table_changes(self, table_name: str, since: Any) -> Optional[pd.DataFrame]:
+        """Get rows added or edited since a change marker; None when changes cannot be selected"""
+        if self.demo_mode or since is None:
+            return None
+        column = self._change_column(table_name)
+        # Rows sharing the marker's timestamp are fetched again and replace their cached copies
+        operator = 'gte' if column == 'updated_at' else 'gt'
+        changes = self.load_table_frame(table_name, {'where': f"({column},{operator},{since})"})
+        if not changes.empty and 'id' not in changes.columns:
+            return None
+        return changes
+    
+    def apply_table_event(self, table_name: str, action: str, rows: List[Dict]) -> bool:
+        """Apply rows pushed by a NocoDB webhook to the table cache and drop the aggregates built on them"""
+        table_key = next((key for key, name in self.tables.items() if table_name in (key, name)), None)
+        if table_key is None:
+            return False
+        table_cache.apply_rows(table_key, rows, deleted=action == EVENT_DELETE)
+        self._invalidate_derived(table_key)
+        return True
+    
+    def _invalidate_derived(self, table_name: str) -> None:
+        """Drop the caches built from a table that changed outside this app"""
+        if table_name == 'students':
+            timeseries_registry.invalidate('enrollments')
+            fee_analytics.invalidate()
+            student_reports.invalidate()
+            academic_reports.invalidate()
+            payment_rollup.invalidate()
+        elif table_name == 'payments':
+            fee_analytics.invalidate()
+            payment_rollup.invalidate()
+        elif table_name == 'tests':
+            performance_analytics.clear()
+            leaderboard_index.clear()
+            student_reports.invalidate()
+            academic_reports.invalidate()
+        elif table_name == 'test_scores':
+            performance_analytics.clear()
+            leaderboard_index.clear()
+            student_reports.invalidate()
+            academic_reports.invalidate()
+        elif table_name == 'message_templates':
+            template_compiler.clear()
+        elif table_name == 'communication_logs':
+            timeseries_registry.invalidate('messages')
+    
+    def load_table_frame(self, table_name: str, params: Optional[dict] = None) -> pd.DataFrame:
+        """Read every row of a table from the backend as a typed DataFrame"""
+        try:
+            # Pages are split into columns as they arrive rather than kept as row dicts
+            builder = FrameBuilder(table_name)
+            for rows in self.iter_table_chunks(table_name, params=params):
+                builder.add(rows)
+            return builder.build()
+        except Exception as e:
+            print(f"Error loading {table_name}: {str(e)}")
+            return pd.DataFrame()
+    
+    def get_data_snapshot(self, tables: Optional[List[str]] = None) -> DataSnapshot:
+        """Load several tables as typed frames at one point in time"""
+        return DataSnapshot.capture(self, tables or list(self.tables))
+    
+    def count_table_rows(self, table_name: str) -> Optional[int]:
+        """Get the number of rows in a table"""
+        if self.demo_mode:
+            return len(self._demo_records(table_name))
+        try:
+            data = self._make_request('GET', self.tables[table_name], {'limit': 1})
+            if data and 'pageInfo' in data:
+                return data['pageInfo'].get('totalRows')
+            return None
+        except Exception:
             return None
     
     # Category Management
@@ -241,6 +512,7 @@ class DatabaseManager:
             new_id = max([cat['id'] for cat in self.demo_categories]) + 1 if self.demo_categories else 1
             category_data['id'] = new_id
             self.demo_categories.append(category_data)
+            data_version.bump()
             return True
         try:
             result = self._make_request('POST', self.tables['categories'], category_data)
@@ -404,12 +676,21 @@ class DatabaseManager:
             student_data['id'] = new_id
             student_data['pending_amount'] = student_data.get('total_fee', 0) - student_data.get('paid_amount', 0)
             self.demo_students.append(student_data)
+            data_version.bump()
+            timeseries_registry.invalidate('enrollments')
+            fee_analytics.invalidate()
+            student_reports.invalidate()
+            academic_reports.invalidate()
             # Log activity
             self.log_activity(f"New student {student_data['full_name']} enrolled in {student_data['batch']}")
             return True
         try:
             result = self._make_request('POST', self.tables['students'], student_data)
             if result:
+                timeseries_registry.invalidate('enrollments')
+                fee_analytics.invalidate()
+                student_reports.invalidate()
+                academic_reports.invalidate()
                 # Log activity
                 self.log_activity(f"New student {student_data['full_name']} enrolled in {student_data['batch']}")
                 return True
@@ -422,6 +703,10 @@ class DatabaseManager:
         try:
             student_id = student_data.pop('id')
             result = self._make_request('PUT', f"{self.tables['students']}/{student_id}", student_data)
+            if result is not None:
+                fee_analytics.invalidate()
+                student_reports.invalidate()
+                academic_reports.invalidate()
             return result is not None
         except Exception:
             return False
@@ -430,6 +715,10 @@ class DatabaseManager:
         """Delete student"""
         try:
             result = self._make_request('DELETE', f"{self.tables['students']}/{student_id}")
+            if result is not None:
+                fee_analytics.invalidate()
+                student_reports.invalidate()
+                academic_reports.invalidate()
             return result is not None
         except Exception:
             return False
@@ -573,6 +862,9 @@ class DatabaseManager:
         try:
             result = self._make_request('POST', self.tables['tests'], test_data)
             if result and 'id' in result:
+                performance_analytics.invalidate_batch(test_data.get('batch_id'))
+                student_reports.invalidate()
+                academic_reports.invalidate()
                 return result['id']
             return None
         except Exception:
@@ -611,6 +903,29 @@ class DatabaseManager:
                 # Create new score
                 result = self._make_request('POST', self.tables['test_scores'], score_data)
             
+            if result is not None:
+                recorded = leaderboard_index.record_score(
+                    score_data['test_id'],
+                    score_data['student_id'],
+                    score_data.get('marks_obtained'),
+                    score_data.get('attendance', 'Present')
+                )
+                # Cached batches take the score in place; only those that cannot are rebuilt
+                if not performance_analytics.record_score(
+                    score_data['test_id'],
+                    score_data['student_id'],
+                    score_data.get('marks_obtained'),
+                    score_data.get('attendance', 'Present')
+                ) or not recorded:
+                    performance_analytics.invalidate_test(score_data['test_id'])
+                student_reports.invalidate()
+                academic_reports.record_score(
+                    score_data['test_id'],
+                    score_data['student_id'],
+                    score_data.get('marks_obtained'),
+                    score_data.get('attendance', 'Present')
+                )
+            
             return result is not None
         except Exception:
             return False
@@ -633,6 +948,86 @@ class DatabaseManager:
         except Exception:
             return 0
     
+    def get_batch_performance_overview(self, batch_id: int) -> Optional[dict]:
+        """Get performance overview for a batch"""
+        try:
+            return performance_analytics.get_batch(self, batch_id).overview
+        except Exception as e:
+            print(f"Error getting batch performance: {str(e)}")
+            return None
+    
+    def get_batch_score_distribution(self, batch_id: int) -> pd.DataFrame:
+        """Get score distribution for a batch"""
+        try:
+            return performance_analytics.get_batch(self, batch_id).score_distribution
+        except Exception:
+            return pd.DataFrame()
+    
+    def get_batch_progress_over_time(self, batch_id: int) -> pd.DataFrame:
+        """Get average batch score per test date"""
+        try:
+            return performance_analytics.get_batch(self, batch_id).progress_over_time
+        except Exception:
+            return pd.DataFrame()
+    
+    def get_batch_student_rankings(self, batch_id: int) -> pd.DataFrame:
+        """Get student rankings within a batch"""
+        try:
+            rankings = performance_analytics.get_batch(self, batch_id).student_rankings.copy()
+            board = leaderboard_index.batch(batch_id)
+            if board is not None and not rankings.empty:
+                rankings['rank'] = rankings['student_id'].map(board.rank).fillna(len(board) + 1).astype(int)
+                rankings = rankings.sort_values(['rank', 'student_name']).reset_index(drop=True)
+            return rankings
+        except Exception:
+            return pd.DataFrame()
+    
+    def get_batch_top_performers(self, batch_id: int, limit: int = 3) -> pd.DataFrame:
+        """Get the best students in a batch by average score"""
+        try:
+            performance = performance_analytics.get_batch(self, batch_id)
+            board = leaderboard_index.batch(batch_id)
+            if board is None or len(board) == 0:
+                return pd.DataFrame()
+            
+            names = performance.results.drop_duplicates('student_id').set_index('student_id')['student_name']
+            return pd.DataFrame([
+                {
+                    'rank': board.rank(student_id),
+                    'student_id': student_id,
+                    'student_name': names.get(student_id, f"Student {student_id}"),
+                    'average_score': score
+                }
+                for student_id, score in board.top(limit)
+            ])
+        except Exception:
+            return pd.DataFrame()
+    
+    def get_student_test_rank(self, test_id: int, student_id: int) -> Optional[dict]:
+        """Get a student's rank and percentile in a test"""
+        try:
+            board = leaderboard_index.test(test_id)
+            if board is None:
+                # Load the test's batch to build its leaderboards
+                test_details = self.get_test_details(test_id)
+                if not test_details or test_details.get('batch_id') is None:
+                    return None
+                performance_analytics.get_batch(self, test_details['batch_id'])
+                board = leaderboard_index.test(test_id)
+            
+            if board is None or student_id not in board:
+                return None
+            
+            score = board.score(student_id)
+            return {
+                'rank': board.rank(student_id),
+                'total_students': len(board),
+                'percentage': score,
+                'percentile': board.percentile(score)
+            }
+        except Exception:
+            return None
+    
     def get_student_performance_history(self, student_id: int) -> pd.DataFrame:
         """Get performance history for a student"""
         try:
@@ -664,7 +1059,7 @@ class DatabaseManager:
     def get_fee_statistics(self) -> Optional[dict]:
         """Get fee collection statistics"""
         try:
-            students = self.get_all_students()
+            students = self.get_table_frame('students')
             if students.empty:
                 return None
             
@@ -714,6 +1109,13 @@ class DatabaseManager:
                     # Log activity
                     self.log_activity(f"Payment of ₹{amount} received from student ID {student_id}")
                 
+                payment_rollup.add_payment(
+                    payment_data,
+                    payment_result.get('id'),
+                    student_data.get('category') if student_data else None
+                )
+                fee_analytics.invalidate()
+                
                 return {'payment_id': payment_result.get('id')}
             
             return None
@@ -823,6 +1225,78 @@ class DatabaseManager:
         except Exception:
             return pd.DataFrame()
     
+    # Fee Analytics
+    def get_monthly_fee_collection(self) -> pd.DataFrame:
+        """Get fee collection per month across all payments"""
+        try:
+            return fee_analytics.get_frame(self).monthly_collection()[['month', 'amount']]
+        except Exception as e:
+            print(f"Error getting monthly fee collection: {str(e)}")
+            return pd.DataFrame()
+    
+    def get_fee_collection_by_category(self) -> pd.DataFrame:
+        """Get fees expected, collected and pending per category"""
+        try:
+            return fee_analytics.get_frame(self).category_summary()
+        except Exception as e:
+            print(f"Error getting fee collection by category: {str(e)}")
+            return pd.DataFrame()
+    
+    def filter_students_for_reminders(self, students: pd.DataFrame, recipient_filter: str) -> pd.DataFrame:
+        """Filter students with pending fees for a fee reminder"""
+        try:
+            return fee_analytics.filter_reminder_recipients(students, recipient_filter)
+        except Exception:
+            return pd.DataFrame()
+    
+    def get_monthly_collection_report(self, start_date: date, end_date: date) -> pd.DataFrame:
+        """Get monthly collection summary for a date range"""
+        try:
+            return fee_analytics.get_frame(self).monthly_collection(start_date, end_date)
+        except Exception as e:
+            print(f"Error generating monthly collection report: {str(e)}")
+            return pd.DataFrame()
+    
+    def get_category_wise_fee_report(self, start_date: date, end_date: date) -> pd.DataFrame:
+        """Get category-wise fee report with collection in a date range"""
+        try:
+            return fee_analytics.get_frame(self).category_summary(start_date, end_date)
+        except Exception as e:
+            print(f"Error generating category-wise fee report: {str(e)}")
+            return pd.DataFrame()
+    
+    def get_payment_method_report(self, start_date: date, end_date: date) -> pd.DataFrame:
+        """Get collection by payment method for a date range"""
+        try:
+            return fee_analytics.get_frame(self).payment_methods(start_date, end_date)
+        except Exception as e:
+            print(f"Error generating payment method report: {str(e)}")
+            return pd.DataFrame()
+    
+    def get_defaulter_report(self) -> pd.DataFrame:
+        """Get students with overdue pending fees"""
+        try:
+            return fee_analytics.get_frame(self).defaulters()
+        except Exception as e:
+            print(f"Error generating defaulter report: {str(e)}")
+            return pd.DataFrame()
+    
+    def get_fee_trends_report(self, start_date: date, end_date: date) -> pd.DataFrame:
+        """Get daily and cumulative fee collection for a date range"""
+        try:
+            return fee_analytics.get_frame(self).daily_trend(start_date, end_date)
+        except Exception as e:
+            print(f"Error generating fee trends report: {str(e)}")
+            return pd.DataFrame()
+    
+    def export_report_to_excel(self, report_data: pd.DataFrame, report_type: str) -> bytes:
+        """Export a fee report to Excel"""
+        try:
+            return fee_analytics.export_report(report_data, report_type)
+        except Exception as e:
+            print(f"Error exporting report: {str(e)}")
+            return self._empty_export(sheet_name=report_type[:31])
+    
     # Message Templates and Communication
     def get_message_templates(self) -> pd.DataFrame:
         """Get all message templates"""
@@ -846,6 +1320,7 @@ class DatabaseManager:
         """Update message template"""
         try:
             result = self._make_request('PUT', f"{self.tables['message_templates']}/{template_id}", template_data)
+            template_compiler.invalidate(template_id)
             return result is not None
         except Exception:
             return False
@@ -854,6 +1329,7 @@ class DatabaseManager:
         """Delete message template"""
         try:
             result = self._make_request('DELETE', f"{self.tables['message_templates']}/{template_id}")
+            template_compiler.invalidate(template_id)
             return result is not None
         except Exception:
             return False
@@ -880,6 +1356,8 @@ class DatabaseManager:
             }
             
             result = self._make_request('POST', self.tables['communication_logs'], log_data)
+            if result is not None:
+                timeseries_registry.invalidate('messages')
             return result is not None
         except Exception:
             return False
@@ -887,22 +1365,15 @@ class DatabaseManager:
     def get_communication_statistics(self) -> Optional[dict]:
         """Get communication statistics"""
         try:
-            data = self._make_request('GET', self.tables['communication_logs'])
-            if data and 'list' in data:
-                logs_df = pd.DataFrame(data['list'])
-                
-                if not logs_df.empty:
-                    logs_df['timestamp'] = pd.to_datetime(logs_df['timestamp'])
-                    today = pd.Timestamp.now().date()
-                    
-                    return {
-                        'total': len(logs_df),
-                        'today': len(logs_df[logs_df['timestamp'].dt.date == today]),
-                        'this_week': len(logs_df[logs_df['timestamp'] >= pd.Timestamp.now() - pd.Timedelta(days=7)]),
-                        'this_month': len(logs_df[logs_df['timestamp'] >= pd.Timestamp.now() - pd.Timedelta(days=30)])
-                    }
+            messages = timeseries_registry.get(self, 'messages')
+            today = date.today()
             
-            return {'total': 0, 'today': 0, 'this_week': 0, 'this_month': 0}
+            return {
+                'total': int(messages.total()),
+                'today': int(messages.range_sum(today, today)),
+                'this_week': int(messages.range_sum(today - timedelta(days=6), today)),
+                'this_month': int(messages.range_sum(today - timedelta(days=29), today))
+            }
         except Exception:
             return {'total': 0, 'today': 0, 'this_week': 0, 'this_month': 0}
     
@@ -937,10 +1408,10 @@ class DatabaseManager:
     
     # Dashboard and Analytics
     def get_dashboard_metrics(self) -> dict:
-        """Get metrics for dashboard"""
+        """Get metrics for dashboard from the cached table frames"""
         try:
-            students = self.get_all_students()
-            batches = self.get_all_batches()
+            students = self.get_table_frame('students')
+            batches = self.get_table_frame('batches')
             
             total_students = len(students)
             active_batches = len(batches)
@@ -1057,77 +1528,131 @@ class DatabaseManager:
             return False
     
     # Export Functions
-    def export_students_to_excel(self) -> bytes:
-        """Export students data to Excel"""
+    def _empty_export(self, export_format: str = "Excel", sheet_name: str = "Sheet",
+                      columns: Optional[List[str]] = None, output: Any = None) -> Optional[bytes]:
+        """Get an empty export file, or write it over the output file if one is given"""
         try:
-            students = self.get_all_students()
-            
-            # Create Excel file
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                students.to_excel(writer, sheet_name='Students', index=False)
-            
-            output.seek(0)
-            return output.getvalue()
+            data = export_engine.write([], export_format, sheet_name, columns=columns).data
         except Exception:
-            # Return empty Excel file on error
-            output = io.BytesIO()
+            buffer = io.BytesIO()
             wb = Workbook()
-            wb.save(output)
-            output.seek(0)
-            return output.getvalue()
+            wb.save(buffer)
+            data = buffer.getvalue()
+        
+        if output is None:
+            return data
+        output.seek(0)
+        output.truncate()
+        output.write(data)
+        return None
+    
+    def _export_table(self, table_name: str, sheet_name: str, export_format: str = "Excel",
+                      transform: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+                      extra_columns: Optional[List[str]] = None,
+                      progress_callback: Optional[Callable[[int, Optional[int]], None]] = None,
+                      output: Any = None) -> Optional[bytes]:
+        """Stream a whole table into an export file, returned as bytes unless an output file is given"""
+        columns = schema_columns(table_name, extra_columns)
+        # Exports written to a file run as jobs, which must fail rather than keep a partial file
+        strict = output is not None
+        
+        def chunks():
+            for rows in self.iter_table_chunks(table_name, strict=strict):
+                chunk = pd.DataFrame(rows)
+                yield transform(chunk) if transform else chunk
+        
+        try:
+            result = export_engine.write(
+                chunks(),
+                export_format,
+                sheet_name,
+                columns=columns,
+                table_name=table_name,
+                output=output,
+                total_rows=self.count_table_rows(table_name),
+                progress_callback=progress_callback
+            )
+            return result.data
+        except Exception as e:
+            print(f"Error exporting {table_name}: {str(e)}")
+            if strict:
+                raise
+            # Return empty file on error
+            return self._empty_export(export_format, sheet_name, columns, output)
+    
+    def _add_pending_amount(self, students: pd.DataFrame) -> pd.DataFrame:
+        """Add the pending amount column to a chunk of students"""
+        if not students.empty and 'total_fee' in students.columns and 'paid_amount' in students.columns:
+            students['pending_amount'] = students['total_fee'] - students['paid_amount']
+        return students
+    
+    def export_students(self, export_format: str = "Excel",
+                        progress_callback: Optional[Callable[[int, Optional[int]], None]] = None,
+                        output: Any = None) -> Optional[bytes]:
+        """Export students data as Excel, CSV or Parquet"""
+        return self._export_table(
+            'students', 'Students', export_format,
+            transform=self._add_pending_amount,
+            extra_columns=['pending_amount'],
+            progress_callback=progress_callback,
+            output=output
+        )
+    
+    def export_batches(self, export_format: str = "Excel",
+                       progress_callback: Optional[Callable[[int, Optional[int]], None]] = None,
+                       output: Any = None) -> Optional[bytes]:
+        """Export batches data as Excel, CSV or Parquet"""
+        return self._export_table('batches', 'Batches', export_format, progress_callback=progress_callback,
+                                  output=output)
+    
+    def export_pending_fees(self, pending_fees: pd.DataFrame, export_format: str = "Excel",
+                            progress_callback: Optional[Callable[[int, Optional[int]], None]] = None,
+                            output: Any = None) -> Optional[bytes]:
+        """Export pending fees as Excel, CSV or Parquet"""
+        try:
+            result = export_engine.write(
+                dataframe_chunks(pending_fees),
+                export_format,
+                'Pending Fees',
+                columns=list(pending_fees.columns),
+                table_name='students',
+                output=output,
+                total_rows=len(pending_fees),
+                progress_callback=progress_callback
+            )
+            return result.data
+        except Exception as e:
+            print(f"Error exporting pending fees: {str(e)}")
+            if output is not None:
+                raise
+            return self._empty_export(export_format, 'Pending Fees', list(pending_fees.columns), output)
+    
+    def export_communication_logs(self, export_format: str = "Excel",
+                                  progress_callback: Optional[Callable[[int, Optional[int]], None]] = None,
+                                  output: Any = None) -> Optional[bytes]:
+        """Export communication logs as Excel, CSV or Parquet"""
+        return self._export_table(
+            'communication_logs', 'Communication Logs', export_format,
+            progress_callback=progress_callback,
+            output=output
+        )
+    
+    def export_students_to_excel(self, progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> bytes:
+        """Export students data to Excel"""
+        return self.export_students("Excel", progress_callback)
     
-    def export_batches_to_excel(self) -> bytes:
+    def export_batches_to_excel(self, progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> bytes:
         """Export batches data to Excel"""
-        try:
-            batches = self.get_all_batches()
-            
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                batches.to_excel(writer, sheet_name='Batches', index=False)
-            
-            output.seek(0)
-            return output.getvalue()
-        except Exception:
-            output = io.BytesIO()
-            wb = Workbook()
-            wb.save(output)
-            output.seek(0)
-            return output.getvalue()
+        return self.export_batches("Excel", progress_callback)
     
-    def export_pending_fees_to_excel(self, pending_fees: pd.DataFrame) -> bytes:
+    def export_pending_fees_to_excel(self, pending_fees: pd.DataFrame,
+                                     progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> bytes:
         """Export pending fees to Excel"""
-        try:
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                pending_fees.to_excel(writer, sheet_name='Pending Fees', index=False)
-            
-            output.seek(0)
-            return output.getvalue()
-        except Exception:
-            output = io.BytesIO()
-            wb = Workbook()
-            wb.save(output)
-            output.seek(0)
-            return output.getvalue()
+        return self.export_pending_fees(pending_fees, "Excel", progress_callback)
     
-    def export_communication_logs_to_excel(self) -> bytes:
+    def export_communication_logs_to_excel(self, progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> bytes:
         """Export communication logs to Excel"""
-        try:
-            logs = self.get_communication_logs()
-            
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                logs.to_excel(writer, sheet_name='Communication Logs', index=False)
-            
-            output.seek(0)
-            return output.getvalue()
-        except Exception:
-            output = io.BytesIO()
-            wb = Workbook()
-            wb.save(output)
-            output.seek(0)
-            return output.getvalue()
+        return self.export_communication_logs("Excel", progress_callback)
     
     # Archive Functions
     def archive_completed_batches(self) -> int:
@@ -1158,64 +1683,95 @@ class DatabaseManager:
             return False
     
     # Additional helper methods for reports and analytics
+    def _previous_period(self, start_date: date, end_date: date) -> tuple:
+        """Get the period of the same length just before a date range"""
+        days = (end_date - start_date).days + 1
+        previous_end = start_date - timedelta(days=1)
+        return previous_end - timedelta(days=days - 1), previous_end
+    
+    def _average_performance(self, start_date: date, end_date: date) -> float:
+        """Get the average test percentage for tests held in a date range"""
+        tests = self.get_table_frame('tests')
+        if tests.empty or 'date' not in tests.columns:
+            return 0.0
+        
+        tests = tests[(tests['date'] >= pd.Timestamp(start_date)) & (tests['date'] <= pd.Timestamp(end_date))]
+        if tests.empty:
+            return 0.0
+        
+        test_ids = tests['id'].dropna().astype(int).tolist()
+        scores = self.get_table_frame('test_scores', {'where': f"(test_id,in,{','.join(map(str, test_ids))})"})
+        if scores.empty or 'test_id' not in scores.columns:
+            return 0.0
+        
+        scores = scores.merge(tests[['id', 'max_marks']], left_on='test_id', right_on='id', suffixes=('', '_test'))
+        percentages = scores['marks_obtained'] / scores['max_marks'].where(scores['max_marks'] > 0) * 100
+        return float(percentages.mean()) if percentages.notna().any() else 0.0
+    
     def get_kpi_data(self, start_date: date, end_date: date) -> Optional[dict]:
         """Get KPI data for dashboard reports"""
         try:
-            # Mock implementation - replace with actual calculations
+            payment_rollup.ensure_current(self)
+            previous_start, previous_end = self._previous_period(start_date, end_date)
+            
+            # Revenue from the daily rollup
+            total_revenue = float(payment_rollup.range_totals(start_date, end_date)['amount'])
+            previous_revenue = float(payment_rollup.range_totals(previous_start, previous_end)['amount'])
+            
+            # Enrollments by admission date
+            enrollments = timeseries_registry.get(self, 'enrollments')
+            new_enrollments = int(enrollments.range_sum(start_date, end_date))
+            previous_enrollments = int(enrollments.range_sum(previous_start, previous_end))
+            
+            students = self.get_table_frame('students')
+            collection_rate = 0.0
+            if not students.empty and 'total_fee' in students.columns and students['total_fee'].sum() > 0:
+                collection_rate = float(students['paid_amount'].sum() / students['total_fee'].sum() * 100)
+            
+            avg_performance = self._average_performance(start_date, end_date)
+            previous_performance = self._average_performance(previous_start, previous_end)
+            
             return {
-                'total_revenue': 245000,
-                'revenue_change': 15,
-                'new_enrollments': 12,
-                'enrollment_change': 8,
-                'collection_rate': 87.5,
-                'collection_change': 5,
-                'avg_performance': 78.2,
-                'performance_change': 3
+                'total_revenue': total_revenue,
+                'revenue_change': percent_change(total_revenue, previous_revenue),
+                'new_enrollments': new_enrollments,
+                'enrollment_change': percent_change(new_enrollments, previous_enrollments),
+                'collection_rate': collection_rate,
+                'collection_vs_target': round(collection_rate - DASHBOARD_CONFIG['collection_rate_target'], 1),
+                'avg_performance': avg_performance,
+                'performance_change': percent_change(avg_performance, previous_performance)
             }
-        except Exception:
+        except Exception as e:
+            print(f"Error getting KPI data: {str(e)}")
             return None
     
     def get_revenue_trend_data(self, start_date: date, end_date: date) -> pd.DataFrame:
         """Get revenue trend data"""
         try:
-            # Generate date range
-            date_range = pd.date_range(start=start_date, end=end_date, freq='D')
-            
-            # Mock data - replace with actual revenue calculations
-            revenue_data = []
-            for single_date in date_range:
-                revenue_data.append({
-                    'date': single_date.date(),
-                    'revenue': 5000 + (single_date.day * 100)  # Mock calculation
-                })
-            
-            return pd.DataFrame(revenue_data)
+            payment_rollup.ensure_current(self)
+            return payment_rollup.daily_series(start_date, end_date)
+        except Exception:
+            return pd.DataFrame()
+    
+    def get_revenue_breakdown(self, start_date: date, end_date: date, by: str = 'method') -> pd.DataFrame:
+        """Get revenue by payment method or by category for a date range"""
+        try:
+            payment_rollup.ensure_current(self)
+            prefix = METHOD_PREFIX if by == 'method' else CATEGORY_PREFIX
+            breakdown = payment_rollup.breakdown(start_date, end_date, prefix)
+            return breakdown.rename_axis(by).reset_index(name='revenue')
         except Exception:
             return pd.DataFrame()
     
     def get_enrollment_trend_data(self, start_date: date, end_date: date) -> pd.DataFrame:
         """Get enrollment trend data"""
         try:
-            students = self.get_all_students()
-            if students.empty or 'admission_date' not in students.columns:
-                return pd.DataFrame()
-            
-            students['admission_date'] = pd.to_datetime(students['admission_date']).dt.date
-            
-            # Filter by date range
-            filtered_students = students[
-                (students['admission_date'] >= start_date) & 
-                (students['admission_date'] <= end_date)
-            ]
-            
-            if filtered_students.empty:
+            enrollments = timeseries_registry.get(self, 'enrollments').daily(start_date, end_date, 'count')
+            if enrollments.empty:
                 return pd.DataFrame()
             
-            # Group by date and count enrollments
-            enrollment_counts = filtered_students.groupby('admission_date').size().reset_index(name='new_enrollments')
-            enrollment_counts.rename(columns={'admission_date': 'date'}, inplace=True)
-            
-            return enrollment_counts
+            enrollments['count'] = enrollments['count'].astype(int)
+            return enrollments.rename(columns={'count': 'new_enrollments'})
         except Exception:
             return pd.DataFrame()
     
@@ -1252,33 +1808,168 @@ class DatabaseManager:
             return pd.DataFrame()
     
     # Additional methods for comprehensive reporting
+    def get_student_demographics(self, category: str, batch: str) -> pd.DataFrame:
+        """Get students with age and age group for the demographics report"""
+        try:
+            return student_reports.get_frame(self).demographics(category, batch)
+        except Exception as e:
+            print(f"Error getting student demographics: {str(e)}")
+            return pd.DataFrame()
+    
+    def get_enrollment_analysis(self, category: str, batch: str, date_range: str) -> pd.DataFrame:
+        """Get students admitted in a date range with their admission month"""
+        try:
+            return student_reports.get_frame(self).enrollments(category, batch, date_range)
+        except Exception as e:
+            print(f"Error getting enrollment analysis: {str(e)}")
+            return pd.DataFrame()
+    
+    def get_attendance_report(self, category: str, batch: str, date_range: str) -> pd.DataFrame:
+        """Get student attendance rates over tests held in a date range"""
+        try:
+            return student_reports.get_frame(self).attendance(category, batch, date_range)
+        except Exception as e:
+            print(f"Error getting attendance report: {str(e)}")
+            return pd.DataFrame()
+    
+    def export_student_report(self, report_type: str, category: str, batch: str, date_range: str) -> bytes:
+        """Export a student report to Excel"""
+        try:
+            return student_reports.export_report(self, report_type, category, batch, date_range)
+        except Exception as e:
+            print(f"Error exporting student report: {str(e)}")
+            return self._empty_export(sheet_name=report_type[:31])
+    
+    def get_detailed_revenue_analysis(self, start_date: date, end_date: date) -> Optional[dict]:
+        """Get revenue totals, growth and breakdowns for a date range"""
+        try:
+            return financial_reports.get_report(self, "Revenue Analysis", start_date, end_date)
+        except Exception as e:
+            print(f"Error getting revenue analysis: {str(e)}")
+            return None
+    
+    def get_fee_collection_analysis(self, start_date: date, end_date: date) -> Optional[dict]:
+        """Get fee collection figures for a date range"""
+        try:
+            return financial_reports.get_report(self, "Fee Collection Report", start_date, end_date)
+        except Exception as e:
+            print(f"Error getting fee collection analysis: {str(e)}")
+            return None
+    
+    def get_outstanding_dues_analysis(self) -> Optional[dict]:
+        """Get outstanding dues with ageing buckets and top defaulters"""
+        try:
+            return financial_reports.get_report(self, "Outstanding Dues Report")
+        except Exception as e:
+            print(f"Error getting outstanding dues analysis: {str(e)}")
+            return None
+    
+    def export_financial_report(self, report_type: str, start_date: date, end_date: date) -> bytes:
+        """Export a financial report to Excel"""
+        try:
+            return financial_reports.export_report(self, report_type, start_date, end_date)
+        except Exception as e:
+            print(f"Error exporting financial report: {str(e)}")
+            return self._empty_export(sheet_name=report_type[:31])
+    
+    def get_overall_performance_analysis(self, category: str, period: str) -> Optional[dict]:
+        """Get headline performance figures, score distribution and monthly trend"""
+        try:
+            return academic_reports.get_index(self).overall(category, period)
+        except Exception as e:
+            print(f"Error getting overall performance analysis: {str(e)}")
+            return None
+    
+    def get_subject_wise_performance(self, category: str, period: str) -> pd.DataFrame:
+        """Get average score, top score and pass rate per subject"""
+        try:
+            return academic_reports.get_index(self).subject_wise(category, period)
+        except Exception as e:
+            print(f"Error getting subject-wise performance: {str(e)}")
+            return pd.DataFrame()
+    
+    def get_test_analysis_report(self, category: str, period: str) -> Optional[dict]:
+        """Get participation and average score per test"""
+        try:
+            return academic_reports.get_index(self).test_analysis(category, period)
+        except Exception as e:
+            print(f"Error getting test analysis report: {str(e)}")
+            return None
+    
+    def get_top_performers_report(self, category: str, period: str) -> pd.DataFrame:
+        """Get the best students by average score"""
+        try:
+            return academic_reports.get_index(self).top_performers(category, period)
+        except Exception as e:
+            print(f"Error getting top performers report: {str(e)}")
+            return pd.DataFrame()
+    
+    def get_category_wise_toppers(self, period: str) -> pd.DataFrame:
+        """Get the best students within each category"""
+        try:
+            return academic_reports.get_index(self).category_toppers(period)
+        except Exception as e:
+            print(f"Error getting category-wise toppers: {str(e)}")
+            return pd.DataFrame()
+    
+    def export_academic_report(self, report_type: str, category: str, period: str) -> bytes:
+        """Export an academic report to Excel"""
+        try:
+            return academic_reports.export_report(self, report_type, category, period)
+        except Exception as e:
+            print(f"Error exporting academic report: {str(e)}")
+            return self._empty_export(sheet_name=report_type[:31])
+    
     def run_system_health_check(self) -> Optional[dict]:
-        """Run system health check"""
+        """Run system health check from the health monitor's probes"""
         try:
+            health = self.get_health_status()
+            target_ms = API_CONFIG["health_latency_target_ms"]
+            free_mb = shutil.disk_usage(tempfile.gettempdir()).free / (1024 * 1024)
+            recommendations = []
+            
+            database = health['available'] is not False
+            if not database:
+                recommendations.append("NocoDB is not answering; check the server and the NOCODB_BASE_URL setting")
+            
+            api_connection = health['breaker'] == BREAKER_CLOSED
+            if not api_connection:
+                recommendations.append("Requests to NocoDB are paused after repeated failures; pages show the last good data")
+            elif health['availability'] is not None and health['availability'] < 99:
+                recommendations.append(f"NocoDB answered {health['availability']:.1f}% of recent probes; check network stability")
+            
+            storage = free_mb >= SYSTEM_CONFIG["min_free_disk_mb"]
+            if not storage:
+                recommendations.append(f"Only {free_mb:.0f} MB free for exports; clear space on the server")
+            
+            performance = health['p95_ms'] is None or health['p95_ms'] <= target_ms
+            if not performance:
+                recommendations.append(f"NocoDB p95 latency is {health['p95_ms']:.0f} ms, above the {target_ms} ms target")
+            
             return {
-                'database': self.check_connection(),
-                'api_connection': True,  # Mock data
-                'storage': True,         # Mock data
-                'performance': True,     # Mock data
-                'recommendations': []    # Mock data
+                'database': database,
+                'api_connection': api_connection,
+                'storage': storage,
+                'performance': performance,
+                'latency_ms': health['latency_ms'],
+                'p50_ms': health['p50_ms'],
+                'p95_ms': health['p95_ms'],
+                'p99_ms': health['p99_ms'],
+                'availability': health['availability'],
+                'checked_at': health['checked_at'],
+                'free_disk_mb': free_mb,
+                'cache': self.get_cache_stats(),
+                'recommendations': recommendations
             }
-        except Exception:
+        except Exception as e:
+            print(f"Error running system health check: {str(e)}")
             return None
     
-    def generate_bulk_reports(self, selected_reports: List[str], report_format: str) -> Optional[bytes]:
+    def generate_bulk_reports(self, selected_reports: List[str], report_format: str,
+                              progress: Optional[Callable[[float, str], None]] = None) -> Optional[dict]:
         """Generate bulk reports"""
         try:
-            # Mock implementation - would generate actual reports
-            output = io.BytesIO()
-            
-            if report_format == "Excel (.xlsx)":
-                with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                    for report in selected_reports:
-                        # Create mock data for each report
-                        mock_data = pd.DataFrame({'Report': [report], 'Status': ['Generated']})
-                        mock_data.to_excel(writer, sheet_name=report[:31], index=False)  # Excel sheet name limit
-            
-            output.seek(0)
-            return output.getvalue()
-        except Exception:
+            return bulk_report_generator.generate(self, selected_reports, report_format, progress)
+        except Exception as e:
+            print(f"Error generating bulk reports: {str(e)}")
             return None
@@ -0,0 +1,83 @@
+import atexit
+import os
+import shutil
+import tempfile
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+from config.settings import REPORT_CONFIG
+from utils.exporter import EXPORT_FILE_TYPES, export_file_name, export_mime_type
+from utils.report_jobs import ReportJob, ReportJobRunner
+
+
+class ExportFile:
+    """A finished export waiting on disk to be downloaded"""
+
+    def __init__(self, path: str, file_name: str, mime: str):
+        self.path = path
+        self.file_name = file_name
+        self.mime = mime
+
+    @property
+    def available(self) -> bool:
+        return os.path.exists(self.path)
+
+    def read(self) -> bytes:
+        """Read the exported file"""
+        with open(self.path, 'rb') as exported:
+            return exported.read()
+
+
+class ExportJobRunner(ReportJobRunner):
+    """
+    Writes exports to temporary files on background threads
+    Finished files are kept for the retention period, so repeat downloads of unchanged data are free
+    """
+
+    # Exports live on disk until their retention ends, outside the in-memory cache budget
+    cache_namespace = None
+
+    def __init__(self, max_workers: int = REPORT_CONFIG["export_job_workers"],
+                 max_jobs: int = REPORT_CONFIG["export_job_cache_size"],
+                 retention_minutes: int = REPORT_CONFIG["export_retention_minutes"]):
+        super().__init__(max_workers, max_jobs, retention_minutes * 60)
+        self.directory = tempfile.mkdtemp(prefix="coaching_exports_")
+        atexit.register(shutil.rmtree, self.directory, True)
+
+    def submit_export(self, name: str, export_format: str, export: Callable[..., Any], file_prefix: str,
+                      params: Optional[Dict[str, Any]] = None) -> ReportJob:
+        """Queue export(export_format, progress_callback=, output=) to a file, or reuse the one kept for the same data"""
+        def build(job: ReportJob) -> ExportFile:
+            def progress(rows_written: int, total_rows: Optional[int]) -> None:
+                if total_rows:
+                    job.update(rows_written / total_rows, f"Exporting {name.lower()}: {rows_written} of {total_rows} rows")
+                else:
+                    job.update(0.0, f"Exporting {name.lower()}: {rows_written} rows")
+
+            extension = EXPORT_FILE_TYPES[export_format][0]
+            path = os.path.join(self.directory, f"{uuid.uuid4().hex}{extension}")
+            try:
+                with open(path, 'wb') as output:
+                    export(export_format, progress_callback=progress, output=output)
+            except Exception:
+                if os.path.exists(path):
+                    os.remove(path)
+                raise
+
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            return ExportFile(path, export_file_name(file_prefix, export_format, timestamp),
+                              export_mime_type(export_format))
+
+        return self.submit(f"{name} export", {'format': export_format, **(params or {})}, build)
+
+    def _discard(self, job: ReportJob) -> None:
+        """Delete a dropped export's file"""
+        if isinstance(job.result, ExportFile) and job.result.available:
+            try:
+                os.remove(job.result.path)
+            except OSError as e:
+                print(f"Error removing export file: {str(e)}")
+
+
+# Global export job runner instance
+export_jobs = ExportJobRunner()
@@ -0,0 +1,414 @@
+import io
+import json
+import importlib.util
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
+import pandas as pd
+from openpyxl import Workbook
+from config.settings import REPORT_CONFIG, API_CONFIG, DATABASE_SCHEMA
+from utils.offload import process_offloader
+
+# Hard cap on rows written by any single export
+EXPORT_ROW_LIMIT = min(REPORT_CONFIG["max_records_per_export"], API_CONFIG["export_size_limit"])
+
+# Rows pulled from the backend per request while streaming
+EXPORT_CHUNK_SIZE = 1000
+
+# Largest Excel export gathered in memory for a worker process; bigger ones stream in the server
+OFFLOAD_EXCEL_MAX_ROWS = REPORT_CONFIG["offload_excel_max_rows"]
+
+# File extension and mime type for each export format the engine can write
+EXPORT_FILE_TYPES = {
+    "Excel": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "CSV": (".csv", "text/csv"),
+    "Parquet": (".parquet", "application/vnd.apache.parquet")
+}
+
+# Columns stored as dictionary-encoded categories in Parquet
+CATEGORY_FIELD_TYPES = {"SingleSelect"}
+CATEGORY_FIELD_NAMES = {"category", "batch", "batch_name", "payment_method", "message_type", "status"}
+
+ProgressCallback = Callable[[int, Optional[int]], None]
+
+
+def get_export_formats() -> List[str]:
+    """Get the configured export formats that the engine can write"""
+    formats = [fmt for fmt in REPORT_CONFIG["export_formats"] if fmt in EXPORT_FILE_TYPES]
+    if "Parquet" in formats and importlib.util.find_spec("pyarrow") is None:
+        # Parquet needs the optional pyarrow package
+        formats.remove("Parquet")
+    return formats
+
+
+def export_file_name(prefix: str, export_format: str, timestamp: str) -> str:
+    """Build a download file name for an export"""
+    extension, _ = EXPORT_FILE_TYPES[export_format]
+    return f"{prefix}_{timestamp}{extension}"
+
+
+def export_mime_type(export_format: str) -> str:
+    """Get the mime type for an export format"""
+    return EXPORT_FILE_TYPES[export_format][1]
+
+
+def schema_columns(table_name: str, extra_columns: Optional[List[str]] = None) -> List[str]:
+    """Get the column order for a table from the schema definitions"""
+    fields = DATABASE_SCHEMA.get(table_name, {}).get("fields", [])
+    columns = [field["name"] for field in fields]
+    for column in extra_columns or []:
+        if column not in columns:
+            columns.append(column)
+    return columns
+
+
+def schema_field_types(table_name: Optional[str]) -> Dict[str, str]:
+    """Get the schema field type of each column in a table"""
+    fields = DATABASE_SCHEMA.get(table_name, {}).get("fields", []) if table_name else []
+    return {field["name"]: field["type"] for field in fields}
+
+
+def dataframe_chunks(df: pd.DataFrame, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """Split a DataFrame into row chunks"""
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
+
+
+def progress_reporter(progress_bar: Any, label: str = "Exporting") -> ProgressCallback:
+    """Build a progress callback that drives a Streamlit progress bar"""
+    def report(rows_written: int, total_rows: Optional[int]) -> None:
+        if total_rows:
+            progress_bar.progress(min(rows_written / total_rows, 1.0), text=f"{label}: {rows_written} of {total_rows} rows")
+        else:
+            progress_bar.progress(0.0, text=f"{label}: {rows_written} rows")
+    return report
+
+
+def report_sheets(report: Any, sheet_name: str = "Report") -> Dict[str, pd.DataFrame]:
+    """Lay out a report as workbook sheets: a summary of its figures plus one sheet per table"""
+    if isinstance(report, pd.DataFrame):
+        return {sheet_name[:31]: report}
+
+    report = report or {}
+    figures = [(name, value) for name, value in report.items() if not isinstance(value, pd.DataFrame)]
+    sheets = {}
+    if figures or not report:
+        sheets['Summary'] = pd.DataFrame({
+            'Metric': [name.replace('_', ' ').title() for name, _ in figures],
+            'Value': pd.Series([round(value, 2) if isinstance(value, float) else value for _, value in figures],
+                               dtype=object)
+        })
+    for name, value in report.items():
+        if isinstance(value, pd.DataFrame):
+            sheets[name.replace('_', ' ').title()[:31]] = value
+    return sheets
+
+
+def _cell_value(value: Any) -> Any:
+    """Convert a value to something openpyxl can write"""
+    if value is None:
+        return None
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    try:
+        if pd.isna(value):
+            return None
+    except (TypeError, ValueError):
+        return str(value)
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    return value
+
+
+def _text_value(value: Any) -> Any:
+    """Convert a value to text for string and category columns"""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    try:
+        if pd.isna(value):
+            return None
+    except (TypeError, ValueError):
+        pass
+    return str(value)
+
+
+def _arrow_type(column: str, field_type: Optional[str], sample: pd.Series) -> Any:
+    """Pick the Parquet column type from the schema, falling back to the data"""
+    import pyarrow as pa
+
+    if field_type in CATEGORY_FIELD_TYPES or column in CATEGORY_FIELD_NAMES:
+        return pa.dictionary(pa.int32(), pa.string())
+    if field_type == "Date":
+        return pa.date32()
+    if field_type == "DateTime":
+        return pa.timestamp("us")
+    if field_type == "AutoNumber":
+        return pa.int64()
+    if field_type in ("Number", "Currency"):
+        return pa.float64()
+    if field_type == "Checkbox":
+        return pa.bool_()
+    if field_type is not None:
+        return pa.string()
+
+    # Columns outside the schema, e.g. computed ones
+    if pd.api.types.is_bool_dtype(sample):
+        return pa.bool_()
+    if pd.api.types.is_numeric_dtype(sample):
+        return pa.float64()
+    if pd.api.types.is_datetime64_any_dtype(sample):
+        return pa.timestamp("us")
+    return pa.string()
+
+
+def _coerce_for_arrow(chunk: pd.DataFrame, schema: Any) -> pd.DataFrame:
+    """Convert a chunk's columns to the values the Parquet schema expects"""
+    import pyarrow as pa
+
+    typed = {}
+    for field in schema:
+        values = chunk[field.name]
+        if pa.types.is_date32(field.type):
+            typed[field.name] = pd.to_datetime(values, errors="coerce", format="mixed").dt.date
+        elif pa.types.is_timestamp(field.type):
+            typed[field.name] = pd.to_datetime(values, errors="coerce", utc=True, format="mixed").dt.tz_localize(None)
+        elif pa.types.is_integer(field.type):
+            typed[field.name] = pd.to_numeric(values, errors="coerce").astype("Int64")
+        elif pa.types.is_floating(field.type):
+            typed[field.name] = pd.to_numeric(values, errors="coerce").astype(float)
+        elif pa.types.is_boolean(field.type):
+            typed[field.name] = values.astype("boolean")
+        else:
+            typed[field.name] = values.map(_text_value).astype(object)
+    return pd.DataFrame(typed, index=chunk.index)
+
+
+def _excel_workbook(frames: Dict[str, pd.DataFrame], sheet_name: str, columns: Optional[List[str]]) -> bytes:
+    """Write gathered rows to a single-sheet workbook; runs in a worker process"""
+    frame = frames[sheet_name]
+    engine = ExportEngine(row_limit=max(len(frame), 1))
+    return engine.write_excel(dataframe_chunks(frame, engine.chunk_size), sheet_name, columns).data
+
+
+class ExportResult:
+    """Summary of a finished export"""
+
+    def __init__(self, data: Optional[bytes], rows_written: int, truncated: bool, total_rows: Optional[int]):
+        self.data = data
+        self.rows_written = rows_written
+        self.truncated = truncated
+        self.total_rows = total_rows
+
+
+class _ExportState:
+    """Running header and row count of one export"""
+
+    def __init__(self):
+        self.header: Optional[List[str]] = None
+        self.rows_written = 0
+        self.truncated = False
+
+
+class ExportEngine:
+    """
+    Streaming export engine
+    Writes rows chunk by chunk into Excel, CSV or Parquet so memory stays flat
+    """
+
+    def __init__(self, row_limit: int = EXPORT_ROW_LIMIT, chunk_size: int = EXPORT_CHUNK_SIZE):
+        self.row_limit = row_limit
+        self.chunk_size = chunk_size
+
+    def _bounded_chunks(self, chunks: Iterable[Union[pd.DataFrame, List[Dict]]], columns: Optional[List[str]],
+                        state: _ExportState, total_rows: Optional[int],
+                        progress_callback: Optional[ProgressCallback]) -> Iterator[pd.DataFrame]:
+        """Yield chunks aligned to one header, stopping at the row limit"""
+        expected_rows = min(total_rows, self.row_limit) if total_rows is not None else None
+
+        for chunk in chunks:
+            if not isinstance(chunk, pd.DataFrame):
+                chunk = pd.DataFrame(chunk)
+            if chunk.empty:
+                continue
+
+            if state.rows_written >= self.row_limit:
+                # More rows exist beyond the export limit
+                state.truncated = True
+                break
+
+            # Fix the column set on the first chunk, schema order first
+            if state.header is None:
+                preferred = [column for column in (columns or []) if column in chunk.columns]
+                state.header = preferred + [column for column in chunk.columns if column not in preferred]
+
+            remaining = self.row_limit - state.rows_written
+            if len(chunk) > remaining:
+                chunk = chunk.iloc[:remaining]
+                state.truncated = True
+
+            yield chunk.reindex(columns=state.header)
+
+            state.rows_written += len(chunk)
+
+            if progress_callback:
+                progress_callback(state.rows_written, expected_rows)
+
+            if state.truncated:
+                break
+
+    def _finish(self, state: _ExportState, data: Optional[bytes], total_rows: Optional[int],
+                progress_callback: Optional[ProgressCallback]) -> ExportResult:
+        """Report the end of an export"""
+        if state.truncated:
+            print(f"Export truncated to {state.rows_written} rows (limit {self.row_limit})")
+
+        if progress_callback:
+            progress_callback(state.rows_written, state.rows_written)
+
+        return ExportResult(data, state.rows_written, state.truncated, total_rows)
+
+    def write(self, chunks: Iterable[Union[pd.DataFrame, List[Dict]]], export_format: str, sheet_name: str,
+              columns: Optional[List[str]] = None, table_name: Optional[str] = None, output: Any = None,
+              total_rows: Optional[int] = None,
+              progress_callback: Optional[ProgressCallback] = None) -> ExportResult:
+        """Stream chunks of rows into the requested export format"""
+        if export_format == "Excel":
+            expected_rows = min(total_rows, self.row_limit) if total_rows is not None else None
+            if process_offloader.should_offload(expected_rows) and expected_rows <= OFFLOAD_EXCEL_MAX_ROWS:
+                return self.write_excel_offloaded(chunks, sheet_name, columns, output, total_rows, progress_callback)
+            return self.write_excel(chunks, sheet_name, columns, output, total_rows, progress_callback)
+        if export_format == "CSV":
+            return self.write_csv(chunks, columns, output, total_rows, progress_callback)
+        if export_format == "Parquet":
+            return self.write_parquet(chunks, columns, table_name, output, total_rows, progress_callback)
+        raise ValueError(f"Unsupported export format: {export_format}")
+
+    def _append_sheet(self, workbook: Workbook, chunks: Iterable[Union[pd.DataFrame, List[Dict]]], sheet_name: str,
+                      columns: Optional[List[str]], total_rows: Optional[int],
+                      progress_callback: Optional[ProgressCallback]) -> _ExportState:
+        """Stream chunks of rows into a new sheet of a write-only workbook"""
+        sheet = workbook.create_sheet(title=sheet_name[:31])
+        state = _ExportState()
+
+        for chunk in self._bounded_chunks(chunks, columns, state, total_rows, progress_callback):
+            if state.rows_written == 0:
+                sheet.append(state.header)
+            for row in chunk.itertuples(index=False, name=None):
+                sheet.append([_cell_value(value) for value in row])
+
+        if state.header is None and columns:
+            sheet.append(columns)
+
+        return state
+
+    def write_excel(self, chunks: Iterable[Union[pd.DataFrame, List[Dict]]], sheet_name: str,
+                    columns: Optional[List[str]] = None, output: Any = None,
+                    total_rows: Optional[int] = None,
+                    progress_callback: Optional[ProgressCallback] = None) -> ExportResult:
+        """Stream chunks of rows into a single-sheet workbook"""
+        workbook = Workbook(write_only=True)
+        state = self._append_sheet(workbook, chunks, sheet_name, columns, total_rows, progress_callback)
+
+        buffer = output if output is not None else io.BytesIO()
+        workbook.save(buffer)
+
+        data = buffer.getvalue() if output is None else None
+        return self._finish(state, data, total_rows, progress_callback)
+
+    def write_excel_offloaded(self, chunks: Iterable[Union[pd.DataFrame, List[Dict]]], sheet_name: str,
+                              columns: Optional[List[str]] = None, output: Any = None,
+                              total_rows: Optional[int] = None,
+                              progress_callback: Optional[ProgressCallback] = None) -> ExportResult:
+        """Gather chunks of rows here and build the workbook in a worker process, off the server's GIL; holds every row at once"""
+        state = _ExportState()
+        gathered = list(self._bounded_chunks(chunks, columns, state, total_rows, progress_callback))
+        frame = pd.concat(gathered, ignore_index=True) if gathered else pd.DataFrame(columns=columns or [])
+
+        data = process_offloader.run(_excel_workbook, {sheet_name: frame}, sheet_name, state.header or columns)
+        if output is not None:
+            output.write(data)
+            data = None
+        return self._finish(state, data, total_rows, progress_callback)
+
+    def write_excel_sheets(self, sheets: Dict[str, pd.DataFrame], output: Any = None) -> ExportResult:
+        """Write several DataFrames into one workbook, one sheet each"""
+        workbook = Workbook(write_only=True)
+        rows_written = 0
+        truncated = False
+
+        for sheet_name, df in sheets.items():
+            state = self._append_sheet(workbook, dataframe_chunks(df, self.chunk_size), sheet_name,
+                                       list(df.columns), len(df), None)
+            rows_written += state.rows_written
+            truncated = truncated or state.truncated
+
+        if not sheets:
+            workbook.create_sheet(title="Sheet")
+
+        buffer = output if output is not None else io.BytesIO()
+        workbook.save(buffer)
+
+        data = buffer.getvalue() if output is None else None
+        return ExportResult(data, rows_written, truncated, None)
+
+    def write_csv(self, chunks: Iterable[Union[pd.DataFrame, List[Dict]]],
+                  columns: Optional[List[str]] = None, output: Any = None,
+                  total_rows: Optional[int] = None,
+                  progress_callback: Optional[ProgressCallback] = None) -> ExportResult:
+        """Stream chunks of rows into a UTF-8 CSV file"""
+        buffer = output if output is not None else io.BytesIO()
+        state = _ExportState()
+
+        for chunk in self._bounded_chunks(chunks, columns, state, total_rows, progress_callback):
+            text = chunk.to_csv(index=False, header=state.rows_written == 0)
+            buffer.write(text.encode("utf-8"))
+
+        if state.header is None and columns:
+            buffer.write((",".join(columns) + "\n").encode("utf-8"))
+
+        data = buffer.getvalue() if output is None else None
+        return self._finish(state, data, total_rows, progress_callback)
+
+    def write_parquet(self, chunks: Iterable[Union[pd.DataFrame, List[Dict]]],
+                      columns: Optional[List[str]] = None, table_name: Optional[str] = None,
+                      output: Any = None, total_rows: Optional[int] = None,
+                      progress_callback: Optional[ProgressCallback] = None) -> ExportResult:
+        """Stream chunks of rows into a Parquet file, one row group per chunk"""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet export requires pyarrow. Install it with 'pip install pyarrow'.")
+
+        buffer = output if output is not None else io.BytesIO()
+        field_types = schema_field_types(table_name)
+        state = _ExportState()
+        writer = None
+        schema = None
+
+        try:
+            for chunk in self._bounded_chunks(chunks, columns, state, total_rows, progress_callback):
+                if writer is None:
+                    schema = pa.schema([
+                        pa.field(column, _arrow_type(column, field_types.get(column), chunk[column]))
+                        for column in state.header
+                    ])
+                    writer = pq.ParquetWriter(buffer, schema, compression="snappy")
+                typed = _coerce_for_arrow(chunk, schema)
+                writer.write_table(pa.Table.from_pandas(typed, schema=schema, preserve_index=False))
+
+            if writer is None:
+                # An empty export still carries the column names
+                schema = pa.schema([
+                    pa.field(column, _arrow_type(column, field_types.get(column), pd.Series(dtype=object)))
+                    for column in columns or []
+                ])
+                writer = pq.ParquetWriter(buffer, schema, compression="snappy")
+        finally:
+            if writer is not None:
+                writer.close()
+
+        data = buffer.getvalue() if output is None else None
+        return self._finish(state, data, total_rows, progress_callback)
+
+
+# Global export engine instance
+export_engine = ExportEngine()
@@ -0,0 +1,235 @@
+import time
+import threading
+from datetime import date
+from typing import Any, Optional
+import numpy as np
+import pandas as pd
+from config.settings import CACHE_CONFIG
+from utils.cache_manager import cache_manager
+from utils.exporter import export_engine
+from utils.rollups import COUNTED_PAYMENT_STATUSES
+
+# Days overdue after which a defaulter is treated as high risk
+HIGH_RISK_OVERDUE_DAYS = 30
+
+STUDENT_FEE_COLUMNS = ['id', 'full_name', 'student_phone', 'parent_phone', 'batch', 'category',
+                       'total_fee', 'paid_amount', 'pending_amount', 'fee_due_date']
+
+
+def _month_labels(days: pd.Series) -> pd.Series:
+    """Label timestamps with their YYYY-MM month"""
+    return days.dt.to_period('M').astype(str)
+
+
+class FeeFrame:
+    """
+    Payments joined to their students, typed and sorted by payment date
+    Built once; every fee report slices and groups these arrays
+    """
+
+    def __init__(self, payments: pd.DataFrame, students: pd.DataFrame, today: Optional[date] = None):
+        self.built_at = time.time()
+        self.today = pd.Timestamp(today or date.today())
+        self.students = self._prepare_students(students)
+        self.payments = self._prepare_payments(payments, self.students)
+        self.days = self.payments['day'].to_numpy(dtype='datetime64[ns]')
+
+    def _prepare_students(self, students: pd.DataFrame) -> pd.DataFrame:
+        """Keep the fee columns of students and add days overdue"""
+        students = students[[column for column in STUDENT_FEE_COLUMNS if column in students.columns]].copy()
+        for column in STUDENT_FEE_COLUMNS:
+            if column not in students.columns:
+                students[column] = np.nan
+        for column in ['total_fee', 'paid_amount', 'pending_amount']:
+            students[column] = pd.to_numeric(students[column], errors='coerce').fillna(0)
+        students['category'] = students['category'].fillna('Unknown')
+
+        due = pd.to_datetime(students['fee_due_date'], errors='coerce').dt.normalize()
+        students['fee_due_date'] = due
+        students['days_overdue'] = (self.today - due).dt.days.fillna(0).clip(lower=0).astype(int)
+        return students
+
+    @staticmethod
+    def _prepare_payments(payments: pd.DataFrame, students: pd.DataFrame) -> pd.DataFrame:
+        """Keep counted payments with their day, month and student category"""
+        columns = ['student_id', 'amount', 'payment_method', 'day', 'month', 'category']
+        if payments.empty or 'payment_date' not in payments.columns or 'amount' not in payments.columns:
+            return pd.DataFrame({column: pd.Series(dtype='datetime64[ns]' if column == 'day' else object)
+                                 for column in columns})
+
+        if 'status' in payments.columns:
+            payments = payments[payments['status'].isna() | payments['status'].isin(COUNTED_PAYMENT_STATUSES)]
+
+        day = pd.to_datetime(payments['payment_date'], errors='coerce').dt.normalize()
+        categories = students.set_index('id')['category'] if not students.empty else pd.Series(dtype=object)
+        method = payments['payment_method'] if 'payment_method' in payments.columns else pd.Series(None, index=payments.index)
+        prepared = pd.DataFrame({
+            'student_id': payments['student_id'] if 'student_id' in payments.columns else None,
+            'amount': pd.to_numeric(payments['amount'], errors='coerce').fillna(0),
+            'payment_method': method.fillna('Unknown'),
+            'day': day
+        }).dropna(subset=['day']).sort_values('day', kind='stable').reset_index(drop=True)
+
+        prepared['month'] = _month_labels(prepared['day'])
+        prepared['category'] = prepared['student_id'].map(categories).fillna('Unknown')
+        return prepared[columns]
+
+    def between(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> pd.DataFrame:
+        """Get the payments made between two dates, inclusive"""
+        low = 0 if start_date is None else int(np.searchsorted(self.days, np.datetime64(pd.Timestamp(start_date)), side='left'))
+        high = len(self.days) if end_date is None else int(np.searchsorted(self.days, np.datetime64(pd.Timestamp(end_date)), side='right'))
+        return self.payments.iloc[low:max(low, high)]
+
+    def monthly_collection(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> pd.DataFrame:
+        """Collected amount, transactions and paying students per month"""
+        payments = self.between(start_date, end_date)
+        if payments.empty:
+            return pd.DataFrame(columns=['month', 'amount', 'transaction_count', 'average_payment', 'paying_students'])
+
+        monthly = payments.groupby('month', sort=True).agg(
+            amount=('amount', 'sum'),
+            transaction_count=('amount', 'size'),
+            paying_students=('student_id', 'nunique')
+        ).reset_index()
+        monthly['average_payment'] = (monthly['amount'] / monthly['transaction_count']).round(2)
+        return monthly[['month', 'amount', 'transaction_count', 'average_payment', 'paying_students']]
+
+    def category_summary(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> pd.DataFrame:
+        """Fees expected, collected and pending per category"""
+        columns = ['category', 'students', 'total_fee', 'collected_amount', 'pending_amount',
+                   'collection_rate', 'period_collection', 'period_transactions']
+        if self.students.empty:
+            return pd.DataFrame(columns=columns)
+
+        summary = self.students.groupby('category').agg(
+            students=('id', 'size'),
+            total_fee=('total_fee', 'sum'),
+            collected_amount=('paid_amount', 'sum'),
+            pending_amount=('pending_amount', lambda values: values.clip(lower=0).sum())
+        )
+        summary['collection_rate'] = (summary['collected_amount'] /
+                                      summary['total_fee'].where(summary['total_fee'] > 0) * 100).round(1).fillna(0)
+
+        period = self.between(start_date, end_date).groupby('category')['amount'].agg(['sum', 'size'])
+        summary['period_collection'] = period['sum'].reindex(summary.index, fill_value=0)
+        summary['period_transactions'] = period['size'].reindex(summary.index, fill_value=0).astype(int)
+        return summary.reset_index().sort_values('collected_amount', ascending=False)[columns]
+
+    def payment_methods(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> pd.DataFrame:
+        """Collected amount and share per payment method"""
+        payments = self.between(start_date, end_date)
+        if payments.empty:
+            return pd.DataFrame(columns=['payment_method', 'amount', 'transaction_count', 'average_payment', 'share_percent'])
+
+        methods = payments.groupby('payment_method').agg(
+            amount=('amount', 'sum'),
+            transaction_count=('amount', 'size')
+        ).reset_index().sort_values('amount', ascending=False)
+        methods['average_payment'] = (methods['amount'] / methods['transaction_count']).round(2)
+        total = methods['amount'].sum()
+        methods['share_percent'] = (methods['amount'] / total * 100).round(1) if total else 0.0
+        return methods
+
+    def defaulters(self) -> pd.DataFrame:
+        """Students with pending fees past their due date, most overdue first"""
+        students = self.students
+        defaulters = students[(students['pending_amount'] > 0) & (students['days_overdue'] > 0)]
+
+        last_payment = self.payments.groupby('student_id')['day'].max()
+        defaulters = defaulters.assign(
+            last_payment_date=defaulters['id'].map(last_payment).dt.date,
+            fee_due_date=defaulters['fee_due_date'].dt.date,
+            high_risk=defaulters['days_overdue'] > HIGH_RISK_OVERDUE_DAYS
+        )
+        defaulters = defaulters.sort_values(['days_overdue', 'pending_amount'], ascending=False)
+        columns = STUDENT_FEE_COLUMNS + ['days_overdue', 'last_payment_date', 'high_risk']
+        return defaulters[columns].rename(columns={'id': 'student_id'}).reset_index(drop=True)
+
+    def daily_trend(self, start_date: date, end_date: date) -> pd.DataFrame:
+        """Daily and cumulative collection with every date in the range present"""
+        days = pd.date_range(start=start_date, end=end_date, freq='D')
+        payments = self.between(start_date, end_date)
+        daily = payments.groupby('day')['amount'].agg(['sum', 'size']).reindex(days, fill_value=0)
+        return pd.DataFrame({
+            'date': days.date,
+            'daily_collection': daily['sum'].to_numpy(),
+            'transactions': daily['size'].astype(int).to_numpy(),
+            'cumulative_collection': daily['sum'].cumsum().to_numpy(),
+            'rolling_7_day_average': daily['sum'].rolling(7, min_periods=1).mean().round(2).to_numpy()
+        })
+
+
+class FeeAnalytics:
+    """
+    Cache of the fee frame behind the fee management reports
+    Built from one read of payments and students; dropped when a payment or student changes
+    """
+
+    def __init__(self, ttl: int = CACHE_CONFIG["cache_ttl"]):
+        self.ttl = ttl
+        self._frame: Optional[FeeFrame] = None
+        self._versions: Optional[tuple] = None
+        self._lock = threading.Lock()
+
+    def get_frame(self, db_manager: Any) -> FeeFrame:
+        """Get the fee frame, building it if missing, changed or from a previous day"""
+        frame = self._frame
+        if frame is not None and frame.today == pd.Timestamp(date.today()):
+            if time.time() - frame.built_at < self.ttl:
+                cache_manager.touch('fee_analytics', 'frame')
+                return frame
+            if db_manager.table_versions(['payments', 'students']) == self._versions:
+                # Neither table changed since the build, so the frame is still current
+                frame.built_at = time.time()
+                cache_manager.touch('fee_analytics', 'frame')
+                return frame
+
+        with self._lock:
+            versions = db_manager.table_versions(['payments', 'students'])
+            frame = FeeFrame(db_manager.get_table_frame('payments'), db_manager.get_table_frame('students'))
+            self._frame, self._versions = frame, versions
+        cache_manager.track('fee_analytics', 'frame', frame, self.invalidate)
+        return frame
+
+    def invalidate(self) -> None:
+        """Drop the fee frame so it is rebuilt on next use"""
+        # Not under the build lock: the table cache calls this from inside builds that find a changed table
+        self._frame = None
+        cache_manager.forget('fee_analytics')
+
+    @staticmethod
+    def filter_reminder_recipients(students: pd.DataFrame, recipient_filter: str,
+                                   today: Optional[date] = None) -> pd.DataFrame:
+        """Select students with pending fees by how close their due date is"""
+        if students.empty:
+            return students
+
+        if 'pending_amount' in students.columns:
+            students = students[pd.to_numeric(students['pending_amount'], errors='coerce').fillna(0) > 0]
+        if recipient_filter == "All Pending" or 'fee_due_date' not in students.columns:
+            return students
+
+        today = pd.Timestamp(today or date.today())
+        due = pd.to_datetime(students['fee_due_date'], errors='coerce').dt.normalize()
+        days_overdue = (today - due).dt.days
+        students = students.assign(days_overdue=days_overdue.fillna(0).clip(lower=0).astype(int))
+
+        if recipient_filter == "Overdue Only":
+            return students[days_overdue > 0]
+        if recipient_filter == "Due This Week":
+            return students[days_overdue.between(-7, 0)]
+        return students
+
+    @staticmethod
+    def export_report(report_data: pd.DataFrame, report_type: str) -> bytes:
+        """Write a fee report to a single-sheet workbook"""
+        report = report_data.copy()
+        for column in report.columns:
+            if pd.api.types.is_datetime64_any_dtype(report[column]):
+                report[column] = report[column].dt.date
+        # Excel sheet names are limited to 31 characters
+        return export_engine.write_excel([report], report_type[:31]).data
+
+
+# Global fee analytics instance
+fee_analytics = FeeAnalytics()
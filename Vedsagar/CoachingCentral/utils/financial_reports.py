@@ -0,0 +1,180 @@
+import threading
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+from utils.exporter import export_engine, report_sheets
+from utils.fee_analytics import FeeFrame, fee_analytics, HIGH_RISK_OVERDUE_DAYS
+from utils.rollups import percent_change
+
+# Dues ageing buckets by days overdue; a due falls in the last bucket whose lower bound it reaches
+AGEING_BUCKET_STARTS = [0, 31, 61, 91]
+AGEING_BUCKET_LABELS = ["0-30 days", "31-60 days", "61-90 days", "90+ days"]
+
+# Bucket ahead of the ageing buckets for dues whose date has not come yet
+NOT_YET_DUE_LABEL = "Not yet due"
+
+TOP_DEFAULTERS_LIMIT = 10
+
+# Memoized results kept per fee frame before the oldest are dropped
+MAX_MEMOIZED_RESULTS = 64
+
+
+def _months_spanned(start_date: date, end_date: date) -> int:
+    """Count the calendar months a date range touches"""
+    return (end_date.year - start_date.year) * 12 + end_date.month - start_date.month + 1
+
+
+def _previous_range(start_date: date, end_date: date) -> Tuple[date, date]:
+    """Get the range of the same length just before a date range"""
+    days = (end_date - start_date).days + 1
+    previous_end = start_date - timedelta(days=1)
+    return previous_end - timedelta(days=days - 1), previous_end
+
+
+def revenue_analysis(frame: FeeFrame, start_date: date, end_date: date) -> Dict[str, Any]:
+    """Revenue totals, growth and breakdowns by month, category and payment method"""
+    payments = frame.between(start_date, end_date)
+    total_revenue = float(payments['amount'].sum())
+    previous_revenue = float(frame.between(*_previous_range(start_date, end_date))['amount'].sum())
+
+    # Of the dues falling in the range, the share that was collected
+    students = frame.students
+    due_in_range = students['fee_due_date'].between(pd.Timestamp(start_date), pd.Timestamp(end_date))
+    outstanding_due = float(students.loc[due_in_range, 'pending_amount'].clip(lower=0).sum())
+    billable = total_revenue + outstanding_due
+
+    monthly = frame.monthly_collection(start_date, end_date).rename(
+        columns={'amount': 'revenue', 'transaction_count': 'transactions'}
+    )[['month', 'revenue', 'transactions']]
+    by_category = payments.groupby('category')['amount'].sum().sort_values(ascending=False)
+    by_method = payments.groupby('payment_method')['amount'].sum().sort_values(ascending=False)
+
+    return {
+        'total_revenue': total_revenue,
+        'previous_revenue': previous_revenue,
+        'monthly_average': total_revenue / _months_spanned(start_date, end_date),
+        'growth_rate': percent_change(total_revenue, previous_revenue),
+        'collection_efficiency': total_revenue / billable * 100 if billable else 0.0,
+        'transactions': len(payments),
+        'monthly_revenue': monthly,
+        'category_revenue': by_category.rename_axis('category').reset_index(name='revenue'),
+        'method_revenue': by_method.rename_axis('method').reset_index(name='revenue')
+    }
+
+
+def fee_collection_analysis(frame: FeeFrame, start_date: date, end_date: date) -> Dict[str, Any]:
+    """Collection in a date range against the fees expected from current students"""
+    students = frame.students
+    total_fee = float(students['total_fee'].sum())
+    total_paid = float(students['paid_amount'].sum())
+
+    daily = frame.daily_trend(start_date, end_date).rename(columns={'daily_collection': 'amount'})
+    methods = frame.payment_methods(start_date, end_date).rename(
+        columns={'payment_method': 'method', 'transaction_count': 'transactions'}
+    )
+
+    return {
+        'total_collected': float(daily['amount'].sum()),
+        'transactions': int(daily['transactions'].sum()),
+        'collection_rate': total_paid / total_fee * 100 if total_fee else 0.0,
+        'pending_amount': float(students['pending_amount'].clip(lower=0).sum()),
+        'daily_collection': daily[['date', 'amount', 'transactions', 'cumulative_collection']],
+        'payment_methods': methods[['method', 'amount', 'transactions', 'share_percent']],
+        'category_collection': frame.category_summary(start_date, end_date)
+    }
+
+
+def outstanding_dues_analysis(frame: FeeFrame) -> Dict[str, Any]:
+    """Outstanding dues with ageing buckets and the largest defaulters"""
+    students = frame.students
+    dues = students[students['pending_amount'] > 0]
+    amounts = dues['pending_amount'].to_numpy(dtype=float)
+    days_overdue = dues['days_overdue'].to_numpy()
+
+    # days_overdue is clipped at 0, so dues not yet reached are told apart by their date
+    buckets = np.digitize(days_overdue, AGEING_BUCKET_STARTS[1:]) + 1
+    buckets[(dues['fee_due_date'] >= frame.today).to_numpy()] = 0
+    labels = [NOT_YET_DUE_LABEL] + AGEING_BUCKET_LABELS
+    ageing = pd.DataFrame({
+        'age_bucket': labels,
+        'students': np.bincount(buckets, minlength=len(labels)),
+        'amount': np.bincount(buckets, weights=amounts, minlength=len(labels))
+    })
+
+    top = dues.nlargest(TOP_DEFAULTERS_LIMIT, 'pending_amount')
+    top_defaulters = pd.DataFrame({
+        'student_id': top['id'].to_numpy(),
+        'full_name': top['full_name'].to_numpy(),
+        'batch': top['batch'].to_numpy(),
+        'category': top['category'].to_numpy(),
+        'outstanding_amount': top['pending_amount'].to_numpy(),
+        'fee_due_date': top['fee_due_date'].dt.date.to_numpy(),
+        'days_overdue': top['days_overdue'].to_numpy()
+    })
+
+    return {
+        'total_outstanding': float(amounts.sum()),
+        'students_with_dues': len(dues),
+        'average_due': float(amounts.mean()) if len(amounts) else 0.0,
+        'overdue_count': int((days_overdue > HIGH_RISK_OVERDUE_DAYS).sum()),
+        'aging_data': ageing,
+        'top_defaulters': top_defaulters
+    }
+
+
+# Financial report name -> builder taking the fee frame and a date range
+FINANCIAL_REPORTS: Dict[str, Callable[[FeeFrame, date, date], Dict[str, Any]]] = {
+    "Revenue Analysis": revenue_analysis,
+    "Fee Collection Report": fee_collection_analysis,
+    "Outstanding Dues Report": lambda frame, start_date, end_date: outstanding_dues_analysis(frame)
+}
+
+
+class FinancialReports:
+    """
+    Financial report results computed from the shared fee frame
+    Memoized by report and date range until the fee frame is rebuilt
+    """
+
+    def __init__(self):
+        self._frame: Optional[FeeFrame] = None
+        self._results: Dict[Tuple[str, Optional[date], Optional[date]], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get_report(self, db_manager: Any, report_type: str, start_date: Optional[date] = None,
+                   end_date: Optional[date] = None) -> Optional[Dict[str, Any]]:
+        """Get a financial report for a date range, computing it on first request"""
+        builder = FINANCIAL_REPORTS.get(report_type)
+        if builder is None:
+            return None
+
+        frame = fee_analytics.get_frame(db_manager)
+        if report_type == "Outstanding Dues Report":
+            start_date = end_date = None
+        key = (report_type, start_date, end_date)
+
+        with self._lock:
+            if frame is not self._frame:
+                self._frame = frame
+                self._results.clear()
+            result = self._results.get(key)
+        if result is not None:
+            return result
+
+        result = builder(frame, start_date, end_date)
+        with self._lock:
+            if frame is self._frame:
+                if len(self._results) >= MAX_MEMOIZED_RESULTS:
+                    del self._results[next(iter(self._results))]
+                self._results[key] = result
+        return result
+
+    def export_report(self, db_manager: Any, report_type: str, start_date: date, end_date: date) -> bytes:
+        """Write a financial report to a workbook: a summary sheet plus one sheet per table"""
+        report = self.get_report(db_manager, report_type, start_date, end_date)
+        return export_engine.write_excel_sheets(report_sheets(report, report_type)).data
+
+
+# Global financial reports instance
+financial_reports = FinancialReports()
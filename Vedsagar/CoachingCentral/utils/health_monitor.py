@@ -0,0 +1,87 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+import numpy as np
+from config.settings import API_CONFIG
+
+
+class HealthMonitor:
+    """
+    Background prober of the NocoDB backend
+    Keeps a window of probe results so pages read availability and latency without a request
+    """
+
+    def __init__(self, interval: float = API_CONFIG["health_probe_interval"],
+                 window: int = API_CONFIG["health_sample_window"]):
+        self.interval = interval
+        # (finished at, answered, latency in ms) per probe
+        self._samples: deque = deque(maxlen=window)
+        self._probe: Optional[Callable[[], bool]] = None
+        self._thread: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, probe: Callable[[], bool]) -> None:
+        """Start probing in the background; later calls only swap the probe"""
+        with self._lock:
+            self._probe = probe
+            if self.running:
+                return
+            self._thread = threading.Thread(target=self._run, name="health-monitor", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        """Probe once per interval, or sooner when asked to"""
+        while True:
+            self.probe_now()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def probe_now(self) -> None:
+        """Probe the backend and record the result"""
+        started = time.perf_counter()
+        try:
+            answered = bool(self._probe())
+        except Exception:
+            answered = False
+        latency_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._samples.append((time.time(), answered, latency_ms))
+
+    def request_probe(self) -> None:
+        """Ask the background thread to probe without waiting for the interval"""
+        self._wake.set()
+
+    def status(self) -> Dict[str, Any]:
+        """Get availability and latency percentiles over the sample window"""
+        with self._lock:
+            samples = list(self._samples)
+        if not samples:
+            return {'monitored': self.running, 'available': None, 'checked_at': None, 'latency_ms': None,
+                    'p50_ms': None, 'p95_ms': None, 'p99_ms': None, 'availability': None, 'samples': 0}
+
+        checked_at, available, latency_ms = samples[-1]
+        answered = np.array([latency for _, ok, latency in samples if ok])
+        p50 = p95 = p99 = None
+        if len(answered):
+            p50, p95, p99 = (float(p) for p in np.percentile(answered, [50, 95, 99]))
+        return {
+            'monitored': self.running,
+            'available': available,
+            'checked_at': checked_at,
+            'latency_ms': latency_ms,
+            'p50_ms': p50,
+            'p95_ms': p95,
+            'p99_ms': p99,
+            'availability': len(answered) / len(samples) * 100,
+            'samples': len(samples)
+        }
+
+
+# Global health monitor instance
+health_monitor = HealthMonitor()
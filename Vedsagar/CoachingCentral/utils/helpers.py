@@ -162,6 +162,18 @@ def calculate_age(birth_date: Any) -> Optional[int]:
     except Exception:
         return None
 
+def calculate_ages(birth_dates: pd.Series, today: Optional[date] = None) -> pd.Series:
+    """Calculate ages for a whole column of birth dates"""
+    today = pd.Timestamp(today or date.today())
+    birth_dates = pd.to_datetime(birth_dates, errors='coerce')
+
+    # Subtract one year where the birthday has not come round yet this year
+    birthday_pending = (birth_dates.dt.month > today.month) | (
+        (birth_dates.dt.month == today.month) & (birth_dates.dt.day > today.day)
+    )
+    ages = (today.year - birth_dates.dt.year - birthday_pending.astype(int)).astype('Int64')
+    return ages.where(ages >= 0)
+
 def calculate_days_between(start_date: Any, end_date: Any = None) -> int:
     """Calculate days between two dates"""
     try:
@@ -0,0 +1,71 @@
+import streamlit as st
+from typing import Optional
+from utils.report_jobs import report_jobs, ReportJob, ReportJobRunner
+from utils.export_jobs import export_jobs
+
+# Seconds between progress refreshes while a report job runs
+JOB_POLL_SECONDS = 1
+
+
+def _show_progress(job: ReportJob) -> None:
+    """Draw a job's progress"""
+    st.progress(job.progress, text=f"{job.message} ({job.run_seconds:.0f}s)")
+
+
+def _poll_job(job_key: str, runner: ReportJobRunner = report_jobs) -> None:
+    """Redraw a running job's progress; run_every reruns only this fragment"""
+    job = runner.get(job_key)
+    if job is None or job.finished:
+        # The result is drawn outside the fragment, so the page runs once more when the job ends
+        st.rerun(scope="app")
+    _show_progress(job)
+
+
+if hasattr(st, "fragment"):
+    _poll_progress = st.fragment(run_every=JOB_POLL_SECONDS)(_poll_job)
+else:
+    _poll_progress = None
+
+
+def finished_job(state_key: str, runner: ReportJobRunner = report_jobs) -> Optional[ReportJob]:
+    """Show progress of the session's report job; returns the job once its report is ready"""
+    job = runner.get(st.session_state.get(state_key))
+    if job is None:
+        return None
+
+    if job.status == "failed":
+        st.error(f"Error generating {job.report_type}: {job.error}")
+        return None
+    if job.finished:
+        st.caption(f"{job.report_type} generated in {job.run_seconds:.2f}s")
+        return job
+
+    if _poll_progress is not None:
+        _poll_progress(job.key, runner)
+    else:
+        _show_progress(job)
+        st.button("🔄 Check Progress", key=f"{state_key}_refresh")
+    return None
+
+
+def submit_job(state_key: str, job: ReportJob) -> None:
+    """Remember a submitted job as this session's job for a report slot"""
+    st.session_state[state_key] = job.key
+
+
+def export_download(state_key: str, label: str) -> None:
+    """Show progress of the session's export job, then a download button once its file is ready"""
+    job = finished_job(state_key, export_jobs)
+    if job is None:
+        return
+    if not job.result.available:
+        st.warning("This export is no longer available. Please export again.")
+        return
+
+    st.download_button(
+        label=label,
+        data=job.result.read(),
+        file_name=job.result.file_name,
+        mime=job.result.mime,
+        key=f"{state_key}_download"
+    )
@@ -0,0 +1,191 @@
+import bisect
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+import pandas as pd
+
+
+class Leaderboard:
+    """
+    Scores kept in sorted arrays
+    Rank, top N and percentile lookups are binary searches instead of re-sorting
+    """
+
+    def __init__(self):
+        self._scores: Dict[Any, float] = {}
+        # (-score, entity) pairs, best first
+        self._entries: List[Tuple[float, Any]] = []
+        # All scores ascending, for percentiles and competition ranks
+        self._sorted_scores: List[float] = []
+        # Distinct scores ascending with how many entities hold each, for dense ranks
+        self._distinct_scores: List[float] = []
+        self._score_counts: Dict[float, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def __contains__(self, entity: Any) -> bool:
+        return entity in self._scores
+
+    def score(self, entity: Any) -> Optional[float]:
+        """Get an entity's current score"""
+        return self._scores.get(entity)
+
+    def update(self, entity: Any, score: float) -> None:
+        """Set an entity's score, replacing any previous one"""
+        if entity in self._scores:
+            if self._scores[entity] == score:
+                return
+            self.remove(entity)
+
+        score = float(score)
+        self._scores[entity] = score
+        bisect.insort(self._entries, (-score, entity))
+        bisect.insort(self._sorted_scores, score)
+
+        if self._score_counts.get(score, 0) == 0:
+            bisect.insort(self._distinct_scores, score)
+        self._score_counts[score] = self._score_counts.get(score, 0) + 1
+
+    def remove(self, entity: Any) -> None:
+        """Drop an entity from the leaderboard"""
+        score = self._scores.pop(entity, None)
+        if score is None:
+            return
+
+        del self._entries[bisect.bisect_left(self._entries, (-score, entity))]
+        del self._sorted_scores[bisect.bisect_left(self._sorted_scores, score)]
+
+        self._score_counts[score] -= 1
+        if self._score_counts[score] == 0:
+            del self._score_counts[score]
+            del self._distinct_scores[bisect.bisect_left(self._distinct_scores, score)]
+
+    def rank(self, entity: Any, dense: bool = True) -> Optional[int]:
+        """Get an entity's rank, 1 being the best score"""
+        score = self._scores.get(entity)
+        if score is None:
+            return None
+        if dense:
+            return len(self._distinct_scores) - bisect.bisect_right(self._distinct_scores, score) + 1
+        return len(self._sorted_scores) - bisect.bisect_right(self._sorted_scores, score) + 1
+
+    def top(self, n: int) -> List[Tuple[Any, float]]:
+        """Get the n best (entity, score) pairs"""
+        return [(entity, -negative_score) for negative_score, entity in self._entries[:n]]
+
+    def percentile(self, score: float) -> float:
+        """Get the percentage of scores at or below a score"""
+        if not self._sorted_scores:
+            return 0.0
+        return bisect.bisect_right(self._sorted_scores, float(score)) / len(self._sorted_scores) * 100
+
+
+class LeaderboardIndex:
+    """
+    Per-test and per-batch leaderboards of percentage scores
+    Kept current on each score write; a batch is loaded once from its results
+    """
+
+    def __init__(self):
+        self._tests: Dict[int, Leaderboard] = {}
+        self._batches: Dict[int, Leaderboard] = {}
+        # test id -> (batch id, max marks)
+        self._test_info: Dict[int, Tuple[int, float]] = {}
+        # batch id -> student id -> [sum of percentages, tests counted]
+        self._batch_totals: Dict[int, Dict[Any, List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def load_batch(self, batch_id: Any, tests: pd.DataFrame, results: pd.DataFrame) -> None:
+        """Rebuild a batch's leaderboards from its tests and joined score results"""
+        batch_id = int(batch_id)
+        present = results[results['present']] if not results.empty else results
+
+        with self._lock:
+            for test_id, (test_batch_id, _) in list(self._test_info.items()):
+                if test_batch_id == batch_id:
+                    del self._test_info[test_id]
+                    self._tests.pop(test_id, None)
+
+            if not tests.empty and {'id', 'max_marks'} <= set(tests.columns):
+                for test_id, max_marks in zip(tests['id'], tests['max_marks']):
+                    if pd.notna(test_id):
+                        self._test_info[int(test_id)] = (batch_id, max_marks)
+                        self._tests[int(test_id)] = Leaderboard()
+
+            totals: Dict[Any, List[float]] = {}
+            for test_id, student_id, percentage in zip(present.get('test_id', []), present.get('student_id', []),
+                                                       present.get('percentage', [])):
+                if pd.isna(percentage) or int(test_id) not in self._tests:
+                    continue
+                self._tests[int(test_id)].update(student_id, percentage)
+                total = totals.setdefault(student_id, [0.0, 0])
+                total[0] += percentage
+                total[1] += 1
+
+            board = Leaderboard()
+            for student_id, (total, count) in totals.items():
+                board.update(student_id, total / count)
+
+            self._batch_totals[batch_id] = totals
+            self._batches[batch_id] = board
+
+    def record_score(self, test_id: Any, student_id: Any, marks_obtained: Any, attendance: str = "Present") -> bool:
+        """Apply one score write to the test and batch leaderboards"""
+        if test_id is None:
+            return False
+        test_id = int(test_id)
+
+        with self._lock:
+            info = self._test_info.get(test_id)
+            if info is None:
+                # The test's batch has not been loaded yet
+                return False
+
+            batch_id, max_marks = info
+            test_board = self._tests[test_id]
+            totals = self._batch_totals.setdefault(batch_id, {})
+            batch_board = self._batches.setdefault(batch_id, Leaderboard())
+
+            # Take the previous score for this test out of the batch average
+            previous = test_board.score(student_id)
+            if previous is not None:
+                total = totals[student_id]
+                total[0] -= previous
+                total[1] -= 1
+                test_board.remove(student_id)
+
+            if attendance != "Absent" and max_marks and pd.notna(marks_obtained):
+                percentage = float(marks_obtained) / float(max_marks) * 100
+                test_board.update(student_id, percentage)
+                total = totals.setdefault(student_id, [0.0, 0])
+                total[0] += percentage
+                total[1] += 1
+
+            total = totals.get(student_id)
+            if total and total[1] > 0:
+                batch_board.update(student_id, total[0] / total[1])
+            else:
+                totals.pop(student_id, None)
+                batch_board.remove(student_id)
+
+        return True
+
+    def test(self, test_id: Any) -> Optional[Leaderboard]:
+        """Get a test's leaderboard, if its batch is loaded"""
+        return self._tests.get(int(test_id)) if test_id is not None else None
+
+    def batch(self, batch_id: Any) -> Optional[Leaderboard]:
+        """Get a batch's leaderboard of average percentages, if loaded"""
+        return self._batches.get(int(batch_id)) if batch_id is not None else None
+
+    def clear(self) -> None:
+        """Drop all leaderboards"""
+        with self._lock:
+            self._tests.clear()
+            self._batches.clear()
+            self._test_info.clear()
+            self._batch_totals.clear()
+
+
+# Global leaderboard index instance
+leaderboard_index = LeaderboardIndex()
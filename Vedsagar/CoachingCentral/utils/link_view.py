@@ -0,0 +1,165 @@
+import io
+import math
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+from typing import Optional
+
+# Page sizes offered by the paged link view
+PAGE_SIZE_OPTIONS = [10, 25, 50, 100]
+
+EXPORT_COLUMNS = ['name', 'phone', 'message', 'whatsapp_link', 'valid_phone', 'sent']
+
+
+def _sent_key(key: str) -> str:
+    return f"{key}_sent_rows"
+
+
+def _page_key(key: str) -> str:
+    return f"{key}_page_input"
+
+
+def get_sent_rows(key: str) -> set:
+    """Get the set of link rows marked as sent for a link view"""
+    return st.session_state.setdefault(_sent_key(key), set())
+
+
+def clear_link_view(key: str) -> None:
+    """Clear paging and sent state for a link view"""
+    st.session_state.pop(_sent_key(key), None)
+    st.session_state.pop(_page_key(key), None)
+    st.session_state.pop(f"{key}_export", None)
+    for state_key in [k for k in st.session_state.keys() if str(k).startswith(f"{key}_sent_")]:
+        del st.session_state[state_key]
+
+
+def _toggle_sent(key: str, row_id: int) -> None:
+    """Record a sent checkbox change"""
+    sent_rows = get_sent_rows(key)
+    if st.session_state.get(f"{key}_sent_{row_id}"):
+        sent_rows.add(row_id)
+    else:
+        sent_rows.discard(row_id)
+
+
+def links_to_csv(links: pd.DataFrame) -> bytes:
+    """Export a link sheet to CSV"""
+    return links.to_csv(index=False).encode('utf-8')
+
+
+def links_to_excel(links: pd.DataFrame) -> bytes:
+    """Export a link sheet to Excel"""
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        links.to_excel(writer, sheet_name='WhatsApp Links', index=False)
+    output.seek(0)
+    return output.getvalue()
+
+
+def render_paged_links(links: pd.DataFrame, key: str, file_prefix: str = "whatsapp_links",
+                       caption: Optional[str] = None) -> None:
+    """
+    Render WhatsApp links one page at a time
+    Only the visible page is turned into widgets; the full sheet is downloadable
+    """
+    if links.empty:
+        st.info("No WhatsApp links to display.")
+        return
+
+    total = len(links)
+    sent_rows = get_sent_rows(key)
+    sent_count = len(sent_rows)
+
+    # Progress of sent/unsent messages
+    st.progress(sent_count / total, text=f"Sent {sent_count} of {total} messages ({total - sent_count} remaining)")
+
+    if caption:
+        st.caption(caption)
+
+    # Paging controls
+    col1, col2, col3 = st.columns([2, 2, 3])
+
+    with col1:
+        page_size = st.selectbox("Links per page", PAGE_SIZE_OPTIONS, index=1, key=f"{key}_page_size")
+
+    with col3:
+        show_unsent_only = st.checkbox("Show unsent only", key=f"{key}_unsent_only")
+
+    visible = links
+    if show_unsent_only and sent_rows:
+        visible = links[~links.index.isin(sent_rows)]
+
+    # Pull the page back into range before its input is drawn, as the filter can leave it empty
+    page_count = max(1, math.ceil(len(visible) / page_size))
+    page_key = _page_key(key)
+    st.session_state[page_key] = min(max(int(st.session_state.get(page_key, 1)), 1), page_count)
+
+    with col2:
+        page = st.number_input(
+            f"Page (of {page_count})",
+            min_value=1,
+            max_value=page_count,
+            step=1,
+            key=page_key
+        )
+
+    start = (page - 1) * page_size
+    page_rows = visible.iloc[start:start + page_size]
+
+    st.caption(f"Showing {start + 1 if len(page_rows) else 0}-{start + len(page_rows)} of {len(visible)} links")
+
+    # Materialize widgets for the visible page only
+    for row_id, link in page_rows.iterrows():
+        col1, col2, col3 = st.columns([5, 3, 1])
+
+        with col1:
+            st.markdown(f"**{link['label']}**")
+            if not link['valid_phone']:
+                st.caption("⚠️ Phone number may be invalid")
+
+        with col2:
+            if link['whatsapp_link']:
+                st.link_button(f"📱 Send to {link['name']}", link['whatsapp_link'])
+            else:
+                st.caption("No phone number")
+
+        with col3:
+            st.checkbox(
+                "Sent",
+                value=row_id in sent_rows,
+                key=f"{key}_sent_{row_id}",
+                on_change=_toggle_sent,
+                args=(key, row_id)
+            )
+
+    # Downloadable link sheets, rebuilt only when the sent state changes
+    signature = (total, tuple(sorted(sent_rows)))
+    cached_export = st.session_state.get(f"{key}_export")
+    if not cached_export or cached_export[0] != signature:
+        export = links.assign(sent=links.index.isin(sent_rows))
+        export = export[[column for column in EXPORT_COLUMNS if column in export.columns]]
+        cached_export = (signature, links_to_csv(export), links_to_excel(export))
+        st.session_state[f"{key}_export"] = cached_export
+
+    _, csv_data, excel_data = cached_export
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.download_button(
+            label="📥 Download Links (CSV)",
+            data=csv_data,
+            file_name=f"{file_prefix}_{timestamp}.csv",
+            mime="text/csv",
+            key=f"{key}_download_csv"
+        )
+
+    with col2:
+        st.download_button(
+            label="📥 Download Links (Excel)",
+            data=excel_data,
+            file_name=f"{file_prefix}_{timestamp}.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            key=f"{key}_download_xlsx"
+        )
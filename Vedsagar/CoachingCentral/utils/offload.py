@@ -0,0 +1,150 @@
+import importlib.util
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Optional, Tuple
+import pandas as pd
+from config.settings import REPORT_CONFIG
+
+# Table name -> (offset, size) of its Arrow IPC stream in the shared memory block
+FrameManifest = Dict[str, Tuple[int, int]]
+
+
+def _arrow_tables(frames: Dict[str, pd.DataFrame]) -> Dict[str, Any]:
+    """Convert frames to Arrow tables"""
+    import pyarrow as pa
+    return {name: pa.Table.from_pandas(df, preserve_index=False) for name, df in frames.items()}
+
+
+def _stream_size(table: Any) -> int:
+    """Measure a table's Arrow IPC stream without writing it"""
+    import pyarrow as pa
+    sink = pa.MockOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.size()
+
+
+def _write_streams(block: shared_memory.SharedMemory, tables: Dict[str, Any], manifest: FrameManifest) -> None:
+    """Write each table's Arrow IPC stream straight into the shared memory block"""
+    import pyarrow as pa
+    for name, table in tables.items():
+        offset, size = manifest[name]
+        sink = pa.FixedSizeBufferWriter(pa.py_buffer(block.buf[offset:offset + size]))
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        sink.close()
+
+
+def publish_frames(frames: Dict[str, pd.DataFrame]) -> Tuple[shared_memory.SharedMemory, FrameManifest]:
+    """Copy frames into one shared memory block as Arrow IPC streams"""
+    tables = _arrow_tables(frames)
+    manifest: FrameManifest = {}
+    offset = 0
+    for name, table in tables.items():
+        size = _stream_size(table)
+        manifest[name] = (offset, size)
+        offset += size
+
+    block = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    try:
+        _write_streams(block, tables, manifest)
+    except Exception:
+        block.close()
+        block.unlink()
+        raise
+    return block, manifest
+
+
+def _read_frames(block: shared_memory.SharedMemory, manifest: FrameManifest) -> Dict[str, pd.DataFrame]:
+    """Read frames back from a shared memory block; columns may point into the block"""
+    import pyarrow as pa
+    frames = {}
+    for name, (offset, size) in manifest.items():
+        reader = pa.ipc.open_stream(pa.py_buffer(block.buf[offset:offset + size]))
+        frames[name] = reader.read_pandas()
+    return frames
+
+
+def _call_with_frames(block: shared_memory.SharedMemory, manifest: FrameManifest,
+                      func: Callable[..., Any], args: Tuple) -> Any:
+    """Call a function on frames read from shared memory"""
+    return func(_read_frames(block, manifest), *args)
+
+
+def _run_shared(func: Callable[..., Any], block_name: str, manifest: FrameManifest, args: Tuple) -> Any:
+    """Worker process entry point: attach to the frames' block and run the task"""
+    block = shared_memory.SharedMemory(name=block_name)
+    try:
+        # Frames are dropped when the call returns, so the block can be closed after it
+        return _call_with_frames(block, manifest, func, args)
+    finally:
+        try:
+            block.close()
+        except BufferError:
+            # A result still points into the block; the mapping goes when it is collected
+            pass
+
+
+class ProcessOffloader:
+    """
+    Process pool for CPU-bound pandas and serialization work
+    Frames travel as Arrow IPC streams in shared memory rather than as pickles, and
+    work runs in this process when pyarrow is missing, the data is small or the pool fails
+    """
+
+    def __init__(self, max_workers: int = REPORT_CONFIG["offload_workers"],
+                 min_rows: int = REPORT_CONFIG["offload_min_rows"]):
+        self.max_workers = max_workers
+        self.min_rows = min_rows
+        self.available = max_workers > 0 and importlib.util.find_spec("pyarrow") is not None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def should_offload(self, rows: Optional[int]) -> bool:
+        """Check whether work over this many rows is worth a worker process"""
+        return self.available and rows is not None and rows >= self.min_rows
+
+    def _executor(self) -> ProcessPoolExecutor:
+        """Get the process pool, starting it on first use"""
+        with self._lock:
+            if self._pool is None:
+                # Spawned workers do not inherit the server's threads and locks
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def run(self, func: Callable[..., Any], frames: Dict[str, pd.DataFrame], *args: Any) -> Any:
+        """Run func(frames, *args) in a worker process; func must be a module-level function"""
+        if not self.available:
+            return func(frames, *args)
+
+        try:
+            block, manifest = publish_frames(frames)
+        except Exception as e:
+            print(f"Error sharing frames with worker process: {str(e)}")
+            return func(frames, *args)
+
+        try:
+            return self._executor().submit(_run_shared, func, block.name, manifest, args).result()
+        except BrokenProcessPool as e:
+            print(f"Worker process pool failed, running in this process: {str(e)}")
+            with self._lock:
+                self._pool = None
+            return func(frames, *args)
+        finally:
+            block.close()
+            block.unlink()
+
+    def shutdown(self) -> None:
+        """Stop the worker processes"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+# Global process offloader instance
+process_offloader = ProcessOffloader()
@@ -0,0 +1,238 @@
+import time
+import threading
+from typing import Any, Dict, Optional
+import numpy as np
+import pandas as pd
+from config.settings import CACHE_CONFIG
+from utils.cache_manager import cache_manager
+from utils.leaderboard import leaderboard_index
+
+# Percentage bins used for batch score distributions
+SCORE_BINS = np.linspace(0, 100, 11)
+
+
+def _empty_rankings() -> pd.DataFrame:
+    """Get an empty student rankings frame"""
+    return pd.DataFrame(columns=['rank', 'student_id', 'student_name', 'average_score', 'tests_taken', 'attendance_rate'])
+
+
+class BatchPerformance:
+    """
+    Performance figures for one batch
+    Computed once from a joined scores x tests x students frame; score writes are applied to the
+    joined frame and the figures recomputed from it, without fetching the batch again
+    """
+
+    def __init__(self, batch_id: Any, students: pd.DataFrame, tests: pd.DataFrame, scores: pd.DataFrame):
+        self.batch_id = batch_id
+        self.test_ids = set(tests['id'].dropna().astype(int)) if 'id' in tests.columns else set()
+        self.computed_at = time.time()
+        self._students = students
+        self._tests = tests
+
+        self.results = self._join(students, tests, scores)
+        self._compute()
+
+    def _compute(self) -> None:
+        """Derive the batch figures from the joined results"""
+        present = self.results[self.results['present']]
+        self.overview = self._overview(self._students, self._tests, present)
+        self.score_distribution = self._score_distribution(present)
+        self.progress_over_time = self._progress_over_time(present)
+        self.student_rankings = self._student_rankings(self.results, present)
+
+    def record_score(self, test_id: int, student_id: Any, marks_obtained: Any, attendance: str = "Present") -> bool:
+        """Apply one score write to the results and recompute the figures; False if the test is not in the batch"""
+        if test_id not in self.test_ids:
+            return False
+        score = pd.DataFrame([{'test_id': test_id, 'student_id': student_id,
+                               'marks_obtained': pd.to_numeric(marks_obtained, errors='coerce'),
+                               'attendance': attendance}])
+        row = self._join(self._students, self._tests, score)
+        if row.empty:
+            return False
+
+        results = self.results
+        kept = results[~((results['test_id'] == test_id) & (results['student_id'] == student_id))]
+        self.results = pd.concat([kept, row], ignore_index=True) if not kept.empty else row
+        self._compute()
+        return True
+
+    @staticmethod
+    def _join(students: pd.DataFrame, tests: pd.DataFrame, scores: pd.DataFrame) -> pd.DataFrame:
+        """Join scores to their tests and students and compute percentages"""
+        columns = ['test_id', 'student_id', 'test_name', 'test_date', 'max_marks',
+                   'marks_obtained', 'percentage', 'present', 'student_name']
+        if scores.empty or tests.empty or 'test_id' not in scores.columns:
+            return pd.DataFrame(columns=columns).astype({'present': bool})
+
+        test_columns = tests[['id', 'name', 'date', 'max_marks']].rename(
+            columns={'id': 'test_id', 'name': 'test_name', 'date': 'test_date'}
+        )
+        results = scores[['test_id', 'student_id', 'marks_obtained'] +
+                         (['attendance'] if 'attendance' in scores.columns else [])]
+        results = results.merge(test_columns, on='test_id', how='inner')
+
+        if not students.empty and 'id' in students.columns:
+            names = students.set_index('id')['full_name']
+            results['student_name'] = results['student_id'].map(names)
+        else:
+            results['student_name'] = None
+        results['student_name'] = results['student_name'].fillna('Student ' + results['student_id'].astype(str))
+
+        max_marks = results['max_marks'].where(results['max_marks'] > 0)
+        results['percentage'] = results['marks_obtained'] / max_marks * 100
+        if 'attendance' in results.columns:
+            results['present'] = results['attendance'].fillna('Present') != 'Absent'
+        else:
+            results['present'] = True
+
+        return results[columns]
+
+    def _overview(self, students: pd.DataFrame, tests: pd.DataFrame, present: pd.DataFrame) -> Optional[Dict]:
+        """Headline numbers for the batch"""
+        if present.empty:
+            return None
+        return {
+            'total_students': max(len(students), self.results['student_id'].nunique()),
+            'average_score': float(present['percentage'].mean()),
+            'top_score': float(present['percentage'].max()),
+            'total_tests': max(len(tests), self.results['test_id'].nunique()),
+            'students_tested': int(present['student_id'].nunique())
+        }
+
+    @staticmethod
+    def _score_distribution(present: pd.DataFrame) -> pd.DataFrame:
+        """Histogram of score percentages in fixed 10% bins"""
+        if present.empty:
+            return pd.DataFrame(columns=['score_range', 'bin_start', 'bin_end', 'count'])
+
+        percentages = present['percentage'].dropna().clip(0, 100).to_numpy()
+        counts, edges = np.histogram(percentages, bins=SCORE_BINS)
+        return pd.DataFrame({
+            'score_range': [f"{int(start)}-{int(end)}%" for start, end in zip(edges[:-1], edges[1:])],
+            'bin_start': edges[:-1],
+            'bin_end': edges[1:],
+            'count': counts
+        })
+
+    @staticmethod
+    def _progress_over_time(present: pd.DataFrame) -> pd.DataFrame:
+        """Average percentage per test date"""
+        if present.empty:
+            return pd.DataFrame(columns=['test_date', 'average_percentage', 'tests', 'scores'])
+
+        progress = present.groupby('test_date').agg(
+            average_percentage=('percentage', 'mean'),
+            tests=('test_id', 'nunique'),
+            scores=('percentage', 'size')
+        ).reset_index().sort_values('test_date')
+        progress['test_date'] = progress['test_date'].dt.date
+        return progress
+
+    @staticmethod
+    def _student_rankings(results: pd.DataFrame, present: pd.DataFrame) -> pd.DataFrame:
+        """Per-student averages and attendance with dense ranks"""
+        if present.empty:
+            return _empty_rankings()
+
+        attendance = results.groupby('student_id')['present'].agg(['sum', 'size'])
+        rankings = present.groupby(['student_id', 'student_name']).agg(
+            average_score=('percentage', 'mean'),
+            tests_taken=('test_id', 'nunique')
+        ).reset_index()
+
+        rankings['attendance_rate'] = rankings['student_id'].map(attendance['sum'] / attendance['size'] * 100)
+        rankings['rank'] = rankings['average_score'].rank(method='dense', ascending=False).astype(int)
+        rankings = rankings.sort_values(['rank', 'student_name']).reset_index(drop=True)
+        return rankings[['rank', 'student_id', 'student_name', 'average_score', 'tests_taken', 'attendance_rate']]
+
+
+class PerformanceAnalytics:
+    """
+    Cache of batch performance figures
+    One fetch per batch; entries are dropped when a score for the batch changes
+    """
+
+    def __init__(self, ttl: int = CACHE_CONFIG["cache_ttl"]):
+        self.ttl = ttl
+        self._cache: Dict[Any, BatchPerformance] = {}
+        self._lock = threading.Lock()
+
+    def _load(self, db_manager: Any, batch_id: Any) -> BatchPerformance:
+        """Fetch the batch's tests, scores and students and compute its figures"""
+        tests = db_manager.get_table_frame('tests', {'where': f"(batch_id,eq,{batch_id})"})
+        if not tests.empty and 'batch_id' in tests.columns:
+            tests = tests[tests['batch_id'] == batch_id]
+
+        students = db_manager.get_table_frame('students', {'where': f"(batch_id,eq,{batch_id})"})
+        if not students.empty and 'batch_id' in students.columns:
+            students = students[students['batch_id'] == batch_id]
+
+        scores = pd.DataFrame()
+        if not tests.empty:
+            test_ids = tests['id'].dropna().astype(int).tolist()
+            scores = db_manager.get_table_frame(
+                'test_scores', {'where': f"(test_id,in,{','.join(str(test_id) for test_id in test_ids)})"}
+            )
+            if not scores.empty and 'test_id' in scores.columns:
+                scores = scores[scores['test_id'].isin(test_ids)]
+
+        performance = BatchPerformance(batch_id, students, tests, scores)
+        leaderboard_index.load_batch(batch_id, tests, performance.results)
+        return performance
+
+    def get_batch(self, db_manager: Any, batch_id: Any) -> BatchPerformance:
+        """Get the figures for a batch, computing them on first use"""
+        batch_id = int(batch_id)
+        performance = self._cache.get(batch_id)
+        if performance is not None and time.time() - performance.computed_at < self.ttl:
+            cache_manager.touch('performance', batch_id)
+            return performance
+
+        performance = self._load(db_manager, batch_id)
+        with self._lock:
+            self._cache[batch_id] = performance
+        cache_manager.track('performance', batch_id, performance, lambda: self.invalidate_batch(batch_id))
+        return performance
+
+    def record_score(self, test_id: Any, student_id: Any, marks_obtained: Any, attendance: str = "Present") -> bool:
+        """Apply one score write to the cached batches holding its test; False if one could not take it"""
+        if test_id is None:
+            return False
+        test_id = int(test_id)
+        with self._lock:
+            for performance in [performance for performance in self._cache.values() if test_id in performance.test_ids]:
+                if not performance.record_score(test_id, student_id, marks_obtained, attendance):
+                    return False
+        return True
+
+    def invalidate_batch(self, batch_id: Any) -> None:
+        """Drop the cached figures for a batch"""
+        if batch_id is None:
+            return
+        with self._lock:
+            self._cache.pop(int(batch_id), None)
+        cache_manager.forget('performance', int(batch_id))
+
+    def invalidate_test(self, test_id: Any) -> None:
+        """Drop the cached figures of every batch that contains a test"""
+        if test_id is None:
+            return
+        test_id = int(test_id)
+        with self._lock:
+            batch_ids = [key for key, performance in self._cache.items() if test_id in performance.test_ids]
+            for batch_id in batch_ids:
+                del self._cache[batch_id]
+        for batch_id in batch_ids:
+            cache_manager.forget('performance', batch_id)
+
+    def clear(self) -> None:
+        """Drop all cached batch figures"""
+        with self._lock:
+            self._cache.clear()
+        cache_manager.forget('performance')
+
+
+# Global performance analytics instance
+performance_analytics = PerformanceAnalytics()
@@ -0,0 +1,180 @@
+import hashlib
+import json
+import time
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from config.settings import CACHE_CONFIG, REPORT_CONFIG
+from utils.cache_manager import cache_manager
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+class DataVersion:
+    """
+    Process-wide counter bumped on every write to the data
+    Cached job results are keyed by it, so none survive a change
+    """
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def bump(self) -> None:
+        """Mark results computed so far as out of date"""
+        with self._lock:
+            self.value += 1
+
+
+class ReportJob:
+    """
+    One report generation request and its outcome
+    Builders run on a worker thread and report progress through update()
+    """
+
+    def __init__(self, key: str, report_type: str, params: Dict[str, Any], data_version: int):
+        self.key = key
+        self.report_type = report_type
+        self.params = params
+        self.data_version = data_version
+        self.status = JOB_QUEUED
+        self.progress = 0.0
+        self.message = "Waiting for a worker"
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JOB_DONE, JOB_FAILED)
+
+    @property
+    def run_seconds(self) -> float:
+        """Seconds spent building the report so far"""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def update(self, progress: float, message: str) -> None:
+        """Record how far the builder has got"""
+        self.progress = min(max(progress, 0.0), 1.0)
+        self.message = message
+
+    def run_steps(self, steps: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+        """Run named steps in order, reporting progress after each; returns their results by name"""
+        results = {}
+        for number, (name, step) in enumerate(steps.items()):
+            self.update(number / len(steps), f"Building {name.replace('_', ' ')}")
+            results[name] = step()
+        return results
+
+
+class ReportJobRunner:
+    """
+    Runs report builders on a worker pool instead of inside the Streamlit script run
+    Jobs are keyed by report type, parameters and data version, so repeats reuse the same job
+    """
+
+    # Finished results count against the shared cache budget under this name
+    cache_namespace: Optional[str] = "reports"
+
+    def __init__(self, max_workers: int = REPORT_CONFIG["report_job_workers"],
+                 max_jobs: int = REPORT_CONFIG["report_job_cache_size"], ttl: int = CACHE_CONFIG["cache_ttl"]):
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self._jobs: "OrderedDict[str, ReportJob]" = OrderedDict()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="report-job")
+        self._lock = threading.Lock()
+
+    def job_key(self, report_type: str, params: Dict[str, Any]) -> str:
+        """Build the cache key of a report request"""
+        payload = json.dumps([report_type, params, data_version.value], sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def _expired(self, job: ReportJob) -> bool:
+        """Check whether a finished job's result is older than the cache TTL"""
+        return job.finished and job.finished_at is not None and time.time() - job.finished_at >= self.ttl
+
+    def submit(self, report_type: str, params: Dict[str, Any], builder: Callable[[ReportJob], Any],
+               cache: bool = True) -> ReportJob:
+        """Queue a report, or return the running or cached job for the same request; cache=False always builds afresh"""
+        with self._lock:
+            # Uncached jobs get a key of their own, so no later request can reuse their result
+            key = self.job_key(report_type, params) if cache else uuid.uuid4().hex
+            job = self._jobs.get(key)
+            if job is not None and job.status != JOB_FAILED and not self._expired(job):
+                self._jobs.move_to_end(key)
+                return job
+            if job is not None:
+                self._discard(self._jobs.pop(key))
+
+            job = ReportJob(key, report_type, dict(params), data_version.value)
+            self._jobs[key] = job
+            self._evict()
+
+        self._executor.submit(self._run, job, builder)
+        return job
+
+    def _evict(self) -> None:
+        """Drop expired jobs, then the least recently requested finished jobs beyond the cache size"""
+        for key in [key for key, job in self._jobs.items() if self._expired(job)]:
+            self._discard(self._jobs.pop(key))
+        for key in list(self._jobs.keys()):
+            if len(self._jobs) <= self.max_jobs:
+                break
+            if self._jobs[key].finished:
+                self._discard(self._jobs.pop(key))
+
+    def _discard(self, job: ReportJob) -> None:
+        """Release what a dropped job holds beyond its in-memory result"""
+        if self.cache_namespace is not None:
+            cache_manager.forget(self.cache_namespace, job.key)
+
+    def _drop(self, key: str) -> None:
+        """Drop a finished job evicted to keep the caches within budget"""
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.finished:
+                self._discard(self._jobs.pop(key))
+
+    def _run(self, job: ReportJob, builder: Callable[[ReportJob], Any]) -> None:
+        """Build a report on a worker thread"""
+        job.status = JOB_RUNNING
+        job.started_at = time.time()
+        job.update(0.0, "Generating report")
+        try:
+            job.result = builder(job)
+            job.update(1.0, "Report ready")
+            job.status = JOB_DONE
+        except Exception as e:
+            print(f"Error generating {job.report_type}: {str(e)}")
+            job.error = str(e)
+            job.status = JOB_FAILED
+        finally:
+            job.finished_at = time.time()
+        if job.status == JOB_DONE and self.cache_namespace is not None:
+            cache_manager.track(self.cache_namespace, job.key, job.result, lambda: self._drop(job.key))
+
+    def get(self, key: Optional[str]) -> Optional[ReportJob]:
+        """Get a job by its key"""
+        return self._jobs.get(key) if key else None
+
+    def clear(self) -> None:
+        """Forget all finished jobs"""
+        with self._lock:
+            for key in [key for key, job in self._jobs.items() if job.finished]:
+                self._discard(self._jobs.pop(key))
+
+
+# Global data version instance
+data_version = DataVersion()
+
+# Global report job runner instance
+report_jobs = ReportJobRunner()
@@ -0,0 +1,251 @@
+import time
+import threading
+from datetime import date
+from typing import Any, Dict, Optional, Set
+import pandas as pd
+from config.settings import CACHE_CONFIG
+from utils.timeseries import TimeSeriesIndex
+
+# Payment statuses that count as money received
+COUNTED_PAYMENT_STATUSES = {"Completed"}
+
+METHOD_PREFIX = "method:"
+CATEGORY_PREFIX = "category:"
+
+# Name the rollup is kept under in the table store
+ROLLUP_STORE_NAME = "payment_rollup"
+
+
+def _daily_rows(payments: pd.DataFrame, student_categories: Dict[Any, str]) -> pd.DataFrame:
+    """Roll payments up to one row per day"""
+    if payments.empty or 'payment_date' not in payments.columns or 'amount' not in payments.columns:
+        return pd.DataFrame()
+
+    if 'status' in payments.columns:
+        payments = payments[payments['status'].isna() | payments['status'].isin(COUNTED_PAYMENT_STATUSES)]
+
+    payments = payments.assign(
+        day=pd.to_datetime(payments['payment_date'], errors='coerce').dt.normalize(),
+        amount=pd.to_numeric(payments['amount'], errors='coerce').fillna(0)
+    ).dropna(subset=['day'])
+    if payments.empty:
+        return pd.DataFrame()
+
+    method = payments['payment_method'] if 'payment_method' in payments.columns else None
+    payments = payments.assign(
+        method=(method.fillna('Unknown') if method is not None else 'Unknown'),
+        category=payments['student_id'].map(student_categories).fillna('Unknown')
+    )
+
+    daily = payments.groupby('day').agg(amount=('amount', 'sum'), count=('amount', 'size'))
+    by_method = payments.pivot_table(index='day', columns='method', values='amount', aggfunc='sum', fill_value=0)
+    by_category = payments.pivot_table(index='day', columns='category', values='amount', aggfunc='sum', fill_value=0)
+
+    by_method.columns = [f"{METHOD_PREFIX}{column}" for column in by_method.columns]
+    by_category.columns = [f"{CATEGORY_PREFIX}{column}" for column in by_category.columns]
+    return pd.concat([daily, by_method, by_category], axis=1).fillna(0)
+
+
+def _merge_rows(rollup: pd.DataFrame, rows: pd.DataFrame) -> pd.DataFrame:
+    """Add daily rows into a rollup, summing days present in both"""
+    if rows.empty:
+        return rollup
+    if rollup.empty:
+        return rows.sort_index()
+    return rollup.add(rows, fill_value=0).fillna(0).sort_index()
+
+
+class PaymentRollup:
+    """
+    Daily payment totals: amount, count, by payment method and by category
+    Built from the payments table, extended with newer payments and rebuilt once its fingerprint moves;
+    range totals come from a prefix-sum index over the daily rows. With a store attached
+    the daily rows are kept on disk and restored by the next start
+    """
+
+    def __init__(self, refresh_interval: int = CACHE_CONFIG["cache_ttl"]):
+        self.refresh_interval = refresh_interval
+        self.daily = pd.DataFrame()
+        self.index = TimeSeriesIndex(pd.DataFrame(columns=['amount', 'count']))
+        self.watermark = 0
+        # Ids above the watermark already folded in by add_payment
+        self.applied_ids: Set[int] = set()
+        self.student_categories: Dict[Any, str] = {}
+        # Fingerprint of the payments frame the rollup was built from
+        self.payments_fingerprint: Optional[tuple] = None
+        self.built_at: Optional[float] = None
+        self.refreshed_at: Optional[float] = None
+        self.store: Optional[Any] = None
+        self._lock = threading.RLock()
+
+    def attach_store(self, store: Any) -> None:
+        """Keep the daily rows in a table store; the first store attached is kept"""
+        if self.store is None and store.available:
+            self.store = store
+
+    def _persist(self, db_manager: Any) -> None:
+        """Save the daily rows with the watermark and the payments fingerprint they cover"""
+        if self.store is None or self.daily.empty:
+            return
+        fingerprint = {'watermark': self.watermark, 'applied': sorted(self.applied_ids),
+                       'payments': db_manager.cached_fingerprint('payments')}
+        self.store.publish(ROLLUP_STORE_NAME, self.daily, fingerprint, preserve_index=True)
+
+    def _restore(self, db_manager: Any) -> bool:
+        """Load the daily rows saved by an earlier run if they match the cached payments table"""
+        if self.store is None:
+            return False
+        entry = self.store.lookup(ROLLUP_STORE_NAME)
+        if entry is None or not isinstance(entry.fingerprint, dict):
+            return False
+        payments = entry.fingerprint.get('payments')
+        # A payments table that changed since would need a rebuild anyway
+        if payments is None or tuple(payments) != db_manager.cached_fingerprint('payments'):
+            return False
+        daily = self.store.load(entry)
+        if daily is None:
+            return False
+
+        self.daily = daily
+        self.index = TimeSeriesIndex(daily)
+        self.watermark = int(entry.fingerprint.get('watermark') or 0)
+        self.applied_ids = set(entry.fingerprint.get('applied') or [])
+        self.payments_fingerprint = db_manager.cached_fingerprint('payments')
+        self.student_categories = {}
+        self.built_at = self.refreshed_at = time.time()
+        return True
+
+    def _load_categories(self, db_manager: Any, payments: pd.DataFrame) -> None:
+        """Look up the category of students not seen before"""
+        if payments.empty or 'student_id' not in payments.columns:
+            return
+
+        missing = [student_id for student_id in payments['student_id'].dropna().unique()
+                   if student_id not in self.student_categories]
+        if not missing:
+            return
+
+        params = None
+        if self.student_categories:
+            # Only ask for the new students once the full list has been loaded
+            params = {'where': f"(id,in,{','.join(str(int(student_id)) for student_id in missing)})"}
+        students = db_manager.get_table_frame('students', params)
+        if not students.empty and 'category' in students.columns:
+            self.student_categories.update(zip(students['id'], students['category']))
+
+    def build(self, db_manager: Any) -> None:
+        """Build the rollup from the whole payments table"""
+        with self._lock:
+            # Taken before the read, so a change landing in between still shows as a moved fingerprint
+            fingerprint = db_manager.cached_fingerprint('payments')
+            payments = db_manager.get_table_frame('payments')
+            self.student_categories = {}
+            self._load_categories(db_manager, payments)
+
+            self.daily = _daily_rows(payments, self.student_categories)
+            self.index = TimeSeriesIndex(self.daily)
+            self.watermark = int(payments['id'].max()) if 'id' in payments.columns and not payments.empty else 0
+            self.applied_ids = set()
+            self.payments_fingerprint = fingerprint
+            self.built_at = self.refreshed_at = time.time()
+            self._persist(db_manager)
+
+    def extend(self, db_manager: Any) -> int:
+        """Add payments newer than the watermark; returns how many were added"""
+        with self._lock:
+            payments = db_manager.get_table_frame('payments', {'where': f"(id,gt,{self.watermark})"})
+            if not payments.empty and 'id' in payments.columns:
+                payments = payments[payments['id'] > self.watermark]
+
+            self.refreshed_at = time.time()
+            if payments.empty:
+                return 0
+
+            watermark = max(self.watermark, int(payments['id'].max()))
+            # Payments recorded in this process are already in the daily rows
+            payments = payments[~payments['id'].isin(self.applied_ids)]
+            if not payments.empty:
+                self._load_categories(db_manager, payments)
+                self.daily = _merge_rows(self.daily, _daily_rows(payments, self.student_categories))
+                self.index = TimeSeriesIndex(self.daily)
+            self.watermark = watermark
+            self.applied_ids = {payment_id for payment_id in self.applied_ids if payment_id > watermark}
+            self._persist(db_manager)
+            return len(payments)
+
+    def ensure_current(self, db_manager: Any) -> None:
+        """Build the rollup on first use, rebuild it after payments changed and extend it once the refresh interval passes"""
+        with self._lock:
+            if self.built_at is None:
+                if not self._restore(db_manager):
+                    self.build(db_manager)
+            elif db_manager.cached_fingerprint('payments') != self.payments_fingerprint:
+                # Edited and deleted payments show only in the fingerprint, never past the watermark
+                self.build(db_manager)
+            elif time.time() - self.refreshed_at >= self.refresh_interval:
+                self.extend(db_manager)
+
+    def add_payment(self, payment: Dict, payment_id: Optional[int] = None, category: Optional[str] = None) -> None:
+        """Apply one just-recorded payment without refetching"""
+        with self._lock:
+            if self.built_at is None:
+                return
+            if payment_id is None:
+                # Without an id the next extend picks the payment up instead
+                self.refreshed_at = 0
+                return
+            if payment_id <= self.watermark or payment_id in self.applied_ids:
+                return
+
+            if category is not None:
+                self.student_categories[payment.get('student_id')] = category
+
+            row = dict(payment, id=payment_id)
+            self.daily = _merge_rows(self.daily, _daily_rows(pd.DataFrame([row]), self.student_categories))
+            self.index = TimeSeriesIndex(self.daily)
+            # The watermark stays put, so the next extend still fetches payments with ids below this one
+            self.applied_ids.add(payment_id)
+
+    def invalidate(self) -> None:
+        """Force a full rebuild on next use"""
+        # Left unlocked, as the table cache calls this while other threads build with the lock held
+        self.built_at = None
+        if self.store is not None:
+            self.store.discard(ROLLUP_STORE_NAME)
+
+    def range_totals(self, start_date: date, end_date: date) -> pd.Series:
+        """Sum every rollup column between two dates, inclusive"""
+        totals = self.index.range_totals(start_date, end_date)
+        if totals.empty:
+            return pd.Series({'amount': 0.0, 'count': 0.0})
+        return totals
+
+    def daily_series(self, start_date: date, end_date: date) -> pd.DataFrame:
+        """Get daily amount and count with every date in the range present"""
+        index = self.index
+        days = pd.date_range(start=start_date, end=end_date, freq='D')
+        amounts = index.daily(start_date, end_date, 'amount').set_index('date')['amount']
+        counts = index.daily(start_date, end_date, 'count').set_index('date')['count']
+        return pd.DataFrame({
+            'date': days.date,
+            'revenue': amounts.reindex(days.date, fill_value=0).to_numpy(),
+            'payments': counts.reindex(days.date, fill_value=0).astype(int).to_numpy()
+        })
+
+    def breakdown(self, start_date: date, end_date: date, prefix: str) -> pd.Series:
+        """Get amounts by payment method or by category between two dates"""
+        totals = self.range_totals(start_date, end_date)
+        selected = totals[[column for column in totals.index if column.startswith(prefix)]]
+        selected.index = [column[len(prefix):] for column in selected.index]
+        return selected[selected != 0].sort_values(ascending=False)
+
+
+def percent_change(current: float, previous: float) -> float:
+    """Get the percentage change from a previous value"""
+    if not previous:
+        return 0.0
+    return round((current - previous) / previous * 100, 1)
+
+
+# Global payment rollup instance
+payment_rollup = PaymentRollup()
@@ -0,0 +1,199 @@
+import importlib.util
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+from typing import Any, Dict, Optional
+import pandas as pd
+from config.settings import CACHE_CONFIG
+
+INDEX_FILE = "index.sqlite"
+
+# Frame files no index entry points to are removed at start once this old, in seconds
+ORPHAN_FILE_AGE = 3600
+
+
+class SharedEntry:
+    """The latest published copy of a table"""
+
+    def __init__(self, table_name: str, version: int, fingerprint: Any, file_name: str,
+                 rows: int, published_at: float):
+        self.table_name = table_name
+        self.version = version
+        self.fingerprint = fingerprint
+        self.file_name = file_name
+        self.rows = rows
+        self.published_at = published_at
+
+
+class SharedTableStore:
+    """
+    Table frames shared by every server process on the host and kept across restarts
+    Frames are uncompressed Arrow IPC files that each process memory-maps, so their pages are held
+    once by the OS; a SQLite index gives every table a version that increases on each publish
+    """
+
+    def __init__(self, directory: str, poll_seconds: float = CACHE_CONFIG["shared_cache_poll_seconds"]):
+        self.directory = directory
+        self.poll_seconds = poll_seconds
+        self.available = importlib.util.find_spec("pyarrow") is not None
+        self._entries: Dict[str, SharedEntry] = {}
+        self._read_at = 0.0
+        self._lock = threading.Lock()
+        if self.available:
+            try:
+                os.makedirs(directory, exist_ok=True)
+                with closing(self._connect()) as connection:
+                    connection.execute("PRAGMA journal_mode=WAL")
+                    connection.execute(
+                        "CREATE TABLE IF NOT EXISTS tables (table_name TEXT PRIMARY KEY, version INTEGER NOT NULL, "
+                        "fingerprint TEXT, file_name TEXT NOT NULL, rows INTEGER NOT NULL, published_at REAL NOT NULL)")
+                    connection.commit()
+                    files = {row[0] for row in connection.execute("SELECT file_name FROM tables").fetchall()}
+                self._remove_orphans(files)
+            except (OSError, sqlite3.Error) as e:
+                print(f"Error opening shared table cache: {str(e)}")
+                self.available = False
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(os.path.join(self.directory, INDEX_FILE), timeout=10)
+
+    def _remove_orphans(self, files: set) -> None:
+        """Delete frame files left behind by a process that stopped mid-publish"""
+        cutoff = time.time() - ORPHAN_FILE_AGE
+        for file_name in os.listdir(self.directory):
+            path = os.path.join(self.directory, file_name)
+            if file_name.endswith(".arrow") and file_name not in files and os.path.getmtime(path) < cutoff:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def lookup(self, table_name: str) -> Optional[SharedEntry]:
+        """Get a table's latest entry, reading the index at most once per poll interval"""
+        if not self.available:
+            return None
+        if time.time() - self._read_at >= self.poll_seconds:
+            try:
+                with closing(self._connect()) as connection:
+                    rows = connection.execute(
+                        "SELECT table_name, version, fingerprint, file_name, rows, published_at FROM tables").fetchall()
+            except sqlite3.Error as e:
+                print(f"Error reading shared table cache: {str(e)}")
+                rows = []
+            with self._lock:
+                self._entries = {row[0]: SharedEntry(row[0], row[1], _decode_fingerprint(row[2]), *row[3:])
+                                 for row in rows}
+                self._read_at = time.time()
+        return self._entries.get(table_name)
+
+    def load(self, entry: SharedEntry) -> Optional[pd.DataFrame]:
+        """Map a published table into this process; None if it was replaced meanwhile"""
+        import pyarrow as pa
+        try:
+            table = pa.ipc.open_file(pa.memory_map(os.path.join(self.directory, entry.file_name))).read_all()
+            # Split blocks keep columns pointing into the mapped file rather than copied together
+            return table.to_pandas(split_blocks=True)
+        except (OSError, pa.ArrowException) as e:
+            print(f"Error loading shared {entry.table_name}: {str(e)}")
+            return None
+
+    def publish(self, table_name: str, frame: pd.DataFrame, fingerprint: Any,
+                preserve_index: bool = False) -> Optional[int]:
+        """Write a table's frame for the other processes; returns its new version"""
+        if not self.available:
+            return None
+        import pyarrow as pa
+        file_name = f"{table_name}.{uuid.uuid4().hex}.arrow"
+        path = os.path.join(self.directory, file_name)
+        try:
+            table = pa.Table.from_pandas(frame, preserve_index=preserve_index)
+            with pa.OSFile(path, 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+
+            with closing(self._connect()) as connection:
+                connection.execute("BEGIN IMMEDIATE")
+                previous = connection.execute("SELECT version, file_name FROM tables WHERE table_name = ?",
+                                              (table_name,)).fetchone()
+                version = (previous[0] if previous else 0) + 1
+                connection.execute("INSERT OR REPLACE INTO tables VALUES (?, ?, ?, ?, ?, ?)",
+                                   (table_name, version, json.dumps(fingerprint, default=str), file_name,
+                                    len(frame), time.time()))
+                connection.commit()
+        except (OSError, sqlite3.Error, pa.ArrowException) as e:
+            print(f"Error publishing {table_name} to shared cache: {str(e)}")
+            if os.path.exists(path):
+                os.remove(path)
+            return None
+
+        if previous:
+            # Processes that mapped the old file keep reading it until they let go
+            try:
+                os.remove(os.path.join(self.directory, previous[1]))
+            except OSError:
+                pass
+        return version
+
+    def confirm(self, table_name: str, version: int) -> None:
+        """Record that a published version still matches the backend"""
+        try:
+            with closing(self._connect()) as connection:
+                connection.execute("UPDATE tables SET published_at = ? WHERE table_name = ? AND version = ?",
+                                   (time.time(), table_name, version))
+                connection.commit()
+        except sqlite3.Error as e:
+            print(f"Error updating shared table cache: {str(e)}")
+
+    def discard(self, table_name: str) -> None:
+        """Drop one published table"""
+        if not self.available:
+            return
+        try:
+            with closing(self._connect()) as connection:
+                row = connection.execute("SELECT file_name FROM tables WHERE table_name = ?",
+                                         (table_name,)).fetchone()
+                connection.execute("DELETE FROM tables WHERE table_name = ?", (table_name,))
+                connection.commit()
+        except sqlite3.Error as e:
+            print(f"Error updating shared table cache: {str(e)}")
+            return
+        if row:
+            try:
+                os.remove(os.path.join(self.directory, row[0]))
+            except OSError:
+                pass
+        with self._lock:
+            self._entries.pop(table_name, None)
+
+    def clear(self) -> None:
+        """Drop every published table"""
+        if not self.available:
+            return
+        try:
+            with closing(self._connect()) as connection:
+                files = [row[0] for row in connection.execute("SELECT file_name FROM tables").fetchall()]
+                connection.execute("DELETE FROM tables")
+                connection.commit()
+        except sqlite3.Error as e:
+            print(f"Error clearing shared table cache: {str(e)}")
+            return
+        for file_name in files:
+            try:
+                os.remove(os.path.join(self.directory, file_name))
+            except OSError:
+                pass
+        with self._lock:
+            self._entries = {}
+            self._read_at = 0.0
+
+
+def _decode_fingerprint(value: Optional[str]) -> Any:
+    """Read a fingerprint back as the tuple the table cache compares"""
+    if value is None:
+        return None
+    decoded = json.loads(value)
+    return tuple(decoded) if isinstance(decoded, list) else decoded
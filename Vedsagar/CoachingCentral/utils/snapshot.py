@@ -0,0 +1,139 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import chain
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, Optional
+import numpy as np
+import pandas as pd
+from config.settings import DATABASE_SCHEMA
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Schema field types converted when building typed frames
+DATE_FIELD_TYPES = {"Date", "DateTime"}
+NUMBER_FIELD_TYPES = {"Number", "Currency", "AutoNumber"}
+
+
+def decode_json(content: bytes) -> Any:
+    """Decode an API response body, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _parse_dates(values: list) -> pd.DatetimeIndex:
+    """Parse date strings to naive UTC timestamps, trying the ISO 8601 fast path first"""
+    parsed = pd.to_datetime(values, errors="coerce", utc=True, format="ISO8601")
+    if parsed.hasnans:
+        values = pd.Series(values, dtype=object)
+        retry = parsed.isna() & values.notna().to_numpy()
+        if retry.any():
+            # Dates NocoDB did not send in ISO 8601 form
+            parsed = pd.Series(parsed)
+            parsed[retry] = pd.to_datetime(values[retry], errors="coerce", utc=True, format="mixed")
+            parsed = pd.DatetimeIndex(parsed)
+    return parsed.tz_localize(None)
+
+
+class FrameBuilder:
+    """
+    Builds a typed frame from pages of API rows, one column at a time
+    Each page is split into per-field value lists as it arrives, so its row dicts can be freed at once
+    """
+
+    def __init__(self, table_name: str):
+        self.table_name = table_name
+        self.rows = 0
+        self._columns: Dict[str, list] = {}
+
+    def add(self, records: List[Dict]) -> "FrameBuilder":
+        """Append a page of rows"""
+        if not records:
+            return self
+        fields = list(records[0])
+        values = None
+        if len(set(map(len, records))) == 1:
+            try:
+                values = {field: list(map(itemgetter(field), records)) for field in fields}
+            except KeyError:
+                pass
+        if values is None:
+            # Rows leave out different fields; missing values become NaN as with pd.DataFrame(records)
+            fields = list(dict.fromkeys(chain.from_iterable(records)))
+            values = {field: [record.get(field, np.nan) for record in records] for field in fields}
+
+        for field, column in values.items():
+            if field in self._columns:
+                self._columns[field].extend(column)
+            else:
+                self._columns[field] = [np.nan] * self.rows + column
+        self.rows += len(records)
+        for field, column in self._columns.items():
+            if len(column) < self.rows:
+                column.extend([np.nan] * (self.rows - len(column)))
+        return self
+
+    def build(self) -> pd.DataFrame:
+        """Build the frame with columns typed from the schema"""
+        if not self.rows:
+            return pd.DataFrame()
+
+        schema_fields = DATABASE_SCHEMA.get(self.table_name, {}).get("fields", [])
+        field_types = {field["name"]: field["type"] for field in schema_fields}
+        columns = {}
+        for column, values in self._columns.items():
+            field_type = field_types.get(column)
+            if field_type in DATE_FIELD_TYPES:
+                columns[column] = _parse_dates(values)
+            elif field_type in NUMBER_FIELD_TYPES:
+                columns[column] = pd.to_numeric(values, errors="coerce")
+            else:
+                columns[column] = values
+        self._columns = {}
+        df = pd.DataFrame(columns)
+
+        if self.table_name == "students" and "total_fee" in df.columns and "paid_amount" in df.columns:
+            df["pending_amount"] = df["total_fee"].fillna(0) - df["paid_amount"].fillna(0)
+
+        return df
+
+
+def typed_frame(records: List[Dict], table_name: str) -> pd.DataFrame:
+    """Build a DataFrame from table rows with columns typed from the schema"""
+    return FrameBuilder(table_name).add(records).build()
+
+
+class DataSnapshot:
+    """
+    Typed frames of several tables read at one point in time
+    Report builders share a snapshot and must not modify its frames
+    """
+
+    def __init__(self, frames: Dict[str, pd.DataFrame], taken_at: Optional[datetime] = None,
+                 load_seconds: float = 0.0):
+        self.frames = frames
+        self.taken_at = taken_at or datetime.now()
+        self.load_seconds = load_seconds
+
+    def frame(self, table_name: str) -> pd.DataFrame:
+        """Get a table's frame, empty if it was not loaded"""
+        return self.frames.get(table_name, pd.DataFrame())
+
+    @classmethod
+    def capture(cls, db_manager: Any, tables: Iterable[str], max_workers: int = 4) -> "DataSnapshot":
+        """Load the given tables concurrently into a new snapshot"""
+        tables = list(dict.fromkeys(tables))
+        started = time.perf_counter()
+
+        frames = {}
+        if tables:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(tables))) as executor:
+                for table_name, frame in zip(tables, executor.map(db_manager.get_table_frame, tables)):
+                    frames[table_name] = frame
+
+        return cls(frames, datetime.now(), time.perf_counter() - started)
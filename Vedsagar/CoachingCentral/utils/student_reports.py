@@ -0,0 +1,234 @@
+import time
+import threading
+from datetime import date
+from typing import Any, Callable, Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+from config.settings import CACHE_CONFIG
+from utils.cache_manager import cache_manager
+from utils.exporter import export_engine
+from utils.helpers import calculate_ages
+
+ALL_CATEGORIES = "All Categories"
+ALL_BATCHES = "All Batches"
+
+# Tables the report frame is built from
+REPORT_TABLES = ['students', 'tests', 'test_scores']
+
+# Date range filter -> days back from today (None keeps every date)
+DATE_RANGE_DAYS: Dict[str, Optional[int]] = {
+    "Last 30 Days": 30,
+    "Last 90 Days": 90,
+    "Last 6 Months": 182,
+    "Last Year": 365,
+    "All Time": None
+}
+
+# Age group bins: a student falls in the group whose lower bound is at or below their age
+AGE_GROUP_BINS = [0, 15, 18, 21, 25, 30, np.inf]
+AGE_GROUP_LABELS = ["Under 15", "15-17", "18-20", "21-24", "25-29", "30+"]
+
+STUDENT_REPORT_COLUMNS = ['id', 'full_name', 'category', 'batch', 'batch_id', 'status', 'gender',
+                          'date_of_birth', 'admission_date']
+
+
+def _range_start(date_range: str, today: pd.Timestamp) -> Optional[pd.Timestamp]:
+    """Get the first day a date range filter keeps"""
+    days = DATE_RANGE_DAYS.get(date_range)
+    return None if days is None else today - pd.Timedelta(days=days)
+
+
+class StudentReportFrame:
+    """
+    Students with age, age group and admission month, plus one row per score with its test date
+    Filter masks are computed once per filter value and combined with &
+    """
+
+    def __init__(self, students: pd.DataFrame, tests: pd.DataFrame, scores: pd.DataFrame,
+                 today: Optional[date] = None):
+        self.built_at = time.time()
+        self.today = pd.Timestamp(today or date.today())
+        self.students = self._prepare_students(students)
+        self._prepare_attendance(tests, scores)
+        self._masks: Dict[Tuple[str, Any], np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def _prepare_students(self, students: pd.DataFrame) -> pd.DataFrame:
+        """Keep the report columns and add age, age group and admission month"""
+        students = students[[column for column in STUDENT_REPORT_COLUMNS if column in students.columns]].copy()
+        for column in ['id', 'full_name', 'category', 'batch', 'status']:
+            if column not in students.columns:
+                students[column] = None
+        students = students.reset_index(drop=True)
+
+        if 'date_of_birth' in students.columns:
+            students['age'] = calculate_ages(students['date_of_birth'], self.today)
+            students['age_group'] = pd.cut(students['age'].astype(float), bins=AGE_GROUP_BINS,
+                                           labels=AGE_GROUP_LABELS, right=False)
+
+        admitted = pd.to_datetime(students['admission_date'], errors='coerce') \
+            if 'admission_date' in students.columns else pd.Series(pd.NaT, index=students.index)
+        students['admission_date'] = admitted
+        students['month'] = admitted.dt.to_period('M').astype(str).where(admitted.notna())
+        return students
+
+    def _prepare_attendance(self, tests: pd.DataFrame, scores: pd.DataFrame) -> None:
+        """Keep each score's student position, test date and presence as arrays sorted by date"""
+        self.score_positions = np.zeros(0, dtype=np.int64)
+        self.score_days = np.zeros(0, dtype='datetime64[ns]')
+        self.score_present = np.zeros(0, dtype=bool)
+        self.dated_scores = 0
+        if scores.empty or 'student_id' not in scores.columns or self.students.empty:
+            return
+
+        positions = pd.Series(np.arange(len(self.students)), index=self.students['id'])
+        positions = positions[~positions.index.duplicated()]
+        scores = scores.assign(position=scores['student_id'].map(positions))
+
+        if not tests.empty and {'id', 'date'} <= set(tests.columns) and 'test_id' in scores.columns:
+            scores = scores.assign(day=scores['test_id'].map(tests.drop_duplicates('id').set_index('id')['date']))
+        else:
+            scores = scores.assign(day=pd.NaT)
+        # Scores of unknown tests sort last and only count towards All Time
+        scores = scores.dropna(subset=['position']).sort_values('day', kind='stable')
+
+        attendance = scores['attendance'] if 'attendance' in scores.columns else pd.Series('Present', index=scores.index)
+        self.score_positions = scores['position'].to_numpy(dtype=np.int64)
+        self.score_days = pd.to_datetime(scores['day'], errors='coerce').to_numpy(dtype='datetime64[ns]')
+        self.score_present = (attendance.fillna('Present') != 'Absent').to_numpy()
+        self.dated_scores = int((~np.isnat(self.score_days)).sum())
+
+    def _mask(self, key: Tuple[str, Any], build: Callable[[], np.ndarray]) -> np.ndarray:
+        """Get a cached filter mask, building it on first use"""
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = build()
+            with self._lock:
+                self._masks[key] = mask
+        return mask
+
+    def filter_mask(self, category: str = ALL_CATEGORIES, batch: str = ALL_BATCHES,
+                    date_range: str = "All Time") -> np.ndarray:
+        """Get the students matching a category, batch and admission date range"""
+        students = self.students
+        mask = np.ones(len(students), dtype=bool)
+        if category and category != ALL_CATEGORIES:
+            mask &= self._mask(('category', category), lambda: (students['category'] == category).to_numpy())
+        if batch and batch != ALL_BATCHES:
+            mask &= self._mask(('batch', batch), lambda: (students['batch'] == batch).to_numpy())
+
+        start = _range_start(date_range, self.today)
+        if start is not None:
+            mask &= self._mask(('admitted', date_range),
+                               lambda: (students['admission_date'] >= start).to_numpy())
+        return mask
+
+    def demographics(self, category: str = ALL_CATEGORIES, batch: str = ALL_BATCHES) -> pd.DataFrame:
+        """Get students with their age and age group"""
+        students = self.students[self.filter_mask(category, batch)]
+        return students.assign(admission_date=students['admission_date'].dt.date).drop(columns=['month'])
+
+    def enrollments(self, category: str = ALL_CATEGORIES, batch: str = ALL_BATCHES,
+                    date_range: str = "All Time") -> pd.DataFrame:
+        """Get students admitted in a date range with their admission month"""
+        students = self.students[self.filter_mask(category, batch, date_range)]
+        students = students[students['month'].notna()].sort_values('admission_date')
+        return students.assign(admission_date=students['admission_date'].dt.date)
+
+    def attendance(self, category: str = ALL_CATEGORIES, batch: str = ALL_BATCHES,
+                   date_range: str = "All Time") -> pd.DataFrame:
+        """Get each student's attendance rate over the tests held in a date range"""
+        columns = ['student_id', 'student_name', 'category', 'batch', 'tests_recorded', 'tests_attended',
+                   'attendance_rate']
+        low, high = 0, len(self.score_positions)
+        start = _range_start(date_range, self.today)
+        if start is not None:
+            high = self.dated_scores
+            low = min(int(np.searchsorted(self.score_days[:high], np.datetime64(start), side='left')), high)
+
+        positions = self.score_positions[low:high]
+        recorded = np.bincount(positions, minlength=len(self.students))
+        attended = np.bincount(positions, weights=self.score_present[low:high], minlength=len(self.students))
+
+        mask = self.filter_mask(category, batch) & (recorded > 0)
+        if not mask.any():
+            return pd.DataFrame(columns=columns)
+
+        students = self.students[mask]
+        return pd.DataFrame({
+            'student_id': students['id'].to_numpy(),
+            'student_name': students['full_name'].to_numpy(),
+            'category': students['category'].to_numpy(),
+            'batch': students['batch'].to_numpy(),
+            'tests_recorded': recorded[mask],
+            'tests_attended': attended[mask].astype(int),
+            'attendance_rate': np.round(attended[mask] / recorded[mask] * 100, 1)
+        }).sort_values('attendance_rate').reset_index(drop=True)
+
+
+class StudentReports:
+    """
+    Cache of the student report frame behind the Student Reports tab
+    Dropped when students, tests or scores change; after the cache TTL it is rebuilt only if they did
+    """
+
+    def __init__(self, ttl: int = CACHE_CONFIG["cache_ttl"]):
+        self.ttl = ttl
+        self._frame: Optional[StudentReportFrame] = None
+        self._versions: Optional[tuple] = None
+        self._lock = threading.Lock()
+
+    def get_frame(self, db_manager: Any) -> StudentReportFrame:
+        """Get the report frame, building it if missing, changed or from a previous day"""
+        frame = self._frame
+        if frame is not None and frame.today == pd.Timestamp(date.today()):
+            if time.time() - frame.built_at < self.ttl:
+                cache_manager.touch('student_reports', 'frame')
+                return frame
+            if db_manager.table_versions(REPORT_TABLES) == self._versions:
+                # None of the tables changed since the build, so the frame is still current
+                frame.built_at = time.time()
+                cache_manager.touch('student_reports', 'frame')
+                return frame
+
+        with self._lock:
+            versions = db_manager.table_versions(REPORT_TABLES)
+            frame = StudentReportFrame(db_manager.get_table_frame('students'),
+                                       db_manager.get_table_frame('tests'),
+                                       db_manager.get_table_frame('test_scores'))
+            self._frame, self._versions = frame, versions
+        cache_manager.track('student_reports', 'frame', frame, self.invalidate)
+        return frame
+
+    def invalidate(self) -> None:
+        """Drop the report frame so it is rebuilt on next use"""
+        # Builds reading a changed table call this through the table cache, so the build lock is not taken
+        self._frame = None
+        cache_manager.forget('student_reports')
+
+    def build_report(self, db_manager: Any, report_type: str, category: str = ALL_CATEGORIES,
+                     batch: str = ALL_BATCHES, date_range: str = "All Time") -> pd.DataFrame:
+        """Build one student report by its name on the Reports page"""
+        frame = self.get_frame(db_manager)
+        if report_type == "Student Demographics Report":
+            return frame.demographics(category, batch)
+        if report_type == "Enrollment Analysis":
+            return frame.enrollments(category, batch, date_range)
+        if report_type == "Attendance Report":
+            return frame.attendance(category, batch, date_range)
+        return pd.DataFrame()
+
+    def export_report(self, db_manager: Any, report_type: str, category: str = ALL_CATEGORIES,
+                      batch: str = ALL_BATCHES, date_range: str = "All Time") -> bytes:
+        """Write one student report to a single-sheet workbook"""
+        report = self.build_report(db_manager, report_type, category, batch, date_range)
+        if 'age_group' in report.columns:
+            report = report.assign(age_group=report['age_group'].astype(object))
+        for column in report.columns:
+            if pd.api.types.is_datetime64_any_dtype(report[column]):
+                report[column] = report[column].dt.date
+        return export_engine.write_excel([report], report_type[:31]).data
+
+
+# Global student reports instance
+student_reports = StudentReports()
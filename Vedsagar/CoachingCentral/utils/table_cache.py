@@ -0,0 +1,269 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import pandas as pd
+from config.settings import CACHE_CONFIG
+from utils.cache_manager import cache_manager
+from utils.report_jobs import data_version
+from utils.shared_cache import SharedEntry, SharedTableStore
+from utils.snapshot import typed_frame
+
+# Row count and change marker (latest updated_at or id) of a table
+Fingerprint = Tuple[Optional[int], Any]
+
+
+class TableState:
+    """A table's cached frame and the fingerprint it was built from"""
+
+    def __init__(self):
+        self.frame: Optional[pd.DataFrame] = None
+        self.fingerprint: Optional[Fingerprint] = None
+        self.version = 0
+        self.shared_version = 0
+        self.checked_at = 0.0
+        self.checked_data_version: Optional[int] = None
+        self.tracked_version = 0
+        self.lock = threading.Lock()
+
+
+class TableCache:
+    """
+    Typed table frames kept between reads and refreshed from their changes
+    A cheap fingerprint is compared before any reload; an unchanged table keeps its frame,
+    and a changed one has only the rows changed since its marker applied. Frames left on
+    disk by an earlier run are served at once and checked against the backend behind them
+    """
+
+    def __init__(self, check_interval: int = CACHE_CONFIG["change_check_interval"]):
+        self.check_interval = check_interval
+        self.shared: Optional[SharedTableStore] = None
+        self._listener: Optional[Callable[[str], None]] = None
+        self._tables: Dict[str, TableState] = {}
+        self._lock = threading.Lock()
+        self.stats = {'unchanged': 0, 'deltas': 0, 'reloads': 0, 'events': 0, 'shared': 0, 'warm_starts': 0}
+
+    def attach_shared(self, store: SharedTableStore) -> None:
+        """Share frames with the other server processes through a store; the first store attached is kept"""
+        if self.shared is None and store.available:
+            self.shared = store
+
+    def _state(self, table_name: str) -> TableState:
+        with self._lock:
+            return self._tables.setdefault(table_name, TableState())
+
+    def _shared_entry(self, table_name: str, state: TableState) -> Optional[SharedEntry]:
+        """Get the shared copy of a table if another process published a newer one"""
+        entry = self.shared.lookup(table_name) if self.shared is not None else None
+        return entry if entry is not None and entry.version > state.shared_version else None
+
+    def _due(self, table_name: str, state: TableState) -> bool:
+        """Check whether a table's fingerprint should be compared again"""
+        return (state.frame is None or state.checked_data_version != data_version.value
+                or time.time() - state.checked_at >= self.check_interval
+                or self._shared_entry(table_name, state) is not None)
+
+    def set_change_listener(self, listener: Callable[[str], None]) -> None:
+        """Call listener(table_name) whenever a cached table is replaced by different rows"""
+        self._listener = listener
+
+    def get_frame(self, db_manager: Any, table_name: str) -> pd.DataFrame:
+        """Get a table's frame, refreshing it first if it may have changed; callers must not modify its values"""
+        state = self._state(table_name)
+        changed = False
+        if self._due(table_name, state):
+            with state.lock:
+                if self._due(table_name, state):
+                    changed = self._refresh(db_manager, table_name, state)
+        self._track(table_name, state)
+        frame = state.frame.copy(deep=False)
+        if changed:
+            self._notify(table_name)
+        return frame
+
+    def _track(self, table_name: str, state: TableState) -> None:
+        """Account for a table's frame in the cache budget, measuring it again only once it changed"""
+        if state.version == state.tracked_version:
+            cache_manager.touch('tables', table_name)
+            return
+        state.tracked_version = state.version
+        cache_manager.track('tables', table_name, state.frame, lambda: self.invalidate(table_name))
+
+    def versions(self, db_manager: Any, tables: Iterable[str]) -> Tuple[int, ...]:
+        """Get the content versions of tables, refreshing them first; derived data built at equal versions is current"""
+        versions = []
+        for table_name in tables:
+            self.get_frame(db_manager, table_name)
+            versions.append(self._state(table_name).version)
+        return tuple(versions)
+
+    def fingerprint(self, table_name: str) -> Optional[Fingerprint]:
+        """Get the fingerprint a table's cached frame was built from"""
+        return self._state(table_name).fingerprint
+
+    @staticmethod
+    def _replace(state: TableState, frame: pd.DataFrame, fingerprint: Optional[Fingerprint]) -> bool:
+        """Swap in a table's new frame; True if it replaced different rows"""
+        if state.frame is not None and frame.equals(state.frame):
+            # The changes were already applied, e.g. from a webhook event
+            state.fingerprint = fingerprint
+            return False
+        replaced = state.frame is not None
+        if replaced:
+            # Report jobs and exports keyed on the old data must not be reused
+            data_version.bump()
+        state.frame = frame
+        state.fingerprint = fingerprint
+        state.version += 1
+        return replaced
+
+    @staticmethod
+    def _mark_checked(state: TableState, checked_at: float) -> None:
+        state.checked_at = checked_at
+        state.checked_data_version = data_version.value
+
+    def _publish(self, table_name: str, state: TableState) -> None:
+        """Offer a table's frame to the other server processes and to the next start"""
+        if self.shared is None:
+            return
+        version = self.shared.publish(table_name, state.frame, state.fingerprint)
+        if version is not None:
+            state.shared_version = version
+
+    def _refresh(self, db_manager: Any, table_name: str, state: TableState) -> bool:
+        """Bring a table up to date from a newer stored copy or the backend; True if its rows changed"""
+        cold = state.frame is None
+        entry = self._shared_entry(table_name, state)
+        frame = self.shared.load(entry) if entry is not None else None
+        if frame is None:
+            return self._check_backend(db_manager, table_name, state)
+
+        local_writes = state.checked_data_version not in (None, data_version.value)
+        changed = self._replace(state, frame, entry.fingerprint)
+        state.shared_version = entry.version
+        self.stats['shared'] += 1
+        if not local_writes and time.time() - entry.published_at < self.check_interval:
+            # Another process checked the backend moments ago
+            self._mark_checked(state, entry.published_at)
+        elif cold:
+            # Serve the copy left on disk at once and check it against the backend in the background
+            self._mark_checked(state, time.time())
+            self.stats['warm_starts'] += 1
+            threading.Thread(target=self._revalidate, args=(db_manager, table_name, state),
+                             name=f"revalidate-{table_name}", daemon=True).start()
+        else:
+            changed = self._check_backend(db_manager, table_name, state) or changed
+        return changed
+
+    def _notify(self, table_name: str) -> None:
+        """Tell the listener a table's rows changed; runs outside the table lock, as the listener takes locks of its own"""
+        if self._listener is not None:
+            self._listener(table_name)
+
+    def _revalidate(self, db_manager: Any, table_name: str, state: TableState) -> None:
+        """Check a table served from disk against the backend off the request path"""
+        with state.lock:
+            changed = self._check_backend(db_manager, table_name, state)
+        self._track(table_name, state)
+        if changed:
+            self._notify(table_name)
+
+    def _check_backend(self, db_manager: Any, table_name: str, state: TableState) -> bool:
+        """Compare the table's fingerprint and apply its changes or reload it; True if its rows changed"""
+        changed = False
+        fingerprint = db_manager.table_fingerprint(table_name)
+        if state.frame is not None and (fingerprint is None or fingerprint == state.fingerprint):
+            # Unchanged, or the backend cannot tell right now; keep the frame either way
+            self.stats['unchanged'] += 1
+            if fingerprint is not None and self.shared is not None:
+                # Let processes starting now trust the stored copy without checking again
+                self.shared.confirm(table_name, state.shared_version)
+        else:
+            frame = None
+            if state.frame is not None:
+                frame = self._apply_changes(db_manager, table_name, state, fingerprint)
+            if frame is None:
+                frame = db_manager.load_table_frame(table_name)
+                self.stats['reloads'] += 1
+            else:
+                self.stats['deltas'] += 1
+            changed = self._replace(state, frame, fingerprint)
+            self._publish(table_name, state)
+
+        self._mark_checked(state, time.time())
+        return changed
+
+    @staticmethod
+    def _apply_changes(db_manager: Any, table_name: str, state: TableState,
+                       fingerprint: Fingerprint) -> Optional[pd.DataFrame]:
+        """Merge rows changed since the cached marker into the frame; None when a full reload is needed"""
+        frame = state.frame
+        row_count = fingerprint[0]
+        if 'id' not in frame.columns or row_count is None or state.fingerprint is None:
+            return None
+
+        changes = db_manager.get_table_changes(table_name, state.fingerprint[1])
+        if changes is None:
+            return None
+        if not changes.empty:
+            frame = pd.concat([frame[~frame['id'].isin(changes['id'])], changes], ignore_index=True)
+            frame = frame.sort_values('id', ignore_index=True)
+
+        if len(frame) != row_count:
+            # Rows were deleted; keep only the ids the table still has
+            ids = db_manager.load_table_frame(table_name, {'fields': 'id'})
+            if ids.empty or 'id' not in ids.columns:
+                return None
+            frame = frame[frame['id'].isin(ids['id'])].reset_index(drop=True)
+            if len(frame) != row_count:
+                return None
+        return frame
+
+    def apply_rows(self, table_name: str, rows: List[Dict], deleted: bool = False) -> bool:
+        """Apply inserted, edited or deleted rows pushed by the backend; False if the table is not cached"""
+        state = self._state(table_name)
+        with state.lock:
+            frame = state.frame
+            if frame is None or 'id' not in frame.columns:
+                return False
+            ids = [row['id'] for row in rows if row.get('id') is not None]
+            if not ids:
+                return False
+
+            kept = frame[~frame['id'].isin(ids)]
+            if deleted:
+                frame = kept.reset_index(drop=True)
+            else:
+                # Events may carry only the edited fields, so start from the cached row
+                cached = {row['id']: row for row in frame[frame['id'].isin(ids)].to_dict('records')}
+                changes = typed_frame([{**cached.get(row['id'], {}), **row} for row in rows
+                                       if row.get('id') is not None], table_name)
+                frame = pd.concat([kept, changes], ignore_index=True).sort_values('id', ignore_index=True)
+
+            state.frame = frame
+            state.version += 1
+            data_version.bump()
+            # The fingerprint is left as it was, so the next scheduled check reconciles anything missed
+            state.checked_data_version = data_version.value
+            self._publish(table_name, state)
+        self._track(table_name, state)
+        self.stats['events'] += 1
+        return True
+
+    def discard(self, table_name: str) -> None:
+        """Drop a table's frame here and in the store, so its next read comes from the backend"""
+        self.invalidate(table_name)
+        if self.shared is not None:
+            self.shared.discard(table_name)
+
+    def invalidate(self, table_name: Optional[str] = None) -> None:
+        """Drop one table's frame, or every table's, so it is reloaded on next use"""
+        with self._lock:
+            if table_name is None:
+                self._tables.clear()
+            else:
+                self._tables.pop(table_name, None)
+        cache_manager.forget('tables', table_name)
+
+
+# Global table cache instance
+table_cache = TableCache()
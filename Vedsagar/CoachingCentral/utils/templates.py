@@ -0,0 +1,158 @@
+import re
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import pandas as pd
+from config.settings import MESSAGE_TEMPLATES
+
+# Placeholders are written as {name}; anything else in braces is left as literal text
+PLACEHOLDER_PATTERN = re.compile(r"\{(\w+)\}")
+
+# Placeholders the messaging pages know how to fill
+KNOWN_PLACEHOLDERS = {
+    "student_name", "batch_name", "batch", "fee_amount", "pending_amount",
+    "due_date", "days_overdue", "institute_name", "contact_number"
+}
+for _content in MESSAGE_TEMPLATES.values():
+    KNOWN_PLACEHOLDERS.update(PLACEHOLDER_PATTERN.findall(_content))
+
+
+def _content_version(content: str) -> str:
+    """Get a short version hash for template content"""
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()[:12]
+
+
+class CompiledTemplate:
+    """
+    Message template parsed once into literal text and placeholder slots
+    Rendering joins the pre-split segments instead of re-scanning the template
+    """
+
+    def __init__(self, content: str, template_id: Any = None, version: Any = None):
+        self.content = content or ""
+        self.template_id = template_id
+        self.version = version if version is not None else _content_version(self.content)
+
+        self._literals: List[str] = []
+        self._fields: List[str] = []
+
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(self.content):
+            self._literals.append(self.content[position:match.start()])
+            self._fields.append(match.group(1))
+            position = match.end()
+        self._literals.append(self.content[position:])
+
+        # Unique placeholders in order of first appearance
+        self.placeholders: Tuple[str, ...] = tuple(dict.fromkeys(self._fields))
+
+    def unknown_placeholders(self, known: Optional[Iterable[str]] = None) -> List[str]:
+        """Get placeholders that no renderer knows how to fill"""
+        known_set = set(known) if known is not None else KNOWN_PLACEHOLDERS
+        return [name for name in self.placeholders if name not in known_set]
+
+    def is_valid(self, known: Optional[Iterable[str]] = None) -> bool:
+        """Check that every placeholder in the template is known"""
+        return not self.unknown_placeholders(known)
+
+    def render(self, values: Dict[str, Any]) -> str:
+        """Render the template for one recipient, keeping unfilled placeholders as-is"""
+        parts = [self._literals[0]]
+        for field, literal in zip(self._fields, self._literals[1:]):
+            value = values.get(field)
+            parts.append(f"{{{field}}}" if value is None else str(value))
+            parts.append(literal)
+        return "".join(parts)
+
+    def render_bulk(self, recipients: pd.DataFrame, columns: Optional[Dict[str, str]] = None,
+                    defaults: Optional[Dict[str, Any]] = None,
+                    formatters: Optional[Dict[str, Callable[[Any], str]]] = None) -> pd.Series:
+        """Render the template for every row of a recipients DataFrame"""
+        # Without a columns mapping each placeholder reads the column of the same name
+        defaults = defaults or {}
+        formatters = formatters or {}
+
+        result = pd.Series(self._literals[0], index=recipients.index, dtype=object)
+
+        for field, literal in zip(self._fields, self._literals[1:]):
+            column = field if columns is None else columns.get(field)
+
+            if column is not None and column in recipients.columns:
+                values = recipients[column]
+                filled = values.notna()
+                if field in formatters:
+                    values = values.map(formatters[field], na_action='ignore')
+                text = values.astype(object).where(filled, f"{{{field}}}").astype(str)
+            elif field in defaults and defaults[field] is not None:
+                text = str(defaults[field])
+            else:
+                text = f"{{{field}}}"
+
+            result = result + text + literal
+
+        return result
+
+
+class TemplateCompiler:
+    """
+    Cache of compiled message templates
+    Entries are keyed by template id and version so edited templates recompile
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._cache: Dict[Tuple[Any, Any], CompiledTemplate] = {}
+        self._lock = threading.Lock()
+
+    def compile(self, content: str, template_id: Any = None, version: Any = None) -> CompiledTemplate:
+        """Get the compiled form of a template, compiling it on first use"""
+        content = content or ""
+        if template_id is None:
+            template_id = "inline"
+        if version is None:
+            version = _content_version(content)
+
+        key = (template_id, version)
+        compiled = self._cache.get(key)
+        if compiled is not None:
+            return compiled
+
+        compiled = CompiledTemplate(content, template_id, version)
+
+        with self._lock:
+            # Drop the oldest entries once the cache is full
+            while len(self._cache) >= self.max_entries:
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[key] = compiled
+
+        return compiled
+
+    def compile_row(self, template_row: Any) -> CompiledTemplate:
+        """Compile a message_templates row (dict or Series)"""
+        content = template_row.get('content', '') or ''
+        version = template_row.get('updated_at')
+        if version is None or pd.isna(version):
+            version = _content_version(content)
+        return self.compile(content, template_row.get('id'), str(version))
+
+    def compile_setting(self, template_key: str) -> Optional[CompiledTemplate]:
+        """Compile a MESSAGE_TEMPLATES entry from settings"""
+        content = MESSAGE_TEMPLATES.get(template_key)
+        if content is None:
+            return None
+        return self.compile(content, f"settings:{template_key}")
+
+    def invalidate(self, template_id: Any) -> None:
+        """Drop every cached version of a template"""
+        with self._lock:
+            for key in [key for key in self._cache if key[0] == template_id]:
+                del self._cache[key]
+
+    def clear(self) -> None:
+        """Drop all compiled templates"""
+        with self._lock:
+            self._cache.clear()
+
+
+# Global template compiler instance
+template_compiler = TemplateCompiler()
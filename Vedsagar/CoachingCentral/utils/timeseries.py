@@ -0,0 +1,159 @@
+import time
+import threading
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from config.settings import CACHE_CONFIG
+from utils.cache_manager import cache_manager
+
+CATEGORY_PREFIX = "category:"
+
+# Series name -> (table, date column, {metric: value column}, category column)
+SERIES_SOURCES: Dict[str, Tuple[str, str, Dict[str, str], Optional[str]]] = {
+    'enrollments': ('students', 'admission_date', {}, 'category'),
+    'messages': ('communication_logs', 'timestamp', {'recipients': 'recipient_count'}, 'activity_type')
+}
+
+
+def _day(value: Any) -> np.datetime64:
+    """Convert a date-like value to a day for searching"""
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, date):
+        return np.datetime64(value, 'D')
+    return np.datetime64(pd.Timestamp(value).date(), 'D')
+
+
+class TimeSeriesIndex:
+    """
+    Daily totals with running sums per metric
+    Any date-range total is two binary searches and a subtraction
+    """
+
+    def __init__(self, daily: pd.DataFrame):
+        daily = daily.sort_index()
+        self.columns: List[str] = list(daily.columns)
+        self.days = daily.index.to_numpy(dtype='datetime64[D]')
+
+        # Row i holds the totals of every day before days[i]
+        values = daily.to_numpy(dtype=float) if len(daily) else np.zeros((0, len(self.columns)))
+        self.cumulative = np.vstack([np.zeros((1, len(self.columns))), np.cumsum(values, axis=0)])
+
+    @classmethod
+    def from_events(cls, events: pd.DataFrame, date_column: str, metrics: Optional[Dict[str, str]] = None,
+                    category_column: Optional[str] = None) -> "TimeSeriesIndex":
+        """Build an index from one row per event"""
+        metrics = metrics or {}
+        if events.empty or date_column not in events.columns:
+            return cls(pd.DataFrame(columns=['count'] + list(metrics)))
+
+        days = pd.to_datetime(events[date_column], errors='coerce').dt.normalize()
+        valid = days.notna()
+        events, days = events[valid], days[valid]
+
+        daily = pd.DataFrame({'count': days.value_counts()})
+        for metric, column in metrics.items():
+            values = pd.to_numeric(events[column], errors='coerce').fillna(0) if column in events.columns else 0
+            daily[metric] = pd.Series(values, index=events.index).groupby(days).sum()
+
+        if category_column and category_column in events.columns:
+            by_category = pd.crosstab(days, events[category_column].fillna('Unknown'))
+            by_category.columns = [f"{CATEGORY_PREFIX}{column}" for column in by_category.columns]
+            daily = daily.join(by_category)
+
+        return cls(daily.fillna(0))
+
+    def _bounds(self, start_date: date, end_date: date) -> Tuple[int, int]:
+        """Find the slice of days between two dates, inclusive"""
+        low = int(np.searchsorted(self.days, _day(start_date), side='left'))
+        high = int(np.searchsorted(self.days, _day(end_date), side='right'))
+        return low, max(low, high)
+
+    def range_totals(self, start_date: date, end_date: date) -> pd.Series:
+        """Sum every column between two dates, inclusive"""
+        low, high = self._bounds(start_date, end_date)
+        return pd.Series(self.cumulative[high] - self.cumulative[low], index=self.columns)
+
+    def range_sum(self, start_date: date, end_date: date, metric: str = 'count',
+                  category: Optional[str] = None) -> float:
+        """Sum one metric, or one category's count, between two dates"""
+        column = f"{CATEGORY_PREFIX}{category}" if category is not None else metric
+        if column not in self.columns:
+            return 0.0
+        low, high = self._bounds(start_date, end_date)
+        position = self.columns.index(column)
+        return float(self.cumulative[high, position] - self.cumulative[low, position])
+
+    def total(self, metric: str = 'count') -> float:
+        """Sum one metric over every day in the index"""
+        if metric not in self.columns:
+            return 0.0
+        return float(self.cumulative[-1, self.columns.index(metric)])
+
+    def daily(self, start_date: date, end_date: date, metric: str = 'count') -> pd.DataFrame:
+        """Get the days with events between two dates and their totals"""
+        if metric not in self.columns:
+            return pd.DataFrame(columns=['date', metric])
+        low, high = self._bounds(start_date, end_date)
+        position = self.columns.index(metric)
+        return pd.DataFrame({
+            'date': pd.to_datetime(self.days[low:high]).date,
+            metric: np.diff(self.cumulative[low:high + 1, position])
+        })
+
+    def categories(self) -> List[str]:
+        """Get the categories the index has counts for"""
+        return [column[len(CATEGORY_PREFIX):] for column in self.columns if column.startswith(CATEGORY_PREFIX)]
+
+
+class TimeSeriesRegistry:
+    """
+    Lazily built time series indexes for enrollments, tests and messages
+    Indexes are rebuilt after the cache TTL or when their table changes
+    """
+
+    def __init__(self, ttl: int = CACHE_CONFIG["cache_ttl"]):
+        self.ttl = ttl
+        # Series name -> (index, built or last confirmed at, version of its table)
+        self._indexes: Dict[str, Tuple[TimeSeriesIndex, float, tuple]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, db_manager: Any, name: str) -> TimeSeriesIndex:
+        """Get a series index, building it if missing or its table changed"""
+        table_name, date_column, metrics, category_column = SERIES_SOURCES[name]
+        cached = self._indexes.get(name)
+        if cached is not None and time.time() - cached[1] < self.ttl:
+            cache_manager.touch('timeseries', name)
+            return cached[0]
+
+        versions = db_manager.table_versions([table_name])
+        if cached is not None and cached[2] == versions:
+            index = cached[0]
+        else:
+            events = db_manager.get_table_frame(table_name)
+            index = TimeSeriesIndex.from_events(events, date_column, metrics, category_column)
+
+        with self._lock:
+            self._indexes[name] = (index, time.time(), versions)
+        if cached is None or index is not cached[0]:
+            cache_manager.track('timeseries', name, index, lambda: self.invalidate(name))
+        else:
+            cache_manager.touch('timeseries', name)
+        return index
+
+    def invalidate(self, name: str) -> None:
+        """Drop a series index so it is rebuilt on next use"""
+        with self._lock:
+            self._indexes.pop(name, None)
+        cache_manager.forget('timeseries', name)
+
+    def clear(self) -> None:
+        """Drop all series indexes"""
+        with self._lock:
+            self._indexes.clear()
+        cache_manager.forget('timeseries')
+
+
+# Global time series registry instance
+timeseries_registry = TimeSeriesRegistry()
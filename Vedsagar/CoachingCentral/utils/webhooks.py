@@ -0,0 +1,158 @@
+import hmac
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+import requests
+from config.settings import WEBHOOK_CONFIG
+
+EVENT_INSERT = "insert"
+EVENT_UPDATE = "update"
+EVENT_DELETE = "delete"
+
+# Header NocoDB is configured to send the shared secret in
+SECRET_HEADER = "x-webhook-secret"
+
+
+def parse_event(payload: Dict[str, Any]) -> Optional[Tuple[str, str, List[Dict]]]:
+    """Get the table, action and rows of a NocoDB records webhook; None if it is not one"""
+    event_type = str(payload.get('type', '')).lower()
+    if not event_type.startswith('records.after.'):
+        return None
+    action = next((name for name in (EVENT_INSERT, EVENT_UPDATE, EVENT_DELETE) if name in event_type), None)
+
+    data = payload.get('data') or {}
+    table_name = data.get('table_name') or payload.get('table_name')
+    if 'rows' in data:
+        rows = data['rows'] or []
+    elif 'id' in data:
+        # Older NocoDB versions send the single row as the event data
+        rows = [{key: value for key, value in data.items() if key != 'table_name'}]
+    else:
+        rows = []
+
+    if action is None or not table_name:
+        return None
+    return table_name, action, [row for row in rows if isinstance(row, dict)]
+
+
+def nocodb_event(table_name: str, action: str, rows: List[Dict]) -> Dict[str, Any]:
+    """Build a records webhook payload the way NocoDB sends it"""
+    bulk = len(rows) > 1
+    event_type = f"records.after.{'bulk' + action.capitalize() if bulk else action}"
+    return {'type': event_type, 'data': {'table_name': table_name, 'rows': rows}}
+
+
+def send_event(url: str, event: Dict[str, Any], secret: str = WEBHOOK_CONFIG["secret"]) -> int:
+    """Post a webhook payload to a receiver, as the local event simulator; returns the status code"""
+    headers = {SECRET_HEADER: secret} if secret else {}
+    return requests.post(url, json=event, headers=headers, timeout=10).status_code
+
+
+class WebhookReceiver:
+    """
+    Embedded HTTP endpoint for NocoDB record webhooks
+    Runs beside Streamlit in the same process and applies each event to the shared table cache
+    """
+
+    def __init__(self, host: str = WEBHOOK_CONFIG["host"], port: int = WEBHOOK_CONFIG["port"],
+                 path: str = WEBHOOK_CONFIG["path"], secret: str = WEBHOOK_CONFIG["secret"],
+                 max_body_size: int = WEBHOOK_CONFIG["max_body_size"]):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.secret = secret
+        self.max_body_bytes = max_body_size * 1024 * 1024
+        self.events_applied = 0
+        self.events_rejected = 0
+        self._db_manager: Any = None
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> Optional[str]:
+        if self._server is None:
+            return None
+        return f"http://{self.host}:{self._server.server_address[1]}{self.path}"
+
+    def start(self, db_manager: Any) -> bool:
+        """Start listening on a background thread; later calls do nothing"""
+        with self._lock:
+            if self._server is not None:
+                return True
+            try:
+                self._server = ThreadingHTTPServer((self.host, self.port), self._handler())
+            except OSError as e:
+                # Another server process on this host already owns the port
+                print(f"Error starting webhook receiver on port {self.port}: {str(e)}")
+                return False
+            self._db_manager = db_manager
+            self._server.daemon_threads = True
+            threading.Thread(target=self._server.serve_forever, name="webhook-receiver", daemon=True).start()
+            return True
+
+    def stop(self) -> None:
+        """Stop listening"""
+        with self._lock:
+            if self._server is not None:
+                self._server.shutdown()
+                self._server.server_close()
+                self._server = None
+
+    def handle(self, payload: Dict[str, Any]) -> bool:
+        """Apply one webhook payload; False if it is not a records event for a known table"""
+        event = parse_event(payload)
+        if event is None:
+            self.events_rejected += 1
+            return False
+        table_name, action, rows = event
+        if not self._db_manager.apply_table_event(table_name, action, rows):
+            self.events_rejected += 1
+            return False
+        self.events_applied += 1
+        return True
+
+    def _authorized(self, headers: Any) -> bool:
+        """Check the shared secret, when one is configured"""
+        return not self.secret or hmac.compare_digest(headers.get(SECRET_HEADER, ''), self.secret)
+
+    def _handler(self) -> type:
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def _reply(self, status: int, body: Dict[str, Any]) -> None:
+                content = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def do_POST(self) -> None:
+                if self.path.split('?')[0] != receiver.path:
+                    return self._reply(404, {'error': 'not found'})
+                if not receiver._authorized(self.headers):
+                    return self._reply(401, {'error': 'bad secret'})
+                length = int(self.headers.get('Content-Length') or 0)
+                if length > receiver.max_body_bytes:
+                    return self._reply(413, {'error': 'payload too large'})
+                try:
+                    payload = json.loads(self.rfile.read(length) or b'{}')
+                except ValueError:
+                    return self._reply(400, {'error': 'invalid JSON'})
+                try:
+                    applied = receiver.handle(payload)
+                except Exception as e:
+                    print(f"Error applying webhook event: {str(e)}")
+                    return self._reply(500, {'error': 'event not applied'})
+                # NocoDB retries failed deliveries, so events we cannot use are still acknowledged
+                self._reply(200, {'applied': applied})
+
+        return Handler
+
+
+# Global webhook receiver instance
+webhook_receiver = WebhookReceiver()
@@ -1,6 +1,17 @@
 import urllib.parse
 from typing import List, Dict, Optional
 from datetime import datetime, date
+import pandas as pd
+from utils.templates import template_compiler
+
+# Fallback reminder used when the reminder type has no template in settings
+DEFAULT_FEE_REMINDER_TEMPLATE = """Dear {student_name},
+
+Your fee payment of ₹{pending_amount} for {batch_name} is pending.
+
+Please make the payment by {due_date}.
+
+Thank you!"""
 
 class WhatsAppManager:
     """
@@ -56,24 +67,24 @@ class WhatsAppManager:
                           include_fees: bool = False, fee_amount: float = 0) -> str:
         """Personalize message template with student details"""
         try:
-            message = template
+            compiled = template_compiler.compile(template)
+            values = self._common_placeholder_values()
             
-            # Replace placeholders
+            # Fill placeholders
             if include_name and student_name:
-                message = message.replace("{student_name}", student_name)
-                if not "{student_name}" in template and include_name:
-                    message = f"Dear {student_name},\n\n{message}"
+                values['student_name'] = student_name
             
             if include_batch and batch_name:
-                message = message.replace("{batch_name}", batch_name)
+                values['batch_name'] = batch_name
             
             if include_fees and fee_amount > 0:
-                message = message.replace("{fee_amount}", f"₹{fee_amount:,.0f}")
-                message = message.replace("{pending_amount}", f"₹{fee_amount:,.0f}")
+                values['fee_amount'] = f"₹{fee_amount:,.0f}"
+                values['pending_amount'] = f"₹{fee_amount:,.0f}"
+            
+            message = compiled.render(values)
             
-            # Replace common placeholders
-            message = message.replace("{institute_name}", "Our Coaching Institute")
-            message = message.replace("{contact_number}", "Contact us for more details")
+            if include_name and student_name and "student_name" not in compiled.placeholders:
+                message = f"Dear {student_name},\n\n{message}"
             
             return message.strip()
         
@@ -81,69 +92,67 @@ class WhatsAppManager:
             print(f"Error personalizing message: {str(e)}")
             return template
     
+    def personalize_messages_bulk(self, template: str, recipients: pd.DataFrame,
+                                  name_column: str = 'full_name', batch_column: str = 'batch',
+                                  include_name: bool = True, include_batch: bool = False,
+                                  include_fees: bool = False, fee_column: str = 'pending_amount') -> pd.Series:
+        """Personalize one template for every row of a recipients DataFrame"""
+        try:
+            compiled = template_compiler.compile(template)
+            columns = {}
+            formatters = {}
+            
+            if include_name:
+                columns['student_name'] = name_column
+            if include_batch:
+                columns['batch_name'] = batch_column
+            if include_fees:
+                columns['fee_amount'] = fee_column
+                columns['pending_amount'] = fee_column
+                formatters['fee_amount'] = formatters['pending_amount'] = lambda x: f"₹{x:,.0f}"
+            
+            messages = compiled.render_bulk(
+                recipients,
+                columns=columns,
+                defaults=self._common_placeholder_values(),
+                formatters=formatters
+            )
+            
+            if include_name and "student_name" not in compiled.placeholders and name_column in recipients.columns:
+                messages = "Dear " + recipients[name_column].astype(str) + ",\n\n" + messages
+            
+            return messages.str.strip()
+        
+        except Exception as e:
+            print(f"Error personalizing messages: {str(e)}")
+            return pd.Series(template, index=recipients.index, dtype=object)
+    
+    def _common_placeholder_values(self) -> Dict[str, str]:
+        """Get values for placeholders shared by every message"""
+        return {
+            'institute_name': "Our Coaching Institute",
+            'contact_number': "Contact us for more details"
+        }
+    
     def generate_fee_reminder_message(self, student_name: str, pending_amount: float, 
                                     due_date: str = "", batch_name: str = "", 
                                     reminder_type: str = "gentle") -> str:
         """Generate fee reminder message"""
         try:
-            if reminder_type == "gentle":
-                template = """Dear {student_name},
-
-This is a gentle reminder that your fee payment of ₹{pending_amount} for {batch_name} is pending.
-
-Please make the payment at your earliest convenience to avoid any interruption in your classes.
-
-Due Date: {due_date}
-
-Thank you for your cooperation!
-
-Best regards,
-EduCRM Team"""
+            compiled = None
+            if reminder_type in ("gentle", "urgent", "final"):
+                compiled = template_compiler.compile_setting(f"fee_reminder_{reminder_type}")
             
-            elif reminder_type == "urgent":
-                template = """Dear Parent,
-
-URGENT REMINDER: The fee payment of ₹{pending_amount} for your ward {student_name} ({batch_name}) is overdue.
-
-Please clear the dues immediately to ensure uninterrupted classes.
-
-Original Due Date: {due_date}
-
-For any queries, please contact us immediately.
-
-EduCRM Team"""
-            
-            elif reminder_type == "final":
-                template = """FINAL NOTICE
-
-Dear Parent,
-
-Despite previous reminders, the fee of ₹{pending_amount} for {student_name} ({batch_name}) remains unpaid.
-
-Please clear the outstanding amount within 24 hours to avoid suspension of classes.
-
-Due Date: {due_date}
-
-Contact our office immediately to resolve this matter.
-
-EduCRM Administration"""
-            
-            else:
-                template = """Dear {student_name},
-
-Your fee payment of ₹{pending_amount} for {batch_name} is pending.
-
-Please make the payment by {due_date}.
-
-Thank you!"""
+            if compiled is None:
+                compiled = template_compiler.compile(DEFAULT_FEE_REMINDER_TEMPLATE, "fee_reminder_default")
             
             # Personalize the message
-            message = template.replace("{student_name}", student_name)
-            message = message.replace("{pending_amount}", f"{pending_amount:,.0f}")
-            message = message.replace("{batch_name}", batch_name)
-            message = message.replace("{due_date}", due_date)
-            
-            return message
+            return compiled.render({
+                'student_name': student_name,
+                'pending_amount': f"{pending_amount:,.0f}",
+                'batch_name': batch_name,
+                'due_date': due_date
+            })
         
         except Exception as e:
             print(f"Error generating fee reminder: {str(e)}")
@@ -306,20 +315,18 @@ EduCRM Team"""
                                batch_name: str, due_date: Optional[date], days_overdue: int = 0) -> str:
         """Personalize fee reminder template"""
         try:
-            message = template
-            
-            # Replace placeholders
-            message = message.replace("{student_name}", student_name)
-            message = message.replace("{pending_amount}", f"₹{pending_amount:,.0f}")
-            message = message.replace("{batch_name}", batch_name)
+            values = {
+                'student_name': student_name,
+                'pending_amount': f"₹{pending_amount:,.0f}",
+                'batch_name': batch_name,
+                'batch': batch_name,
+                'days_overdue': str(days_overdue)
+            }
             
             if due_date:
-                due_date_str = due_date.strftime("%d-%m-%Y") if isinstance(due_date, date) else str(due_date)
-                message = message.replace("{due_date}", due_date_str)
-            
-            message = message.replace("{days_overdue}", str(days_overdue))
+                values['due_date'] = due_date.strftime("%d-%m-%Y") if isinstance(due_date, date) else str(due_date)
             
-            return message
+            return template_compiler.compile(template).render(values)
         
         except Exception as e:
             print(f"Error personalizing fee reminder: {str(e)}")
@@ -344,6 +351,32 @@ EduCRM Team"""
         except Exception:
             return phone
     
+    def build_link_sheet(self, recipients: pd.DataFrame, messages: pd.Series,
+                         name_column: str = 'full_name', phone_column: str = 'parent_phone',
+                         label: Optional[pd.Series] = None) -> pd.DataFrame:
+        """Build a sheet of WhatsApp links, one row per recipient"""
+        try:
+            phones = recipients[phone_column].fillna('').astype(str)
+            cleaned_phones = phones.map(self.clean_phone_number)
+            encoded_messages = messages.fillna('').astype(str).map(urllib.parse.quote)
+            
+            links = (self.base_url + cleaned_phones + "?text=" + encoded_messages).where(cleaned_phones != "", "")
+            
+            names = recipients[name_column].fillna('').astype(str)
+            
+            return pd.DataFrame({
+                'name': names,
+                'phone': phones,
+                'label': label.astype(str) if label is not None else names,
+                'message': messages,
+                'whatsapp_link': links,
+                'valid_phone': cleaned_phones.map(lambda x: len(x) >= 12 and x.isdigit())
+            }).reset_index(drop=True)
+        
+        except Exception as e:
+            print(f"Error building link sheet: {str(e)}")
+            return pd.DataFrame(columns=['name', 'phone', 'label', 'message', 'whatsapp_link', 'valid_phone'])
+    
     def generate_bulk_message_data(self, recipients: List[Dict], message_template: str, 
                                  personalize: bool = True) -> List[Dict]:
         """Generate bulk message data for multiple recipients"""